@@ -0,0 +1,40 @@
+"""Add backfill checkpoints for resumable date-range backfills
+
+Revision ID: c5e8a1f3b920
+Revises: 8b41d6e2c9a7
+Create Date: 2025-09-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1f3b920'
+down_revision = '8b41d6e2c9a7'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('backfill_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('platform', sa.String(length=50), nullable=False),
+        sa.Column('shard_date', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('next_page', sa.Integer(), nullable=True),
+        sa.Column('total_fetched', sa.Integer(), nullable=True),
+        sa.Column('new_opportunities', sa.Integer(), nullable=True),
+        sa.Column('updated_opportunities', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('platform', 'shard_date', name='uq_backfill_checkpoints_platform_date')
+    )
+    
+    op.create_index('ix_backfill_checkpoints_id', 'backfill_checkpoints', ['id'])
+
+def downgrade():
+    op.drop_index('ix_backfill_checkpoints_id', table_name='backfill_checkpoints')
+    op.drop_table('backfill_checkpoints')
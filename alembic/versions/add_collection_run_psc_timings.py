@@ -0,0 +1,21 @@
+"""Add per-PSC timings to collection runs
+
+Revision ID: 3f9c2a7b1d04
+Revises: abc123def456
+Create Date: 2025-09-08 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7b1d04'
+down_revision = 'abc123def456'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('collection_runs', sa.Column('psc_timings', sa.JSON(), nullable=True))
+
+def downgrade():
+    op.drop_column('collection_runs', 'psc_timings')
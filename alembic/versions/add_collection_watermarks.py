@@ -0,0 +1,34 @@
+"""Add collection watermarks for incremental sync
+
+Revision ID: 8b41d6e2c9a7
+Revises: 3f9c2a7b1d04
+Create Date: 2025-09-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8b41d6e2c9a7'
+down_revision = '3f9c2a7b1d04'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('collection_watermarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('platform', sa.String(length=50), nullable=False),
+        sa.Column('filter_key', sa.String(length=200), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+        sa.Column('last_run_id', sa.Integer(), nullable=True),
+        sa.Column('last_full_reconcile_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('platform', 'filter_key', name='uq_collection_watermarks_platform_filter')
+    )
+    
+    op.create_index('ix_collection_watermarks_id', 'collection_watermarks', ['id'])
+
+def downgrade():
+    op.drop_index('ix_collection_watermarks_id', table_name='collection_watermarks')
+    op.drop_table('collection_watermarks')
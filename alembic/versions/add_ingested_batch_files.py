@@ -0,0 +1,37 @@
+"""Track ingested bulk batch files by name and content
+
+Revision ID: a7c3e9f1d482
+Revises: f4b8d2e6a915
+Create Date: 2025-10-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1d482'
+down_revision = 'f4b8d2e6a915'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Files loaded under the old mtime watermark are reloaded once; loads are idempotent
+    op.create_table('ingested_batch_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('platform', sa.String(length=50), nullable=False),
+        sa.Column('file_name', sa.String(length=255), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('file_mtime', sa.DateTime(), nullable=True),
+        sa.Column('run_id', sa.Integer(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('ingested_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('platform', 'file_name', 'sha256', name='uq_ingested_batch_files_platform_file')
+    )
+    
+    op.create_index('ix_ingested_batch_files_id', 'ingested_batch_files', ['id'])
+
+def downgrade():
+    op.drop_index('ix_ingested_batch_files_id', table_name='ingested_batch_files')
+    op.drop_table('ingested_batch_files')
@@ -0,0 +1,24 @@
+"""Add content hash change detection columns to opportunities
+
+Revision ID: e9a3c6d1f274
+Revises: d2f7b4c8e613
+Create Date: 2025-09-24 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e9a3c6d1f274'
+down_revision = 'd2f7b4c8e613'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Existing rows get their hash on the next sync that sees them
+    op.add_column('opportunities', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('opportunities', sa.Column('last_changed_fields', sa.JSON(), nullable=True))
+
+def downgrade():
+    op.drop_column('opportunities', 'last_changed_fields')
+    op.drop_column('opportunities', 'content_hash')
@@ -0,0 +1,48 @@
+"""Add indexed notice_id to rfqs, backfilled from source_url
+
+Revision ID: d2f7b4c8e613
+Revises: c5e8a1f3b920
+Create Date: 2025-09-23 09:00:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd2f7b4c8e613'
+down_revision = 'c5e8a1f3b920'
+branch_labels = None
+depends_on = None
+
+# SAM.gov URLs look like https://sam.gov/opp/{32-hex noticeId}/view; matched
+# case-insensitively like SAMService.extract_notice_id_from_url
+NOTICE_ID_IN_URL = re.compile(r'sam\.gov/opp/([a-f0-9]{32})', re.IGNORECASE)
+
+def upgrade():
+    op.add_column('rfqs', sa.Column('notice_id', sa.String(), nullable=True))
+    
+    # Backfilled in Python so it runs on every dialect. Notice IDs are stored in
+    # lower case, as the API returns them; if older rows share a notice, only the
+    # earliest keeps it so the unique index can build.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, source_url FROM rfqs WHERE source_url IS NOT NULL ORDER BY created_at, id"
+    ))
+    assigned = {}
+    for rfq_id, source_url in rows:
+        match = NOTICE_ID_IN_URL.search(source_url)
+        if match:
+            assigned.setdefault(match.group(1).lower(), rfq_id)
+    if assigned:
+        bind.execute(
+            sa.text("UPDATE rfqs SET notice_id = :notice_id WHERE id = :id"),
+            [{"notice_id": notice_id, "id": rfq_id} for notice_id, rfq_id in assigned.items()]
+        )
+    
+    op.create_index(op.f('ix_rfqs_notice_id'), 'rfqs', ['notice_id'], unique=True)
+
+def downgrade():
+    op.drop_index(op.f('ix_rfqs_notice_id'), table_name='rfqs')
+    op.drop_column('rfqs', 'notice_id')
@@ -0,0 +1,116 @@
+"""Range-partition opportunities by posted_date month (Postgres)
+
+Revision ID: f4b8d2e6a915
+Revises: e9a3c6d1f274
+Create Date: 2025-09-29 09:00:00.000000
+
+The table is rebuilt as a partitioned table with one partition per month of
+existing data through three months ahead, plus a default partition for rows
+without a posted date. Partitioned tables can only enforce unique keys that
+include the partition column, so:
+
+- the primary key on id is replaced by a plain index (id stays sequence-generated)
+- UNIQUE (solicitation_number) becomes UNIQUE NULLS NOT DISTINCT
+  (solicitation_number, posted_date), which needs Postgres 15+
+
+Other databases keep the plain table, and so does Postgres before 15 (the upgrade
+stops with an error there); the writers pick their conflict key from the schema.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8d2e6a915'
+down_revision = 'e9a3c6d1f274'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('ix_opportunities_id', ['id']),
+    ('ix_opportunities_title', ['title']),
+    ('ix_opportunities_solicitation_number', ['solicitation_number']),
+    ('ix_opportunities_posted_date', ['posted_date']),
+    ('ix_opportunities_agency', ['agency']),
+    ('ix_opportunities_psc_code', ['psc_code']),
+    ('ix_opportunities_source_platform', ['source_platform']),
+    ('ix_opportunities_status', ['status']),
+    ('ix_opportunities_is_product_related', ['is_product_related']),
+    ('ix_opportunities_is_duplicate', ['is_duplicate']),
+]
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def _move_id_sequence(bind, from_table, to_table):
+    # The id sequence belongs to the old table and would be dropped with it
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{from_table}', 'id')")).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {to_table}.id")
+
+def _create_indexes():
+    for name, columns in INDEXES:
+        op.create_index(name, 'opportunities', columns)
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if int(bind.execute(sa.text("SHOW server_version_num")).scalar_one()) < 150000:
+        raise RuntimeError("Partitioning opportunities needs Postgres 15+ (UNIQUE NULLS NOT DISTINCT)")
+
+    op.execute("ALTER TABLE opportunities RENAME TO opportunities_unpartitioned")
+    op.execute(
+        "CREATE TABLE opportunities (LIKE opportunities_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (posted_date)"
+    )
+    op.execute("CREATE TABLE opportunities_default PARTITION OF opportunities DEFAULT")
+
+    now = datetime.utcnow()
+    current = datetime(now.year, now.month, 1)
+    oldest = bind.execute(sa.text("SELECT min(posted_date) FROM opportunities_unpartitioned")).scalar()
+    month = min(datetime(oldest.year, oldest.month, 1), current) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE opportunities_{month:%Y_%m} PARTITION OF opportunities "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        month = upper
+
+    op.execute("INSERT INTO opportunities SELECT * FROM opportunities_unpartitioned")
+    _move_id_sequence(bind, 'opportunities_unpartitioned', 'opportunities')
+    op.execute("DROP TABLE opportunities_unpartitioned")
+
+    _create_indexes()
+    op.execute(
+        "CREATE UNIQUE INDEX uq_opportunities_solicitation_posted "
+        "ON opportunities (solicitation_number, posted_date) NULLS NOT DISTINCT"
+    )
+
+def downgrade():
+    # Partitions already detached by retention are not brought back
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE opportunities RENAME TO opportunities_partitioned")
+    op.execute("CREATE TABLE opportunities (LIKE opportunities_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO opportunities SELECT * FROM opportunities_partitioned")
+    _move_id_sequence(bind, 'opportunities_partitioned', 'opportunities')
+    op.execute("DROP TABLE opportunities_partitioned")
+
+    # The partitioned key allowed one row per posted date; keep the latest synced
+    op.execute(
+        "DELETE FROM opportunities WHERE id IN ("
+        "SELECT id FROM (SELECT id, row_number() OVER ("
+        "PARTITION BY solicitation_number ORDER BY last_sync_at DESC NULLS LAST, id DESC) AS rank "
+        "FROM opportunities) ranked WHERE rank > 1)"
+    )
+    op.create_primary_key('opportunities_pkey', 'opportunities', ['id'])
+    op.create_unique_constraint('opportunities_solicitation_number_key', 'opportunities', ['solicitation_number'])
+    _create_indexes()
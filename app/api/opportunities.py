@@ -2,12 +2,14 @@
 API endpoints for opportunity management and search
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_async_read_db
 from app.services.sam_service import sam_service
 from app.services.opportunity_service import opportunity_service
 from app.models.rfq import RFQ, RFQStatus
@@ -44,14 +46,15 @@ class OpportunityResponse(BaseModel):
 @router.get("/search", response_model=dict)
 async def search_opportunities(
     search: OpportunitySearch = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Search opportunities using multiple methods:
     1. Live search via SAM.gov API
     2. Search stored/cached opportunities
     
-    Supports keyword search, department filtering, and date ranges.
+    Supports keyword search, department filtering (case-insensitive substring of the
+    organization or department name), and date ranges.
     """
     try:
         # Calculate date range
@@ -78,7 +81,7 @@ async def search_opportunities(
         )
         
         # Also search local database for cached/imported opportunities
-        local_results = opportunity_service.search_opportunities(
+        local_results = await opportunity_service.search_opportunities_async(
             db=db,
             keyword=search.keyword,
             agency=search.department,
@@ -110,10 +113,7 @@ async def search_opportunities(
         api_notice_ids = set(opp.get('noticeId', '') for opp in api_results.get('opportunities', []))
         
         for rfq in local_results:
-            # Extract notice ID from source URL to check for duplicates
-            notice_id = sam_service.extract_notice_id_from_url(rfq.source_url or '')
-            
-            if notice_id not in api_notice_ids:
+            if rfq.notice_id not in api_notice_ids:
                 formatted_opportunities.append({
                     'id': str(rfq.id),
                     'title': rfq.title,
@@ -131,6 +131,7 @@ async def search_opportunities(
         return {
             'opportunities': formatted_opportunities,
             'total_results': api_results.get('totalRecords', 0) + len(local_results),
+            'total_is_estimate': api_results.get('totalIsEstimate', False),
             'page': search.page,
             'size': search.size,
             'search_params': {
@@ -252,9 +253,14 @@ async def manual_sync(
         else:
             sync_date = datetime.now() - timedelta(days=1)
         
-        # Get opportunities for the date
-        from app.services.sam_service import sam_service
-        opportunities = await sam_service.get_daily_opportunities(sync_date)
+        # Get opportunities for the date; pages that still fail after retries are reported
+        from app.services.sam_service import IncompleteFetchError, sam_service
+        missing_pages = []
+        try:
+            opportunities = await sam_service.get_daily_opportunities(sync_date)
+        except IncompleteFetchError as e:
+            opportunities = e.opportunities
+            missing_pages = e.failed_pages
         
         # Save to database
         count = await opportunity_service.bulk_save_opportunities(
@@ -262,8 +268,9 @@ async def manual_sync(
         )
         
         return {
-            'success': True,
+            'success': not missing_pages,
             'synced_count': count,
+            'missing_pages': missing_pages,
             'target_date': sync_date.strftime('%Y-%m-%d')
         }
         
@@ -275,7 +282,7 @@ async def manual_sync(
 @router.get("/{opportunity_id}")
 async def get_opportunity_details(
     opportunity_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get detailed opportunity information
@@ -284,15 +291,16 @@ async def get_opportunity_details(
     try:
         # Try to get from local database first
         if len(opportunity_id) == 32:  # SAM.gov notice ID format
-            rfq = opportunity_service.get_opportunity_by_notice_id(db, opportunity_id)
+            rfq = await opportunity_service.get_opportunity_by_notice_id_async(db, opportunity_id)
         else:
             # Try UUID format for local database
             try:
                 from uuid import UUID
-                UUID(opportunity_id)
-                rfq = db.query(RFQ).filter(RFQ.id == opportunity_id).first()
+                rfq_id = UUID(opportunity_id)
             except ValueError:
                 rfq = None
+            else:
+                rfq = (await db.execute(select(RFQ).where(RFQ.id == rfq_id))).scalars().first()
         
         # If not found locally, try SAM.gov API
         if not rfq and len(opportunity_id) == 32:
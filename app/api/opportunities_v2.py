@@ -3,17 +3,20 @@ Enhanced API endpoints for comprehensive opportunity management
 Supports multi-platform data collection from SAM.gov, GSA eBuy, and DIBBS
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, text
-from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, func, select, text
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_async_read_db
 from app.models.opportunity import Opportunity, CollectionRun, PSCCode
 from app.services.data_collector import data_collector
 from app.services.data_deduplication import deduplicator, standardizer
 from app.services.scheduler import scheduler_service
+from app.services.backfill import run_backfill, get_backfill_status
 
 router = APIRouter(prefix="/opportunities", tags=["opportunities"])
 
@@ -64,6 +67,13 @@ class ManualCollectionRequest(BaseModel):
     platforms: Optional[List[str]] = None  # ["SAM", "GSA_EBUY", "DIBBS"]
     force_refresh: bool = False
 
+class BackfillRequest(BaseModel):
+    start_date: datetime
+    end_date: datetime
+    concurrency: Optional[int] = None
+    restart: bool = False  # Ignore checkpoints and re-ingest every day
+    load_mode: Optional[Literal["upsert", "copy"]] = None  # Defaults to INGEST_LOAD_MODE
+
 @router.get("/search", response_model=Dict[str, Any])
 async def search_opportunities_v2(
     keyword: Optional[str] = Query(None, description="Search in title and description"),
@@ -75,7 +85,7 @@ async def search_opportunities_v2(
     page: int = Query(0, description="Page number (0-indexed)"),
     sort_by: str = Query("posted_date", description="Sort by: posted_date, relevance, deadline"),
     sort_order: str = Query("desc", description="Sort order: desc, asc"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Advanced opportunity search with multi-platform data
@@ -83,7 +93,7 @@ async def search_opportunities_v2(
     """
     try:
         # Build base query
-        query = db.query(Opportunity).filter(
+        query = select(Opportunity).where(
             and_(
                 Opportunity.is_duplicate == False,
                 Opportunity.status == 'active'
@@ -92,7 +102,7 @@ async def search_opportunities_v2(
         
         # Filter to products only if requested
         if products_only:
-            query = query.filter(Opportunity.is_product_related == True)
+            query = query.where(Opportunity.is_product_related == True)
         
         # Keyword search
         if keyword:
@@ -101,24 +111,24 @@ async def search_opportunities_v2(
                 Opportunity.description.ilike(f"%{keyword}%"),
                 Opportunity.solicitation_number.ilike(f"%{keyword}%")
             )
-            query = query.filter(keyword_filter)
+            query = query.where(keyword_filter)
         
         # Agency filter
         if agency:
-            query = query.filter(Opportunity.agency.ilike(f"%{agency}%"))
+            query = query.where(Opportunity.agency.ilike(f"%{agency}%"))
         
         # PSC codes filter
         if psc_codes:
             psc_list = [code.strip() for code in psc_codes.split(",")]
-            query = query.filter(Opportunity.psc_code.in_(psc_list))
+            query = query.where(Opportunity.psc_code.in_(psc_list))
         
         # Date range filter
         if posted_days_ago:
             cutoff_date = datetime.utcnow() - timedelta(days=posted_days_ago)
-            query = query.filter(Opportunity.posted_date >= cutoff_date)
+            query = query.where(Opportunity.posted_date >= cutoff_date)
         
         # Get total count before pagination
-        total_count = query.count()
+        total_count = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
         
         # Apply sorting
         if sort_by == "posted_date":
@@ -137,7 +147,7 @@ async def search_opportunities_v2(
         
         # Apply pagination
         offset = page * size
-        opportunities = query.offset(offset).limit(size).all()
+        opportunities = (await db.execute(query.offset(offset).limit(size))).scalars().all()
         
         # Format response
         formatted_opportunities = []
@@ -191,53 +201,40 @@ async def search_opportunities_v2(
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @router.get("/collection-status", response_model=CollectionStatus)
-async def get_collection_status(db: Session = Depends(get_db)):
+async def get_collection_status(db: AsyncSession = Depends(get_async_read_db)):
     """Get status of data collection from all platforms"""
     try:
-        # Get total opportunities count
-        total_opportunities = db.query(func.count(Opportunity.id)).filter(
-            and_(
-                Opportunity.is_duplicate == False,
-                Opportunity.status == 'active'
-            )
-        ).scalar()
+        active = and_(
+            Opportunity.is_duplicate == False,
+            Opportunity.status == 'active'
+        )
         
-        # Get today's new opportunities
+        # Total, today's new and product-related counts in one pass
         today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        new_today = db.query(func.count(Opportunity.id)).filter(
-            and_(
-                Opportunity.created_at >= today_start,
-                Opportunity.is_duplicate == False,
-                Opportunity.status == 'active'
-            )
-        ).scalar()
-        
-        # Get product-related count
-        product_related = db.query(func.count(Opportunity.id)).filter(
-            and_(
-                Opportunity.is_product_related == True,
-                Opportunity.is_duplicate == False,
-                Opportunity.status == 'active'
-            )
-        ).scalar()
+        total_opportunities, new_today, product_related = (await db.execute(
+            select(
+                func.count(Opportunity.id),
+                func.count(Opportunity.id).filter(Opportunity.created_at >= today_start),
+                func.count(Opportunity.id).filter(Opportunity.is_product_related == True)
+            ).where(active)
+        )).one()
         
         # Get platform breakdown
-        platform_results = db.query(
-            Opportunity.source_platform,
-            func.count(Opportunity.id)
-        ).filter(
-            and_(
-                Opportunity.is_duplicate == False,
-                Opportunity.status == 'active'
-            )
-        ).group_by(Opportunity.source_platform).all()
+        platform_results = (await db.execute(
+            select(
+                Opportunity.source_platform,
+                func.count(Opportunity.id)
+            ).where(active).group_by(Opportunity.source_platform)
+        )).all()
         
         platforms = {platform: count for platform, count in platform_results}
         
         # Get last successful collection run
-        last_run = db.query(CollectionRun).filter(
-            CollectionRun.status == 'completed'
-        ).order_by(desc(CollectionRun.completed_at)).first()
+        last_run = (await db.execute(
+            select(CollectionRun).where(
+                CollectionRun.status == 'completed'
+            ).order_by(desc(CollectionRun.completed_at)).limit(1)
+        )).scalars().first()
         
         return CollectionStatus(
             total_opportunities=total_opportunities,
@@ -264,7 +261,7 @@ async def trigger_manual_collection(
         return {
             'success': True,
             'message': 'Manual collection started',
-            'platforms': request.platforms or ['SAM', 'GSA_EBUY'],
+            'platforms': request.platforms or ['SAM', 'GSA_EBUY', 'DIBBS'],
             'force_refresh': request.force_refresh,
             'estimated_completion': '5-15 minutes'
         }
@@ -275,7 +272,7 @@ async def trigger_manual_collection(
 async def run_manual_collection(platforms: Optional[List[str]], force_refresh: bool):
     """Background task for manual collection"""
     try:
-        results = await data_collector.run_daily_collection()
+        results = await data_collector.run_daily_collection(mode="full" if force_refresh else "incremental")
         # Log results or send notification
         print(f"Manual collection completed: {results}")
     except Exception as e:
@@ -318,6 +315,52 @@ async def run_deduplication_task(limit: int):
     except Exception as e:
         print(f"Deduplication failed: {str(e)}")
 
+@router.post("/backfill")
+async def trigger_backfill(
+    request: BackfillRequest,
+    background_tasks: BackgroundTasks = BackgroundTasks()
+):
+    """Backfill SAM.gov opportunities for a posting-date range, resuming from checkpoints"""
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    
+    try:
+        background_tasks.add_task(run_backfill_task, request)
+        
+        return {
+            'success': True,
+            'message': 'Backfill started',
+            'start_date': request.start_date.strftime('%Y-%m-%d'),
+            'end_date': request.end_date.strftime('%Y-%m-%d'),
+            'days': (request.end_date.date() - request.start_date.date()).days + 1,
+            'restart': request.restart
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start backfill: {str(e)}")
+
+async def run_backfill_task(request: BackfillRequest):
+    """Background task for date-range backfill"""
+    try:
+        results = await run_backfill(
+            request.start_date, request.end_date, request.concurrency, request.restart, request.load_mode
+        )
+        print(f"Backfill completed: {results['completed']} days, {results['failed']} failed")
+    except Exception as e:
+        print(f"Backfill failed: {str(e)}")
+
+@router.get("/backfill-status")
+async def get_backfill_progress(
+    start_date: datetime = Query(..., description="First posting date"),
+    end_date: datetime = Query(..., description="Last posting date")
+):
+    """Get per-day checkpoint status for a backfill range"""
+    try:
+        # Checkpoints are read through the sync (replica) session; keep it off the event loop
+        return await run_in_threadpool(get_backfill_status, start_date, end_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get backfill status: {str(e)}")
+
 @router.get("/platforms")
 async def get_supported_platforms():
     """Get list of supported government platforms"""
@@ -347,27 +390,27 @@ async def get_supported_platforms():
                 'description': 'Defense Logistics Agency procurement platform',
                 'data_types': ['RFQ', 'IFB'],
                 'classification_system': 'NSN/FSC Codes',
-                'update_frequency': 'Pending API access',
-                'status': 'pending'
+                'update_frequency': 'Daily at 6:00 AM EST from bulk RFQ batch files',
+                'status': 'active'
             }
         ],
         'total_platforms': 3,
-        'active_platforms': 2
+        'active_platforms': 3
     }
 
 @router.get("/psc-codes")
 async def get_psc_codes(
     is_product_only: bool = Query(True, description="Filter to product-related PSC codes only"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get list of Product Service Codes used for filtering"""
     try:
-        query = db.query(PSCCode).filter(PSCCode.status == 'active')
+        query = select(PSCCode).where(PSCCode.status == 'active')
         
         if is_product_only:
-            query = query.filter(PSCCode.is_product_code == True)
+            query = query.where(PSCCode.is_product_code == True)
         
-        psc_codes = query.order_by(PSCCode.psc_code).all()
+        psc_codes = (await db.scalars(query.order_by(PSCCode.psc_code))).all()
         
         formatted_codes = []
         for psc in psc_codes:
@@ -391,13 +434,11 @@ async def get_psc_codes(
 @router.get("/{opportunity_id}", response_model=Dict[str, Any])
 async def get_opportunity_details(
     opportunity_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed information for a specific opportunity"""
     try:
-        opportunity = db.query(Opportunity).filter(
-            Opportunity.id == opportunity_id
-        ).first()
+        opportunity = await db.get(Opportunity, opportunity_id)
         
         if not opportunity:
             raise HTTPException(status_code=404, detail="Opportunity not found")
@@ -405,9 +446,7 @@ async def get_opportunity_details(
         # Get master record if this is marked as duplicate
         master_opportunity = None
         if opportunity.is_duplicate and opportunity.master_opportunity_id:
-            master_opportunity = db.query(Opportunity).filter(
-                Opportunity.id == opportunity.master_opportunity_id
-            ).first()
+            master_opportunity = await db.get(Opportunity, opportunity.master_opportunity_id)
         
         return {
             'opportunity': OpportunityResponse.from_orm(opportunity).dict(),
@@ -417,7 +456,8 @@ async def get_opportunity_details(
             'collection_info': {
                 'collected_at': opportunity.created_at.isoformat(),
                 'last_updated': opportunity.updated_at.isoformat(),
-                'last_synced': opportunity.last_sync_at.isoformat() if opportunity.last_sync_at else None
+                'last_synced': opportunity.last_sync_at.isoformat() if opportunity.last_sync_at else None,
+                'last_changed_fields': opportunity.last_changed_fields
             }
         }
         
@@ -0,0 +1,95 @@
+"""
+Command-line entry points for offline data maintenance
+
+    python -m app.cli replay --from 2025-09-01 --to 2025-09-30
+    python -m app.cli backfill --from 2024-10-01 --to 2025-09-30 --load-mode copy
+    python -m app.cli partitions --retention
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+
+def _parse_day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+LOAD_MODES = ["upsert", "copy"]
+
+def replay_command(args: argparse.Namespace):
+    from app.services.raw_archive import replay_archive
+
+    results = asyncio.run(replay_archive(args.start, args.end, args.platform or None, args.load_mode))
+    for platform, platform_results in results.items():
+        print(
+            f"{platform}: {platform_results['total_fetched']} records replayed, "
+            f"{platform_results['new_opportunities']} new, "
+            f"{platform_results['updated_opportunities']} updated "
+            f"in {platform_results['elapsed_seconds']:.1f}s"
+        )
+
+def backfill_command(args: argparse.Namespace):
+    from app.services.backfill import run_backfill
+
+    results = asyncio.run(run_backfill(args.start, args.end, args.concurrency, args.restart, args.load_mode))
+    print(
+        f"{results['completed']} days completed, {results['failed']} failed, "
+        f"{results['skipped']} already done; {results['total_fetched']} records fetched, "
+        f"{results['new_opportunities']} new"
+    )
+    for shard in results["shards"]:
+        if shard["status"] == "failed":
+            print(f"  {shard['date']}: {shard['error']}")
+    if results["failed"]:
+        raise SystemExit(1)
+
+def partitions_command(args: argparse.Namespace):
+    from app.core.database import SessionLocal
+    from app.services.opportunity_partitions import partition_service
+
+    with SessionLocal() as db:
+        created = partition_service.ensure_partitions(db, args.months_ahead)
+        print(f"{len(created)} partitions created" + (f": {', '.join(created)}" if created else ""))
+        if args.retention:
+            results = partition_service.apply_retention(db, args.retention_months, False if args.drop else None)
+            print(
+                f"Retention before {results['cutoff']}: {len(results['partitions'])} partitions retired, "
+                f"{results['rows_deleted']} rows deleted"
+            )
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="RFQ Intelligence data maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    replay = subparsers.add_parser("replay", help="Re-ingest archived SAM.gov pages from disk")
+    replay.add_argument("--from", dest="start", type=_parse_day, required=True, help="First fetch date (YYYY-MM-DD)")
+    replay.add_argument("--to", dest="end", type=_parse_day, required=True, help="Last fetch date (YYYY-MM-DD)")
+    replay.add_argument("--platform", action="append", choices=["SAM", "GSA_EBUY", "RFQ"],
+                        help="Limit to a platform, or RFQ for daily-sync pages (repeatable)")
+    replay.add_argument("--load-mode", choices=LOAD_MODES, help="Database load mode (defaults to INGEST_LOAD_MODE)")
+    replay.set_defaults(handler=replay_command)
+
+    backfill = subparsers.add_parser("backfill", help="Ingest SAM.gov history by posting date, resuming from checkpoints")
+    backfill.add_argument("--from", dest="start", type=_parse_day, required=True, help="First posting date (YYYY-MM-DD)")
+    backfill.add_argument("--to", dest="end", type=_parse_day, required=True, help="Last posting date (YYYY-MM-DD)")
+    backfill.add_argument("--concurrency", type=int, help="Day shards to run at once")
+    backfill.add_argument("--restart", action="store_true", help="Ignore checkpoints and re-ingest every day")
+    backfill.add_argument("--load-mode", choices=LOAD_MODES,
+                          help="Database load mode: copy bulk-loads through a staging table (defaults to INGEST_LOAD_MODE)")
+    backfill.set_defaults(handler=backfill_command)
+
+    partitions = subparsers.add_parser("partitions", help="Create upcoming opportunity partitions and apply retention")
+    partitions.add_argument("--months-ahead", type=int, help="Future months to keep ready")
+    partitions.add_argument("--retention", action="store_true", help="Also retire months past the retention window")
+    partitions.add_argument("--retention-months", type=int, help="Months of postings to keep")
+    partitions.add_argument("--drop", action="store_true", help="Drop expired partitions instead of archiving them")
+    partitions.set_defaults(handler=partitions_command)
+
+    return parser
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = build_parser().parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
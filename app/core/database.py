@@ -1,16 +1,88 @@
+from typing import Any, Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.db_instrumentation import instrument_engine
+from app.core.db_routing import RoutingSession
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-)
+# Async drivers for the request path, by backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
+
+def get_async_database_url(url: str) -> str:
+    """Same database as ``url`` through its async driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def get_engine_options(url: str, statement_timeout: bool = False) -> Dict[str, Any]:
+    """
+    Pool and session options from settings; SQLite keeps SQLAlchemy's defaults
+
+    ``statement_timeout`` applies DB_STATEMENT_TIMEOUT_MS. Only the request-path
+    engines use it: collectors, bulk loads and partition maintenance run on the
+    sync engine and may legitimately take longer.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options: Dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+    if backend == "postgresql" and statement_timeout and settings.DB_STATEMENT_TIMEOUT_MS:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+# Create database engine (SQL is not echoed; slow statements are logged by db_instrumentation)
+engine = create_engine(settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL))
+
+# Async engine for API endpoints, so queries don't block the event loop
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL, statement_timeout=True))
+
+# Optional read replica for read-only endpoints and report jobs
+replica_engine = None
+async_replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL, **get_engine_options(settings.DATABASE_REPLICA_URL))
+    ASYNC_DATABASE_REPLICA_URL = get_async_database_url(settings.DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL, **get_engine_options(ASYNC_DATABASE_REPLICA_URL, statement_timeout=True)
+    )
+
+for instrumented in (engine, async_engine, replica_engine, async_replica_engine):
+    if instrumented is not None:
+        instrument_engine(getattr(instrumented, "sync_engine", instrumented))
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+# Read sessions: SELECTs go to the replica while it is fresh; any write pins the session to the primary
+ReadSessionLocal = sessionmaker(class_=RoutingSession, primary=engine, replica=replica_engine, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    primary=async_engine.sync_engine,
+    replica=async_replica_engine.sync_engine if async_replica_engine else None,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Create base class for models
 Base = declarative_base()
@@ -21,4 +93,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session (async endpoints)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get a read-only database session (replica when configured and fresh)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async read-only database session (replica when configured and fresh)
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,80 @@
+"""
+Per-request database instrumentation and sampled slow-query logging
+
+Engine events time every statement. Inside an HTTP request (see the middleware
+in app.main) the counts land in a context-local RequestDBStats, which is
+reported as response headers and log fields; statements slower than
+DB_SLOW_QUERY_MS are logged for a DB_SLOW_QUERY_SAMPLE_RATE sample.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestDBStats:
+    """Database work done while serving one request"""
+    queries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+# Stats of the request being served; None outside requests (jobs, CLI)
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+# Engine-wide totals for /metrics
+totals: Dict[str, Any] = {"queries": 0, "seconds": 0.0, "slow_queries": 0}
+
+def start_request_stats() -> RequestDBStats:
+    """Begin collecting stats for the current request context"""
+    stats = RequestDBStats()
+    _request_stats.set(stats)
+    return stats
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    return _request_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+
+    totals["queries"] += 1
+    totals["seconds"] += elapsed
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        totals["slow_queries"] += 1
+        if random.random() < settings.DB_SLOW_QUERY_SAMPLE_RATE:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f}ms{', executemany' if executemany else ''}): {' '.join(statement.split())[:1000]}")
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine: Engine):
+    """Attach timing events to a (sync) engine; for async engines pass ``sync_engine``"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def get_stats() -> Dict[str, Any]:
+    return {**totals, "seconds": round(totals["seconds"], 3)}
@@ -0,0 +1,92 @@
+"""
+Read-replica routing with a lag-aware fallback to the primary
+
+Read-only endpoints and report jobs use sessions of class RoutingSession. Their
+SELECTs go to the replica (DATABASE_REPLICA_URL) while its replay lag is within
+DB_REPLICA_MAX_LAG_SECONDS. Anything else (DML, flushes) goes to the primary,
+and so does everything after it in the same session, so a session reads its own
+writes. Write paths keep using the plain primary sessions.
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+POSTGRES_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaHealth:
+    """Cached replay-lag checks per replica engine"""
+
+    def __init__(self):
+        self._checks: Dict[Engine, Dict[str, Any]] = {}
+        self.stats = {"replica_reads": 0, "primary_fallbacks": 0, "lag_checks": 0, "lag_check_errors": 0}
+
+    def usable(self, replica: Engine) -> bool:
+        """Whether reads may go to ``replica``, re-measuring its lag when the last check is stale"""
+        check = self._checks.get(replica)
+        if check is None or time.monotonic() - check["checked_at"] >= settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            check = self._measure(replica)
+        return check["lag_seconds"] is not None and check["lag_seconds"] <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+    def _measure(self, replica: Engine) -> Dict[str, Any]:
+        self.stats["lag_checks"] += 1
+        lag_seconds = None
+        try:
+            if replica.dialect.name == "postgresql":
+                with replica.connect() as connection:
+                    lag_seconds = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+            else:
+                lag_seconds = 0.0
+        except Exception as e:
+            self.stats["lag_check_errors"] += 1
+            logger.warning(f"Replica lag check failed, reading from the primary: {str(e)}")
+
+        if lag_seconds is not None and lag_seconds > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            logger.warning(f"Replica is {lag_seconds:.1f}s behind, reading from the primary")
+        check = {"checked_at": time.monotonic(), "lag_seconds": lag_seconds}
+        self._checks[replica] = check
+        return check
+
+    def get_stats(self) -> Dict[str, Any]:
+        lags = [check["lag_seconds"] for check in self._checks.values()]
+        return {**self.stats, "lag_seconds": max(lags, key=lambda lag: -1 if lag is None else lag) if lags else None}
+
+# Global health tracker
+replica_health = ReplicaHealth()
+
+class RoutingSession(Session):
+    """Session that reads from a replica and writes (then keeps reading) from the primary"""
+
+    def __init__(self, primary: Engine, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.pinned_to_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is None or self.pinned_to_primary:
+            return self.primary
+        if self._flushing or not isinstance(clause, (Select, CompoundSelect)):
+            # Writes, and anything that might be one, pin the session for read-your-writes
+            self.pinned_to_primary = True
+            return self.primary
+        if replica_health.usable(self.replica):
+            replica_health.stats["replica_reads"] += 1
+            return self.replica
+        replica_health.stats["primary_fallbacks"] += 1
+        return self.primary
@@ -0,0 +1,116 @@
+"""
+Shared, app-scoped HTTP client for outbound API calls (SAM.gov and collectors)
+"""
+import time
+import logging
+from typing import Dict, Any, Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooling transport that records pool wait time and connection reuse"""
+
+    def __init__(self, stats: Dict[str, Any], **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        state = {"acquired_at": None, "new_connection": False}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            # The first connection-level event marks the point the pool handed us a connection
+            if state["acquired_at"] is None and event_name.endswith(".started"):
+                state["acquired_at"] = time.perf_counter()
+            if event_name == "connection.connect_tcp.started":
+                state["new_connection"] = True
+
+        request.extensions["trace"] = trace
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            acquired_at = state["acquired_at"] or time.perf_counter()
+            self._stats["requests"] += 1
+            self._stats["pool_wait_seconds"] += acquired_at - started
+            if state["new_connection"]:
+                self._stats["connections_opened"] += 1
+            else:
+                self._stats["connections_reused"] += 1
+
+class HTTPClientManager:
+    """Owns the single pooled httpx.AsyncClient shared by all services"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = self._empty_stats()
+
+    def _empty_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "pool_wait_seconds": 0.0
+        }
+
+    def _build_client(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT
+        )
+
+        if transport is None:
+            transport = _InstrumentedTransport(
+                self.stats,
+                http2=settings.HTTP2_ENABLED,
+                limits=limits
+            )
+
+        return httpx.AsyncClient(transport=transport, timeout=timeout, limits=limits)
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Create the shared client (called from the FastAPI lifespan)
+
+        Args:
+            transport: Optional transport override, e.g. an ASGI transport for local testing
+        """
+        if self._client is not None and not self._client.is_closed:
+            return
+        self._client = self._build_client(transport)
+        logger.info("Shared HTTP client started")
+
+    async def close(self):
+        """Close the shared client and release pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Shared HTTP client closed")
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared client, creating it lazily when running outside the app
+        lifespan (scheduler jobs, scripts)
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool counters"""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "avg_pool_wait_ms": (self.stats["pool_wait_seconds"] / requests * 1000) if requests else 0.0,
+            "reuse_ratio": (self.stats["connections_reused"] / requests) if requests else 0.0
+        }
+
+# Global client manager
+http_client = HTTPClientManager()
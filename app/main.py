@@ -1,16 +1,29 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from app.core import db_instrumentation
 from app.core.config import settings
+from app.core.database import async_engine, async_replica_engine, engine, replica_engine
+from app.core.db_routing import replica_health
+from app.core.http_client import http_client
+from app.services.sam_service import sam_service
 from app.api.opportunities import router as opportunities_router
 from app.api.opportunities_v2 import router as opportunities_v2_router
 from app.auth.routes import router as auth_router
 
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await http_client.start()
     yield
     # Shutdown
+    await http_client.close()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
 
 app = FastAPI(
     title="RFQ Intelligence API",
@@ -30,6 +43,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def database_stats(request: Request, call_next):
+    """Report each request's query count and DB time as headers and log fields"""
+    stats = db_instrumentation.start_request_stats()
+    response = await call_next(request)
+    response.headers["X-DB-Query-Count"] = str(stats.queries)
+    response.headers["X-DB-Time-Ms"] = f"{stats.milliseconds:.1f}"
+    logger.info(
+        f"{request.method} {request.url.path} status={response.status_code} "
+        f"db_queries={stats.queries} db_time_ms={stats.milliseconds:.1f}",
+        extra={"db_queries": stats.queries, "db_time_ms": round(stats.milliseconds, 1)}
+    )
+    return response
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["authentication"])
 app.include_router(opportunities_router, prefix="/api/v1")  # Legacy API
@@ -43,6 +70,25 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "http_client": http_client.get_stats(),
+        "sam_search_cache": sam_service.search_cache.get_stats(),
+        "sam_opportunity_cache": sam_service.opportunity_cache.get_stats(),
+        "sam_concurrency": sam_service.concurrency.get_stats(),
+        "database": {
+            **db_instrumentation.get_stats(),
+            "pool": engine.pool.status(),
+            "async_pool": async_engine.pool.status(),
+            "replica": {
+                **replica_health.get_stats(),
+                "pool": replica_engine.pool.status(),
+                "async_pool": async_replica_engine.pool.status()
+            } if replica_engine is not None else None
+        }
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
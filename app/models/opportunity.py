@@ -1,9 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Boolean, Float, JSON, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# On Postgres opportunities is range-partitioned by month on this column (see
+# app/services/opportunity_partitions.py). Unique keys of a partitioned table must
+# include it, so upserts there conflict on (solicitation_number, posted_date).
+#
+# The Opportunity model below describes the plain table that create_all builds
+# (SQLite, unmigrated databases). On a partitioned table the migration replaces
+# the id primary key with a plain index and UNIQUE (solicitation_number) with
+# UNIQUE NULLS NOT DISTINCT (solicitation_number, posted_date). The ORM keeps id
+# as its identity key (still sequence-generated and unique in practice), and the
+# writer reads the conflict key from the live schema (conflict_columns), not
+# from this model. Never create_all against a partitioned database; use alembic.
+OPPORTUNITY_PARTITION_KEY = "posted_date"
+
 class Opportunity(Base):
     __tablename__ = "opportunities"
     
@@ -61,6 +74,10 @@ class Opportunity(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_sync_at = Column(DateTime)
     
+    # Change detection: hash of the mapped source fields and what the last amendment changed
+    content_hash = Column(String(64))
+    last_changed_fields = Column(JSON)  # e.g. ["response_deadline", "description"]
+    
     def __repr__(self):
         return f"<Opportunity(id={self.id}, title='{self.title[:50]}...', source='{self.source_platform}')>"
 
@@ -85,6 +102,7 @@ class CollectionRun(Base):
     error_messages = Column(JSON)
     processing_time_seconds = Column(Float)
     filters_applied = Column(JSON)
+    psc_timings = Column(JSON)  # Per-query fetch stats: {psc prefix or filter key: {seconds, fetched, new, updated, error}}
     
     # Metadata
     started_at = Column(DateTime)
@@ -93,6 +111,76 @@ class CollectionRun(Base):
     def __repr__(self):
         return f"<CollectionRun(id={self.id}, platform='{self.platform}', status='{self.status}')>"
 
+class CollectionWatermark(Base):
+    __tablename__ = "collection_watermarks"
+    __table_args__ = (UniqueConstraint("platform", "filter_key", name="uq_collection_watermarks_platform_filter"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Scope: one high-water mark per platform and filter set
+    platform = Column(String(50), nullable=False)  # SAM, DIBBS, GSA_EBUY
+    filter_key = Column(String(200), nullable=False)  # e.g. "psc=58;noticeType=o,k"
+    
+    # Latest posted date seen by a successful run; incremental runs start here minus an overlap
+    high_water_mark = Column(DateTime)
+    last_run_id = Column(Integer)  # CollectionRun that last advanced this mark
+    last_full_reconcile_at = Column(DateTime)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CollectionWatermark(platform='{self.platform}', filter_key='{self.filter_key}', high_water_mark={self.high_water_mark})>"
+
+class IngestedBatchFile(Base):
+    __tablename__ = "ingested_batch_files"
+    __table_args__ = (UniqueConstraint("platform", "file_name", "sha256", name="uq_ingested_batch_files_platform_file"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Identity: a file counts as loaded when its name and content match a row here
+    platform = Column(String(50), nullable=False)  # DIBBS
+    file_name = Column(String(255), nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    file_mtime = Column(DateTime)  # Lets unchanged files skip rehashing
+    
+    # Load results
+    run_id = Column(Integer)  # CollectionRun that loaded the file
+    total_rows = Column(Integer, default=0)
+    ingested_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<IngestedBatchFile(platform='{self.platform}', file_name='{self.file_name}', file_size={self.file_size})>"
+
+class BackfillCheckpoint(Base):
+    __tablename__ = "backfill_checkpoints"
+    __table_args__ = (UniqueConstraint("platform", "shard_date", name="uq_backfill_checkpoints_platform_date"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # One shard per platform and posting day
+    platform = Column(String(50), nullable=False)  # SAM
+    shard_date = Column(DateTime, nullable=False)
+    status = Column(String(20), default="pending")  # pending, running, completed, failed
+    
+    # Resume point: every upstream page before next_page is committed
+    next_page = Column(Integer, default=0)
+    
+    # Statistics
+    total_fetched = Column(Integer, default=0)
+    new_opportunities = Column(Integer, default=0)
+    updated_opportunities = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    
+    # Metadata
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<BackfillCheckpoint(platform='{self.platform}', shard_date={self.shard_date}, status='{self.status}', next_page={self.next_page})>"
+
 # Product Service Code mapping for better filtering
 class PSCCode(Base):
     __tablename__ = "psc_codes"
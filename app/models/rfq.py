@@ -35,6 +35,7 @@ class RFQ(Base):
     # Source Information
     source = Column(Enum(RFQSource), nullable=False)
     source_url = Column(String)
+    notice_id = Column(String, unique=True, index=True)  # SAM.gov noticeId, for set-based existence checks
     original_document_path = Column(String)
     
     # RFQ Details
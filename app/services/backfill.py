@@ -0,0 +1,186 @@
+"""
+Resumable date-range backfill of SAM.gov opportunities
+
+The range is split into one shard per posting day. Shards run concurrently
+through the streaming ingest pipeline, so upstream calls share SAMService's rate
+limit and adaptive concurrency. Each shard keeps a BackfillCheckpoint row with
+the next uncommitted page; a killed or failed backfill resumes from there.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.models.opportunity import BackfillCheckpoint
+
+logger = logging.getLogger(__name__)
+
+PLATFORM = "SAM"
+
+def shard_dates(start_date: datetime, end_date: datetime) -> List[datetime]:
+    """Posting days in an inclusive range, oldest first"""
+    day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    days = []
+    while day <= end_date:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def load_checkpoints(start_date: datetime, end_date: datetime,
+                     replica: bool = False) -> Dict[datetime, BackfillCheckpoint]:
+    """
+    Existing checkpoints for a date range, keyed by shard date
+
+    Args:
+        start_date: First shard date (inclusive)
+        end_date: Last shard date (inclusive)
+        replica: Read from the read replica (status reports); resuming a backfill
+            must see its own checkpoint writes, so it reads the primary
+    """
+    with (ReadSessionLocal() if replica else SessionLocal()) as db:
+        checkpoints = db.query(BackfillCheckpoint).filter(
+            BackfillCheckpoint.platform == PLATFORM,
+            BackfillCheckpoint.shard_date >= start_date,
+            BackfillCheckpoint.shard_date <= end_date
+        ).all()
+        db.expunge_all()
+    return {checkpoint.shard_date: checkpoint for checkpoint in checkpoints}
+
+def _update_checkpoint(shard_date: datetime, **values) -> BackfillCheckpoint:
+    """Upsert one shard's checkpoint row in its own short transaction"""
+    with SessionLocal() as db:
+        checkpoint = db.query(BackfillCheckpoint).filter(
+            BackfillCheckpoint.platform == PLATFORM,
+            BackfillCheckpoint.shard_date == shard_date
+        ).first()
+        if not checkpoint:
+            checkpoint = BackfillCheckpoint(platform=PLATFORM, shard_date=shard_date, next_page=0, attempts=0)
+            db.add(checkpoint)
+        for key, value in values.items():
+            setattr(checkpoint, key, value)
+        db.commit()
+        db.refresh(checkpoint)
+        db.expunge(checkpoint)
+    return checkpoint
+
+async def _run_shard(shard_date: datetime, restart: bool, load_mode: Optional[str] = None) -> Dict[str, Any]:
+    from app.services.ingest_pipeline import ingest_daily_opportunities
+
+    existing = load_checkpoints(shard_date, shard_date).get(shard_date)
+    start_page = 0 if restart or not existing else existing.next_page or 0
+    _update_checkpoint(
+        shard_date,
+        status="running",
+        next_page=start_page,
+        attempts=(existing.attempts or 0) + 1 if existing else 1,
+        last_error=None,
+        started_at=datetime.utcnow()
+    )
+    day = shard_date.strftime("%Y-%m-%d")
+    if start_page:
+        logger.info(f"Resuming backfill shard {day} from page {start_page}")
+
+    try:
+        results = await ingest_daily_opportunities(
+            shard_date,
+            start_page=start_page,
+            on_pages_committed=lambda page: _update_checkpoint(shard_date, next_page=page + 1),
+            load_mode=load_mode
+        )
+    except Exception as e:
+        logger.error(f"Backfill shard {day} failed: {str(e)}")
+        _update_checkpoint(shard_date, status="failed", last_error=str(e))
+        return {"date": day, "status": "failed", "error": str(e)}
+
+    # Counts cover the final attempt; earlier attempts' pages are already committed
+    _update_checkpoint(
+        shard_date,
+        status="completed",
+        total_fetched=results["total_fetched"],
+        new_opportunities=results["new_opportunities"],
+        updated_opportunities=results["updated_opportunities"],
+        completed_at=datetime.utcnow()
+    )
+    return {
+        "date": day,
+        "status": "completed",
+        "start_page": start_page,
+        "total_fetched": results["total_fetched"],
+        "new_opportunities": results["new_opportunities"],
+        "updated_opportunities": results["updated_opportunities"]
+    }
+
+async def run_backfill(
+    start_date: datetime,
+    end_date: datetime,
+    concurrency: Optional[int] = None,
+    restart: bool = False,
+    load_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Backfill SAM.gov opportunities for an inclusive posting-date range
+    
+    Args:
+        start_date: First posting day
+        end_date: Last posting day
+        concurrency: Day shards to run at once (defaults to BACKFILL_SHARD_CONCURRENCY)
+        restart: Re-ingest completed shards and start every shard from page 0
+        load_mode: "upsert" or "copy" (defaults to INGEST_LOAD_MODE); copy
+            bulk-loads each shard through a staging table
+        
+    Returns:
+        Shard counts and per-shard results
+    """
+    days = shard_dates(start_date, end_date)
+    checkpoints = load_checkpoints(days[0], days[-1]) if days and not restart else {}
+    pending = [day for day in days if getattr(checkpoints.get(day), "status", None) != "completed"]
+    slots = asyncio.Semaphore(concurrency or settings.BACKFILL_SHARD_CONCURRENCY)
+
+    logger.info(
+        f"Backfilling {len(pending)} of {len(days)} days "
+        f"({start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')})"
+    )
+
+    async def run_shard(day: datetime) -> Dict[str, Any]:
+        async with slots:
+            return await _run_shard(day, restart, load_mode)
+
+    shards = await asyncio.gather(*(run_shard(day) for day in pending))
+    completed = [shard for shard in shards if shard["status"] == "completed"]
+
+    return {
+        "days": len(days),
+        "skipped": len(days) - len(pending),
+        "completed": len(completed),
+        "failed": len(shards) - len(completed),
+        "total_fetched": sum(shard["total_fetched"] for shard in completed),
+        "new_opportunities": sum(shard["new_opportunities"] for shard in completed),
+        "shards": shards
+    }
+
+def get_backfill_status(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    """Checkpoint summary for a date range"""
+    days = shard_dates(start_date, end_date)
+    checkpoints = load_checkpoints(days[0], days[-1], replica=True) if days else {}
+    statuses: Dict[str, int] = {}
+    for day in days:
+        status = getattr(checkpoints.get(day), "status", None) or "pending"
+        statuses[status] = statuses.get(status, 0) + 1
+
+    return {
+        "days": len(days),
+        "statuses": statuses,
+        "shards": [
+            {
+                "date": checkpoint.shard_date.strftime("%Y-%m-%d"),
+                "status": checkpoint.status,
+                "next_page": checkpoint.next_page,
+                "total_fetched": checkpoint.total_fetched,
+                "attempts": checkpoint.attempts,
+                "last_error": checkpoint.last_error
+            }
+            for checkpoint in sorted(checkpoints.values(), key=lambda checkpoint: checkpoint.shard_date)
+        ]
+    }
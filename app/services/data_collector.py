@@ -1,39 +1,62 @@
 import asyncio
-import httpx
+import contextvars
+import csv
+import functools
+import gzip
+import hashlib
+import itertools
 import logging
+import time
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from pathlib import Path
+from typing import Callable, Iterable, List, Dict, Optional, Any, Tuple
 from sqlalchemy.orm import Session
-from app.models.opportunity import Opportunity, CollectionRun, PSCCode
+from app.models.opportunity import CollectionRun, CollectionWatermark, IngestedBatchFile, PSCCode
 from app.core.database import SessionLocal
 from app.core.config import settings
+from app.services.opportunity_writer import load_opportunities
+from app.services.unit_of_work import UnitOfWork
 import re
 
 logger = logging.getLogger(__name__)
 
+class CollectionCancelled(RuntimeError):
+    """The orchestrator gave up on a collector (timeout); stop before the next batch"""
+
 class BaseCollector:
     """Base class for all data collectors"""
     
     def __init__(self, platform_name: str):
         self.platform_name = platform_name
-        self.session = SessionLocal()
+        # Opened per use in __enter__ so constructing a collector never touches the database
+        self.session: Optional[Session] = None
+        self.current_run: Optional[CollectionRun] = None
+        # "upsert" or "copy" (see opportunity_writer); None follows INGEST_LOAD_MODE
+        self.load_mode: Optional[str] = None
+        # Worker threads using self.session, and the cooperative stop flag they check
+        self._threads: set = set()
+        self.cancel_requested = False
         
     def __enter__(self):
+        self.session = SessionLocal()
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.session.close()
+        self.session = None
         
-    def create_collection_run(self) -> CollectionRun:
+    def create_collection_run(self, mode: str = "incremental") -> CollectionRun:
         """Create a new collection run record"""
         run = CollectionRun(
             platform=self.platform_name,
             status="running",
             started_at=datetime.utcnow(),
-            filters_applied=self.get_filters_config()
+            filters_applied={**self.get_filters_config(), "mode": mode}
         )
         self.session.add(run)
         self.session.commit()
+        self.current_run = run
         return run
         
     def update_collection_run(self, run: CollectionRun, status: str, **kwargs):
@@ -48,6 +71,44 @@ class BaseCollector:
         """Override in subclasses to return platform-specific filters"""
         return {}
         
+    def load_watermarks(self) -> Dict[str, CollectionWatermark]:
+        """Load this platform's persisted high-water marks keyed by filter set"""
+        watermarks = self.session.query(CollectionWatermark).filter(
+            CollectionWatermark.platform == self.platform_name
+        ).all()
+        return {watermark.filter_key: watermark for watermark in watermarks}
+        
+    def get_window_start(self, watermark: Optional[CollectionWatermark], mode: str) -> datetime:
+        """
+        Get the postedFrom date for a filter set.
+        
+        Full reconciles (and filter sets never collected before) walk the whole
+        trailing window; incremental runs fetch from the watermark minus a small
+        overlap so late-indexed records are not missed.
+        """
+        if mode == "full" or watermark is None or watermark.high_water_mark is None:
+            return datetime.now() - timedelta(days=settings.COLLECTION_FULL_WINDOW_DAYS)
+        return watermark.high_water_mark - timedelta(days=settings.COLLECTION_WATERMARK_OVERLAP_DAYS)
+        
+    def advance_watermark(self, filter_key: str, high_water_mark: Optional[datetime],
+                          run: CollectionRun, mode: str):
+        """Move a filter set's watermark forward (never backwards); committed with the run"""
+        watermark = self.session.query(CollectionWatermark).filter(
+            CollectionWatermark.platform == self.platform_name,
+            CollectionWatermark.filter_key == filter_key
+        ).first()
+        
+        if not watermark:
+            watermark = CollectionWatermark(platform=self.platform_name, filter_key=filter_key)
+            self.session.add(watermark)
+            
+        if high_water_mark and (watermark.high_water_mark is None or high_water_mark > watermark.high_water_mark):
+            watermark.high_water_mark = high_water_mark
+        watermark.last_run_id = run.id
+        if mode == "full":
+            watermark.last_full_reconcile_at = datetime.utcnow()
+        watermark.updated_at = datetime.utcnow()
+        
     def is_product_related(self, opportunity_data: Dict[str, Any]) -> bool:
         """Determine if opportunity is product-related"""
         # Check PSC codes for products (typically start with certain numbers)
@@ -73,22 +134,135 @@ class BaseCollector:
                 return True
                 
         return False
+        
+    def process_opportunity(self, opp_data: Dict[str, Any], uow: Optional[UnitOfWork] = None) -> bool:
+        """
+        Process and store a single opportunity (batch paths should use save_batch)
+        
+        With a unit of work the row is queued and written with the rest of the
+        batch; True then means it was accepted rather than newly inserted.
+        """
+        try:
+            row = self.map_opportunity(opp_data)
+            if not row:
+                return False
+            row = self.classify_opportunity(row)
+            if uow is not None:
+                uow.save_opportunity(row)
+                return True
+            inserted, _ = self.save_batch([row])
+            return inserted > 0
+            
+        except Exception as e:
+            logger.error(f"Error processing SAM opportunity: {str(e)}")
+            return False
+            
+    def map_opportunity(self, opp_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a SAM.gov search record to Opportunity column values (None if unusable)"""
+        solicitation_number = opp_data.get("solicitationNumber", "")
+        if not solicitation_number:
+            return None
+            
+        return {
+            "title": opp_data.get("title", "")[:500],
+            "solicitation_number": solicitation_number,
+            "description": opp_data.get("description", ""),
+            "posted_date": self.parse_date(opp_data.get("postedDate")),
+            "response_deadline": self.parse_date(opp_data.get("responseDeadLine")),
+            "agency": opp_data.get("departmentName", ""),
+            "office": (opp_data.get("officeAddress") or {}).get("city", ""),
+            "psc_code": opp_data.get("classificationCode", ""),
+            "naics_code": opp_data.get("naicsCode", ""),
+            "opportunity_type": opp_data.get("type", ""),
+            "set_aside": opp_data.get("typeOfSetAside", ""),
+            "source_platform": self.platform_name,
+            "source_url": f"https://sam.gov/opp/{opp_data.get('noticeId', '')}/view",
+            "source_id": opp_data.get("noticeId", ""),
+            "last_sync_at": datetime.utcnow()
+        }
+        
+    def classify_opportunity(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Set product classification on a mapped opportunity row"""
+        row["is_product_related"] = self.is_product_related(row)
+        return row
+        
+    def save_batch(self, rows: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Store a batch of mapped rows in one transaction using the collector's load mode.
+        
+        New solicitations are inserted; existing ones whose content hash changed are
+        rewritten, the rest only have last_sync_at touched.
+        In copy mode ``rows`` may be a generator and is streamed to the database.
+        
+        Returns:
+            (inserted, updated) counts
+        """
+        if self.cancel_requested:
+            raise CollectionCancelled(f"{self.platform_name} collection was cancelled")
+        return load_opportunities(self.session, rows, self.load_mode)
+    
+    async def run_in_thread(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run blocking session work (batch writes, file loads) in a worker thread
+        
+        A thread can't be interrupted, so its future is shielded and tracked: when
+        the awaiting task is cancelled, wait_for_threads still knows when the
+        session is free again.
+        """
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, func, *args))
+        self._threads.add(future)
+        future.add_done_callback(self._threads.discard)
+        return await asyncio.shield(future)
+    
+    async def cancel_and_wait(self):
+        """Ask running batch work to stop at its next batch and wait for its threads to finish"""
+        self.cancel_requested = True
+        if self._threads:
+            await asyncio.gather(*self._threads, return_exceptions=True)
+            
+    def parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
+        """Parse date string to datetime object"""
+        if not date_str:
+            return None
+        try:
+            # SAM.gov v2 search returns ISO dates like "2024-12-31" or "2024-12-31T11:59:00-05:00"
+            return datetime.strptime(date_str[:10], "%Y-%m-%d")
+        except ValueError:
+            pass
+        try:
+            # DIBBS batch files use US dates like "12/31/2024"
+            return datetime.strptime(date_str.strip()[:10], "%m/%d/%Y")
+        except ValueError:
+            pass
+        try:
+            # Older feeds use a format like "Dec 31, 2024 11:59 pm EST"
+            return datetime.strptime(date_str[:12], "%b %d, %Y")
+        except:
+            return None
 
-class SAMGovCollector(BaseCollector):
-    """Collector for SAM.gov opportunities"""
+class SAMSearchCollector(BaseCollector):
+    """
+    Base for platforms that are views over the SAM.gov search API
     
-    def __init__(self):
-        super().__init__("SAM")
-        self.base_url = "https://api.sam.gov/prod/opportunities/v2/search"
+    Subclasses decide which search records they own (``accepts``); every
+    platform shares the product window of one query per product PSC prefix and
+    keeps its own watermark per query. Fetching is done by SharedSAMFetch, which
+    queries each filter set once for all platforms and stores a notice once.
+    """
+    
+    def __init__(self, platform_name: str):
+        super().__init__(platform_name)
+        self.base_url = f"{settings.SAM_API_BASE_URL}/prod/opportunities/v2/search"
         self.api_key = settings.SAM_GOV_API_KEY
         
-    def get_filters_config(self) -> Dict[str, Any]:
-        return {
-            "notice_types": ["o", "k"],  # Solicitation, Combined Synopsis/Solicitation
-            "psc_codes": self.get_product_psc_codes(),
-            "posted_from": (datetime.now() - timedelta(days=30)).strftime("%m/%d/%Y"),
-            "posted_to": datetime.now().strftime("%m/%d/%Y")
-        }
+    def accepts(self, opp_data: Dict[str, Any]) -> bool:
+        """Override in subclasses: whether a raw search record belongs to this platform"""
+        raise NotImplementedError
+        
+    def get_psc_filter_key(self, psc_code: str) -> str:
+        """Watermark key for one PSC prefix"""
+        return f"psc={psc_code};noticeType=o,k"
         
     def get_product_psc_codes(self) -> List[str]:
         """Get list of product-related PSC codes"""
@@ -103,207 +277,424 @@ class SAMGovCollector(BaseCollector):
         ]
         return product_psc_ranges
         
-    async def collect_opportunities(self) -> Dict[str, Any]:
-        """Collect opportunities from SAM.gov API"""
-        run = self.create_collection_run()
-        results = {"total_fetched": 0, "new_opportunities": 0, "errors": []}
+    def filter_sets(self) -> Dict[str, Dict[str, str]]:
+        """Search params of each query, keyed by watermark filter key: one per product PSC prefix"""
+        return {self.get_psc_filter_key(psc_code): {"psc": psc_code} for psc_code in self.get_product_psc_codes()}
+        
+    async def collect_opportunities(self, mode: str = "incremental") -> Dict[str, Any]:
+        """
+        Collect this platform on its own (the orchestrator shares one fetch across platforms)
+        
+        Args:
+            mode: "incremental" fetches each filter set from its watermark;
+                "full" re-walks the whole trailing window (periodic reconcile)
+        """
+        from app.services.shared_fetch import SharedSAMFetch
+        
+        results = await SharedSAMFetch([self]).run(mode)
+        return results[self.platform_name]
+
+class SAMGovCollector(SAMSearchCollector):
+    """Collector for SAM.gov opportunities"""
+    
+    def __init__(self):
+        super().__init__("SAM")
+        
+    def get_filters_config(self) -> Dict[str, Any]:
+        return {
+            "notice_types": ["o", "k"],  # Solicitation, Combined Synopsis/Solicitation
+            "psc_codes": self.get_product_psc_codes(),
+            "posted_to": datetime.now().strftime("%m/%d/%Y")
+        }
+        
+    def accepts(self, opp_data: Dict[str, Any]) -> bool:
+        """Product notices: PSC in one of the product prefixes"""
+        return (opp_data.get("classificationCode") or "")[:2] in self.get_product_psc_codes()
+        
+
+class DIBBSCollector(BaseCollector):
+    """
+    Collector for DIBBS RFQs from the daily bulk batch files
+    
+    DIBBS has no public API; DLA publishes daily RFQ batch files instead. Files
+    dropped into DIBBS_BATCH_DIR (CSV, tab- or pipe-delimited, optionally
+    gzip-compressed) are streamed row by row and written in DIBBS_BATCH_SIZE
+    batches, so memory stays flat regardless of file size.
+    """
+    
+    # Accepted header spellings per field (compared lowercased with spaces, "_" and "-" collapsed)
+    COLUMN_ALIASES = {
+        "solicitation_number": ("solicitation", "solicitation number", "solicitation no", "sol no"),
+        "nsn": ("nsn", "national stock number", "nsn part number"),
+        "nomenclature": ("nomenclature", "item name", "item description", "description"),
+        "issue_date": ("issue date", "issued", "date issued"),
+        "return_by": ("return by", "return by date", "due date", "closing date"),
+        "quantity": ("quantity", "qty"),
+        "unit_of_issue": ("unit of issue", "ui", "unit"),
+        "set_aside": ("set aside", "small business set aside"),
+        "purchase_request": ("purchase request", "pr", "pr number")
+    }
+    FILE_PATTERNS = ("*.csv", "*.csv.gz", "*.txt", "*.txt.gz")
+    
+    def __init__(self, batch_dir: Optional[str] = None):
+        super().__init__("DIBBS")
+        self.batch_dir = Path(batch_dir or settings.DIBBS_BATCH_DIR)
+        
+    def get_filters_config(self) -> Dict[str, Any]:
+        return {"batch_dir": str(self.batch_dir)}
+        
+    def pending_files(self, mode: str = "incremental") -> List[Path]:
+        """
+        Batch files to ingest, oldest first; incremental runs skip files already loaded
+        
+        A file counts as loaded when a file of the same name and content was ingested
+        before, however its mtime compares to the others. Files whose name, size and
+        mtime match a load are trusted without rehashing.
+        """
+        if not self.batch_dir.is_dir():
+            return []
+        files = sorted(
+            {path for pattern in self.FILE_PATTERNS for path in self.batch_dir.glob(pattern)},
+            key=lambda path: (path.stat().st_mtime, path.name)
+        )
+        if mode == "full":
+            return files
+            
+        loaded = {}
+        for record in self.session.query(IngestedBatchFile).filter(IngestedBatchFile.platform == self.platform_name):
+            loaded.setdefault((record.file_name, record.file_size), []).append(record)
+            
+        pending = []
+        for path in files:
+            stat = path.stat()
+            records = loaded.get((path.name, stat.st_size), [])
+            if any(record.file_mtime == self._file_time(path) for record in records):
+                continue
+            if records and any(record.sha256 == self.file_digest(path) for record in records):
+                continue
+            pending.append(path)
+        return pending
+        
+    async def collect_opportunities(self, mode: str = "incremental") -> Dict[str, Any]:
+        """
+        Ingest pending DIBBS batch files
+        
+        Args:
+            mode: "incremental" loads files not ingested before;
+                "full" reloads every file in the directory
+        """
+        run = self.create_collection_run(mode)
+        results = {"total_fetched": 0, "new_opportunities": 0, "updated_opportunities": 0, "errors": []}
+        started = time.perf_counter()
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Get opportunities with product PSC codes
-                for psc_code in self.get_product_psc_codes():
-                    try:
-                        params = {
-                            "api_key": self.api_key,
-                            "psc": psc_code,
-                            "postedFrom": (datetime.now() - timedelta(days=30)).strftime("%m/%d/%Y"),
-                            "postedTo": datetime.now().strftime("%m/%d/%Y"),
-                            "noticeType": "o,k",  # Solicitation types
-                            "limit": 1000
-                        }
-                        
-                        response = await client.get(self.base_url, params=params)
-                        response.raise_for_status()
-                        
-                        data = response.json()
-                        opportunities = data.get("opportunitiesData", [])
-                        
-                        for opp_data in opportunities:
-                            if self.process_opportunity(opp_data):
-                                results["new_opportunities"] += 1
-                            results["total_fetched"] += 1
-                            
-                    except Exception as e:
-                        error_msg = f"Error fetching PSC {psc_code}: {str(e)}"
-                        results["errors"].append(error_msg)
-                        logger.error(error_msg)
-                        
-            self.update_collection_run(run, "completed", **results, errors_count=len(results["errors"]))
+            files = self.pending_files(mode)
+            if not files:
+                logger.info(f"No new DIBBS batch files in {self.batch_dir}")
+                
+            for path in files:
+                file_results = await self.run_in_thread(self.ingest_file, path)
+                for key in ("total_fetched", "new_opportunities", "updated_opportunities"):
+                    results[key] += file_results[key]
+                # Record per file so a later failure doesn't reload finished files
+                digest = await self.run_in_thread(self.file_digest, path)
+                self.record_file(path, digest, run, file_results["total_fetched"])
+                self.session.commit()
+                
+            self.update_collection_run(
+                run, "completed",
+                total_fetched=results["total_fetched"],
+                new_opportunities=results["new_opportunities"],
+                updated_opportunities=results["updated_opportunities"],
+                processing_time_seconds=time.perf_counter() - started
+            )
             
         except Exception as e:
-            error_msg = f"SAM.gov collection failed: {str(e)}"
+            error_msg = f"DIBBS collection failed: {str(e)}"
             results["errors"].append(error_msg)
-            self.update_collection_run(run, "failed", error_messages=results["errors"])
+            self.session.rollback()
+            self.update_collection_run(run, "failed", error_messages=results["errors"], errors_count=1)
             logger.error(error_msg)
             
         return results
         
-    def process_opportunity(self, opp_data: Dict[str, Any]) -> bool:
-        """Process and store a single opportunity"""
-        try:
-            solicitation_number = opp_data.get("solicitationNumber", "")
-            if not solicitation_number:
-                return False
+    def ingest_file(self, path: Path) -> Dict[str, Any]:
+        """
+        Stream one batch file into the opportunities table
+        
+        Returns:
+            Row counts and elapsed seconds for the file
+        """
+        started = time.perf_counter()
+        results = {"total_fetched": 0, "new_opportunities": 0, "updated_opportunities": 0, "skipped": 0}
+        # A day's file repeats a handful of dates; parse each distinct string once
+        parse_date = functools.lru_cache(maxsize=4096)(self.parse_date)
+        synced_at = datetime.utcnow()
+        
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8-sig", errors="replace", newline="") as handle:
+            header = handle.readline()
+            if not header.strip():
+                return {**results, "seconds": 0.0}
+            delimiter = max(",\t|", key=header.count)
+            reader = csv.DictReader(itertools.chain([header], handle), delimiter=delimiter)
+            columns = self.resolve_columns(reader.fieldnames or [])
+            if "solicitation_number" not in columns:
+                raise ValueError(f"{path.name} has no solicitation number column")
                 
-            # Check if already exists
-            existing = self.session.query(Opportunity).filter(
-                Opportunity.solicitation_number == solicitation_number
-            ).first()
             
-            if existing:
-                # Update if needed
-                existing.last_sync_at = datetime.utcnow()
-                self.session.commit()
-                return False
+            def rows():
+                for record in reader:
+                    results["total_fetched"] += 1
+                    row = self.map_dibbs_row(record, columns, parse_date, synced_at)
+                    if row is None:
+                        results["skipped"] += 1
+                        continue
+                    yield self.classify_opportunity(row)
+                    
+            if (self.load_mode or settings.INGEST_LOAD_MODE) == "copy":
+                # The bulk loader streams the whole file in one transaction
+                batches = [rows()]
+            else:
+                stream = rows()
+                batches = iter(lambda: list(itertools.islice(stream, settings.DIBBS_BATCH_SIZE)), [])
                 
-            # Create new opportunity
-            opportunity = Opportunity(
-                title=opp_data.get("title", "")[:500],
-                solicitation_number=solicitation_number,
-                description=opp_data.get("description", ""),
-                posted_date=self.parse_date(opp_data.get("postedDate")),
-                response_deadline=self.parse_date(opp_data.get("responseDeadLine")),
-                agency=opp_data.get("departmentName", ""),
-                office=opp_data.get("officeAddress", {}).get("city", ""),
-                psc_code=opp_data.get("classificationCode", ""),
-                naics_code=opp_data.get("naicsCode", ""),
-                opportunity_type=opp_data.get("type", ""),
-                set_aside=opp_data.get("typeOfSetAside", ""),
-                source_platform="SAM",
-                source_url=f"https://sam.gov/opp/{opp_data.get('noticeId', '')}/view",
-                source_id=opp_data.get("noticeId", ""),
-                is_product_related=self.is_product_related(opp_data),
-                last_sync_at=datetime.utcnow()
-            )
+            for batch in batches:
+                inserted, updated = self.save_batch(batch)
+                results["new_opportunities"] += inserted
+                results["updated_opportunities"] += updated
+                
+        results["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Loaded DIBBS batch {path.name}: {results['total_fetched']} rows, "
+            f"{results['new_opportunities']} new in {results['seconds']:.1f}s"
+        )
+        return results
+        
+    def resolve_columns(self, fieldnames: List[str]) -> Dict[str, str]:
+        """Map our field names to the file's header names"""
+        normalized = {re.sub(r"[\s_\-/]+", " ", name or "").strip().lower(): name for name in fieldnames}
+        columns = {}
+        for field, aliases in self.COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in normalized:
+                    columns[field] = normalized[alias]
+                    break
+        return columns
+        
+    def map_dibbs_row(self, record: Dict[str, str], columns: Dict[str, str],
+                      parse_date: Optional[Callable[[Optional[str]], Optional[datetime]]] = None,
+                      synced_at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Map one batch file row to Opportunity column values (None if unusable)"""
+        parse_date = parse_date or self.parse_date
+        def value(field: str) -> str:
+            column = columns.get(field)
+            return (record.get(column) or "").strip() if column else ""
             
-            self.session.add(opportunity)
-            self.session.commit()
-            return True
+        solicitation_number = value("solicitation_number")
+        if not solicitation_number:
+            return None
             
-        except Exception as e:
-            logger.error(f"Error processing SAM opportunity: {str(e)}")
-            self.session.rollback()
-            return False
+        nsn = value("nsn")
+        nsn_digits = re.sub(r"\D", "", nsn)
+        # The first four digits of an NSN are its Federal Supply Class, which doubles as the product PSC
+        fsc = nsn_digits[:4] if len(nsn_digits) >= 4 else None
+        nomenclature = value("nomenclature")
+        quantity = value("quantity")
+        unit_of_issue = value("unit_of_issue")
+        
+        details = [f"NSN {nsn}" if nsn else "", f"Qty {quantity} {unit_of_issue}".strip() if quantity else ""]
+        if value("purchase_request"):
+            details.append(f"PR {value('purchase_request')}")
             
-    def parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse date string to datetime object"""
-        if not date_str:
-            return None
-        try:
-            # SAM.gov uses format like "Dec 31, 2024 11:59 pm EST"
-            return datetime.strptime(date_str[:10], "%b %d, %Y")
-        except:
-            return None
-
-class DIBBSCollector(BaseCollector):
-    """Collector for DIBBS opportunities"""
-    
-    def __init__(self):
-        super().__init__("DIBBS")
-        # DIBBS doesn't have public API, would need web scraping or special access
-        # This is a placeholder structure
-        
-    async def collect_opportunities(self) -> Dict[str, Any]:
-        """Collect opportunities from DIBBS"""
-        # Placeholder - DIBBS requires special access
-        logger.info("DIBBS collection requires special DLA access - implementing placeholder")
-        return {"total_fetched": 0, "new_opportunities": 0, "errors": ["DIBBS API access not available"]}
+        return {
+            "title": (nomenclature or f"DIBBS RFQ {solicitation_number}")[:500],
+            "solicitation_number": solicitation_number,
+            "description": "; ".join(detail for detail in details if detail),
+            "posted_date": parse_date(value("issue_date")),
+            "response_deadline": parse_date(value("return_by")),
+            "agency": "DEFENSE LOGISTICS AGENCY",
+            "psc_code": fsc,
+            "nsn": nsn[:20] or None,
+            "fsc": fsc,
+            "opportunity_type": "RFQ",
+            "set_aside": value("set_aside")[:100],
+            "source_platform": self.platform_name,
+            "source_url": f"https://www.dibbs.bsm.dla.mil/rfq/rfqrec.aspx?sn={solicitation_number}",
+            "source_id": solicitation_number,
+            "last_sync_at": synced_at or datetime.utcnow()
+        }
+        
+    def classify_opportunity(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """DIBBS RFQs are for stocked supply items, so anything with an NSN is a product"""
+        row["is_product_related"] = bool(row.get("nsn")) or self.is_product_related(row)
+        return row
+        
+    def record_file(self, path: Path, digest: str, run: CollectionRun, total_rows: int):
+        """Remember a loaded file (a full reload refreshes its row); committed by the caller"""
+        record = self.session.query(IngestedBatchFile).filter(
+            IngestedBatchFile.platform == self.platform_name,
+            IngestedBatchFile.file_name == path.name,
+            IngestedBatchFile.sha256 == digest
+        ).first()
+        
+        if not record:
+            record = IngestedBatchFile(platform=self.platform_name, file_name=path.name, sha256=digest)
+            self.session.add(record)
+            
+        record.file_size = path.stat().st_size
+        record.file_mtime = self._file_time(path)
+        record.run_id = run.id
+        record.total_rows = total_rows
+        record.ingested_at = datetime.utcnow()
+        
+    def file_digest(self, path: Path) -> str:
+        """SHA-256 of a file's bytes, read in chunks"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+        
+    def _file_time(self, path: Path) -> datetime:
+        return datetime.utcfromtimestamp(path.stat().st_mtime)
 
-class GSAeBuyCollector(BaseCollector):
+class GSAeBuyCollector(SAMSearchCollector):
     """Collector for GSA eBuy opportunities"""
     
     def __init__(self):
         super().__init__("GSA_EBUY")
         # GSA eBuy data comes through SAM.gov API
         
-    async def collect_opportunities(self) -> Dict[str, Any]:
-        """Collect GSA eBuy opportunities via SAM.gov API"""
-        run = self.create_collection_run()
-        results = {"total_fetched": 0, "new_opportunities": 0, "errors": []}
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                params = {
-                    "api_key": settings.SAM_GOV_API_KEY,
-                    "postedFrom": (datetime.now() - timedelta(days=30)).strftime("%m/%d/%Y"),
-                    "postedTo": datetime.now().strftime("%m/%d/%Y"),
-                    "noticeType": "o,k",
-                    "limit": 1000,
-                    "orgType": "GSA"  # Filter for GSA opportunities
-                }
-                
-                response = await client.get("https://api.sam.gov/prod/opportunities/v2/search", params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                opportunities = data.get("opportunitiesData", [])
-                
-                for opp_data in opportunities:
-                    if self.process_gsa_opportunity(opp_data):
-                        results["new_opportunities"] += 1
-                    results["total_fetched"] += 1
-                    
-            self.update_collection_run(run, "completed", **results)
-            
-        except Exception as e:
-            error_msg = f"GSA eBuy collection failed: {str(e)}"
-            results["errors"].append(error_msg)
-            self.update_collection_run(run, "failed", error_messages=results["errors"])
-            
-        return results
+    def get_filters_config(self) -> Dict[str, Any]:
+        return {"notice_types": ["o", "k"], "organization": "GENERAL SERVICES ADMINISTRATION"}
         
-    def process_gsa_opportunity(self, opp_data: Dict[str, Any]) -> bool:
-        """Process GSA eBuy opportunity"""
-        # Similar to SAM processing but with GSA-specific fields
-        return self.process_opportunity(opp_data)
+    def accepts(self, opp_data: Dict[str, Any]) -> bool:
+        """GSA-issued notices within the shared product window"""
+        organization = opp_data.get("fullParentPathName") or opp_data.get("departmentName") or ""
+        return "GENERAL SERVICES" in organization.upper()
 
 class DataCollectionOrchestrator:
     """Orchestrates data collection from multiple sources"""
     
     def __init__(self):
-        self.collectors = [
-            SAMGovCollector(),
-            GSAeBuyCollector(),
-            # DIBBSCollector(),  # Enable when API access is available
+        # Collectors are instantiated per run so each gets its own short-lived session.
+        # SAM-backed collectors share one upstream fetch; a record counts for every one
+        # of them that accepts it and is stored under the first, so GSA is listed
+        # before the broader SAM product route.
+        self.collector_classes = [
+            GSAeBuyCollector,
+            SAMGovCollector,
+            DIBBSCollector,  # Bulk batch files from DIBBS_BATCH_DIR
         ]
         
-    async def run_daily_collection(self) -> Dict[str, Any]:
-        """Run daily data collection from all sources"""
-        logger.info("Starting daily opportunity collection")
+    async def run_daily_collection(self, mode: str = "incremental") -> Dict[str, Any]:
+        """
+        Run daily data collection from all sources concurrently
+        
+        SAM-backed collectors share one upstream fetch (see SharedSAMFetch); that
+        group and every other collector run concurrently, each under
+        COLLECTOR_TIMEOUT_SECONDS. A failure or timeout is recorded for the
+        affected platforms without affecting the others.
+        
+        Args:
+            mode: "incremental" (from each filter set's watermark) or "full" reconcile
+        """
+        logger.info(f"Starting daily opportunity collection ({mode})")
+        started = time.perf_counter()
         
         total_results = {
             "total_fetched": 0,
             "new_opportunities": 0,
             "errors": [],
-            "platform_results": {}
+            "platform_results": {},
+            "platform_timings": {}
         }
         
-        for collector in self.collectors:
-            try:
-                with collector:
-                    platform_results = await collector.collect_opportunities()
-                    total_results["platform_results"][collector.platform_name] = platform_results
-                    total_results["total_fetched"] += platform_results["total_fetched"]
-                    total_results["new_opportunities"] += platform_results["new_opportunities"]
-                    total_results["errors"].extend(platform_results.get("errors", []))
+        # One group for all SAM-backed collectors (single shared fetch), one per other collector
+        shared = [cls for cls in self.collector_classes if issubclass(cls, SAMSearchCollector)]
+        groups = ([shared] if shared else []) + [
+            [cls] for cls in self.collector_classes if not issubclass(cls, SAMSearchCollector)
+        ]
+        outcomes = await asyncio.gather(*(self._run_collectors(group, mode) for group in groups))
+        
+        for outcome in outcomes:
+            for platform_name, platform_results in outcome.items():
+                total_results["platform_results"][platform_name] = platform_results
+                total_results["platform_timings"][platform_name] = platform_results["seconds"]
+                total_results["total_fetched"] += platform_results["total_fetched"]
+                total_results["new_opportunities"] += platform_results["new_opportunities"]
+                total_results["errors"].extend(platform_results.get("errors", []))
+        
+        total_results["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Daily collection completed: {total_results['new_opportunities']} new opportunities "
+            f"in {total_results['elapsed_seconds']:.1f}s ({total_results['platform_timings']})"
+        )
+        return total_results
+    
+    async def _run_collectors(self, collector_classes: List[type], mode: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Run one collector, or several sharing a SAM.gov fetch, with their own
+        sessions under one timeout; never raises
+        """
+        from app.services.shared_fetch import SharedSAMFetch
+        
+        collectors = [collector_class() for collector_class in collector_classes]
+        started = time.perf_counter()
+        
+        try:
+            with ExitStack() as stack:
+                for collector in collectors:
+                    stack.enter_context(collector)
+                
+                if len(collectors) > 1:
+                    work = SharedSAMFetch(collectors).run(mode)
+                else:
+                    work = collectors[0].collect_opportunities(mode)
+                
+                try:
+                    outcome = await asyncio.wait_for(work, timeout=settings.COLLECTOR_TIMEOUT_SECONDS)
+                    if len(collectors) == 1:
+                        outcome = {collectors[0].platform_name: outcome}
+                    for collector in collectors:
+                        run_failed = collector.current_run is not None and collector.current_run.status == "failed"
+                        outcome[collector.platform_name]["status"] = "failed" if run_failed else "completed"
+                    
+                except asyncio.TimeoutError:
+                    # Batch writes may still be running on the sessions in worker threads;
+                    # they stop at their next batch, and the sessions are only touched
+                    # (and closed) once they have finished
+                    await asyncio.gather(*(collector.cancel_and_wait() for collector in collectors))
+                    outcome = {}
+                    for collector in collectors:
+                        error_msg = f"{collector.platform_name} collection timed out after {settings.COLLECTOR_TIMEOUT_SECONDS}s"
+                        logger.error(error_msg)
+                        collector.session.rollback()
+                        if collector.current_run is not None:
+                            collector.update_collection_run(
+                                collector.current_run, "failed",
+                                error_messages=[error_msg],
+                                errors_count=1,
+                                processing_time_seconds=round(time.perf_counter() - started, 3)
+                            )
+                        outcome[collector.platform_name] = {
+                            "total_fetched": 0, "new_opportunities": 0, "errors": [error_msg], "status": "timeout"
+                        }
                     
-            except Exception as e:
+        except Exception as e:
+            outcome = {}
+            for collector in collectors:
                 error_msg = f"Error in {collector.platform_name} collection: {str(e)}"
-                total_results["errors"].append(error_msg)
                 logger.error(error_msg)
-                
-        logger.info(f"Daily collection completed: {total_results['new_opportunities']} new opportunities")
-        return total_results
+                outcome[collector.platform_name] = {
+                    "total_fetched": 0, "new_opportunities": 0, "errors": [error_msg], "status": "failed"
+                }
+        
+        seconds = round(time.perf_counter() - started, 3)
+        for platform_results in outcome.values():
+            platform_results["seconds"] = seconds
+        return outcome
 
 # Singleton instance
-data_collector = DataCollectionOrchestrator()
\ No newline at end of file
+data_collector = DataCollectionOrchestrator()
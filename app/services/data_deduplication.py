@@ -10,6 +10,7 @@ from sqlalchemy import and_, or_, func
 from difflib import SequenceMatcher
 from app.models.opportunity import Opportunity
 from app.core.database import SessionLocal
+from app.services.unit_of_work import UnitOfWork
 
 logger = logging.getLogger(__name__)
 
@@ -127,6 +128,9 @@ class OpportunityDeduplicator:
         # Calculate similarities
         duplicates = []
         for candidate in candidates:
+            # Marked earlier in this run but not flushed yet
+            if candidate.is_duplicate:
+                continue
             similarity = self.calculate_similarity(target_opp, candidate)
             if similarity >= self.similarity_threshold:
                 duplicates.append((candidate, similarity))
@@ -137,23 +141,28 @@ class OpportunityDeduplicator:
         return duplicates
     
     def mark_as_duplicate(self, session: Session, duplicate_opp: Opportunity, 
-                         master_opp: Opportunity, similarity_score: float):
-        """Mark an opportunity as duplicate"""
-        duplicate_opp.is_duplicate = True
-        duplicate_opp.master_opportunity_id = master_opp.id
-        duplicate_opp.updated_at = datetime.utcnow()
-        
+                         master_opp: Opportunity, similarity_score: float,
+                         uow: Optional[UnitOfWork] = None):
+        """Mark an opportunity as duplicate (queued on ``uow`` if given, else committed now)"""
         # Add metadata about the duplication
-        if not duplicate_opp.keywords_matched:
-            duplicate_opp.keywords_matched = {}
-        
-        duplicate_opp.keywords_matched['duplicate_info'] = {
+        keywords_matched = dict(duplicate_opp.keywords_matched or {})
+        keywords_matched['duplicate_info'] = {
             'similarity_score': similarity_score,
             'marked_as_duplicate_at': datetime.utcnow().isoformat(),
             'master_solicitation_number': master_opp.solicitation_number
         }
+        changes = {
+            'is_duplicate': True,
+            'master_opportunity_id': master_opp.id,
+            'updated_at': datetime.utcnow(),
+            'keywords_matched': keywords_matched
+        }
         
-        session.commit()
+        if uow is None:
+            with UnitOfWork(session) as uow:
+                uow.update(duplicate_opp, **changes)
+        else:
+            uow.update(duplicate_opp, **changes)
         
         logger.info(f"Marked opportunity {duplicate_opp.solicitation_number} as duplicate of {master_opp.solicitation_number} (similarity: {similarity_score:.3f})")
     
@@ -174,23 +183,33 @@ class OpportunityDeduplicator:
         duplicates_found = 0
         pairs_checked = 0
         
-        for opp in opportunities:
-            potential_duplicates = self.find_potential_duplicates(session, opp)
-            
-            for duplicate_candidate, similarity in potential_duplicates:
-                pairs_checked += 1
+        # Marks are written set-based and committed once at the end
+        with UnitOfWork(session) as uow:
+            for opp in opportunities:
+                # Already marked earlier in this run
+                if opp.is_duplicate:
+                    continue
                 
-                # Choose the "master" record (prefer earlier posted date, then SAM.gov)
-                if self.should_be_master(opp, duplicate_candidate):
-                    master_opp = opp
-                    duplicate_opp = duplicate_candidate
-                else:
-                    master_opp = duplicate_candidate
-                    duplicate_opp = opp
+                potential_duplicates = self.find_potential_duplicates(session, opp)
                 
-                # Mark as duplicate
-                self.mark_as_duplicate(session, duplicate_opp, master_opp, similarity)
-                duplicates_found += 1
+                for duplicate_candidate, similarity in potential_duplicates:
+                    pairs_checked += 1
+                    
+                    # Choose the "master" record (prefer earlier posted date, then SAM.gov)
+                    if self.should_be_master(opp, duplicate_candidate):
+                        master_opp = opp
+                        duplicate_opp = duplicate_candidate
+                    else:
+                        master_opp = duplicate_candidate
+                        duplicate_opp = opp
+                    
+                    # Mark as duplicate
+                    self.mark_as_duplicate(session, duplicate_opp, master_opp, similarity, uow)
+                    duplicates_found += 1
+                    
+                    # opp is a duplicate itself now; further matches would only overwrite its master
+                    if duplicate_opp is opp:
+                        break
         
         logger.info(f"Deduplication completed: {duplicates_found} duplicates found from {pairs_checked} pairs checked")
         
@@ -280,36 +299,58 @@ class DataStandardizer:
         normalized = agency_name.lower().strip()
         return self.agency_mappings.get(normalized, agency_name)
     
-    def standardize_opportunity(self, session: Session, opportunity: Opportunity) -> bool:
-        """Standardize a single opportunity's data"""
-        changes_made = False
+    def standardize_opportunity(self, session: Session, opportunity: Opportunity,
+                                uow: Optional[UnitOfWork] = None) -> bool:
+        """Standardize a single opportunity's data (queued on ``uow`` if given, else committed now)"""
+        changes = {}
         
         # Standardize agency name
         if opportunity.agency:
             standardized_agency = self.standardize_agency_name(opportunity.agency)
             if standardized_agency != opportunity.agency:
-                opportunity.agency = standardized_agency
-                changes_made = True
+                changes['agency'] = standardized_agency
         
         # Clean up title
         if opportunity.title:
             clean_title = self.clean_title(opportunity.title)
             if clean_title != opportunity.title:
-                opportunity.title = clean_title
-                changes_made = True
+                changes['title'] = clean_title
         
         # Standardize PSC codes (ensure proper format)
         if opportunity.psc_code:
             clean_psc = self.clean_psc_code(opportunity.psc_code)
             if clean_psc != opportunity.psc_code:
-                opportunity.psc_code = clean_psc
-                changes_made = True
+                changes['psc_code'] = clean_psc
         
-        if changes_made:
-            opportunity.updated_at = datetime.utcnow()
-            session.commit()
+        if changes:
+            changes['updated_at'] = datetime.utcnow()
+            if uow is None:
+                with UnitOfWork(session) as uow:
+                    uow.update(opportunity, **changes)
+            else:
+                uow.update(opportunity, **changes)
         
-        return changes_made
+        return bool(changes)
+    
+    def standardize_opportunities(self, session: Session, limit: int = 1000) -> Dict[str, int]:
+        """Standardize recently collected opportunities in one transaction"""
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        opportunities = session.query(Opportunity).filter(
+            Opportunity.created_at >= cutoff_date
+        ).order_by(Opportunity.created_at.desc()).limit(limit).all()
+        
+        standardized = 0
+        with UnitOfWork(session) as uow:
+            for opportunity in opportunities:
+                if self.standardize_opportunity(session, opportunity, uow):
+                    standardized += 1
+        
+        logger.info(f"Standardization completed: {standardized} of {len(opportunities)} opportunities changed")
+        
+        return {
+            'standardized': standardized,
+            'opportunities_processed': len(opportunities)
+        }
     
     def clean_title(self, title: str) -> str:
         """Clean and standardize opportunity title"""
@@ -0,0 +1,294 @@
+"""
+Streaming, backpressured ingest pipeline from SAM.gov pages to the database
+
+Pages flow through bounded queues between four stages:
+
+    fetch page -> parse/map -> classify -> write batch
+
+so memory stays flat regardless of window size and the database is written
+while later pages are still downloading.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel marking the end of a stage's output
+_DONE = object()
+
+class StageStats:
+    """Throughput counters for one pipeline stage"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pages = 0
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pages": self.pages,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None
+        }
+
+class IngestPipeline:
+    """
+    Async pipeline that maps, classifies and batch-writes streamed pages
+
+    Args:
+        map_record: Maps one raw record to a row dict (None to drop it)
+        classify_record: Enriches a mapped row (e.g. product classification)
+        write_batch: Writes a list of rows, returning (inserted, updated); runs in a
+            worker thread so downloads continue during database writes
+        on_pages_committed: Optional callback receiving the highest page number
+            whose rows (and every earlier page's rows) are committed; it runs in
+            the write thread right after the commit, so it may block on the database
+        run_in_thread: Awaitable runner for write work (defaults to asyncio.to_thread);
+            pass a collector's run_in_thread so it can wait out an in-flight write
+            before touching its session again
+    """
+
+    def __init__(
+        self,
+        map_record: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        classify_record: Callable[[Dict[str, Any]], Dict[str, Any]],
+        write_batch: Callable[[List[Dict[str, Any]]], Tuple[int, int]],
+        on_pages_committed: Optional[Callable[[int], None]] = None,
+        run_in_thread: Optional[Callable[..., Awaitable[Any]]] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        map_workers: Optional[int] = None,
+        classify_workers: Optional[int] = None
+    ):
+        self.map_record = map_record
+        self.classify_record = classify_record
+        self.write_batch = write_batch
+        self.on_pages_committed = on_pages_committed
+        self.run_in_thread = run_in_thread or asyncio.to_thread
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.map_workers = map_workers or settings.INGEST_MAP_WORKERS
+        self.classify_workers = classify_workers or settings.INGEST_CLASSIFY_WORKERS
+
+        self.stats = {
+            "fetch": StageStats(1),
+            "map": StageStats(self.map_workers),
+            "classify": StageStats(self.classify_workers),
+            "write": StageStats(1)
+        }
+        self.inserted = 0
+        self.updated = 0
+        self._committed_pages: Set[int] = set()
+        self._next_uncommitted_page: Optional[int] = None
+
+    async def run(self, pages: AsyncIterator[Tuple[int, List[Dict[str, Any]]]]) -> Dict[str, Any]:
+        """
+        Drive pages through the pipeline until the source is exhausted
+
+        Args:
+            pages: Async iterator of (page number, raw records) in ascending page order
+
+        Returns:
+            Counts and per-stage throughput stats
+        """
+        started = time.perf_counter()
+        fetched = asyncio.Queue(maxsize=self.queue_size)
+        mapped = asyncio.Queue(maxsize=self.queue_size)
+        classified = asyncio.Queue(maxsize=self.queue_size)
+
+        tasks = [
+            asyncio.create_task(self._stage(
+                [self._fetch_stage(pages, fetched)], downstream_workers=self.map_workers, out=fetched
+            )),
+            asyncio.create_task(self._stage(
+                [self._transform_worker("map", self.map_record, fetched, mapped) for _ in range(self.map_workers)],
+                downstream_workers=self.classify_workers, out=mapped
+            )),
+            asyncio.create_task(self._stage(
+                [self._transform_worker("classify", self.classify_record, mapped, classified)
+                 for _ in range(self.classify_workers)],
+                downstream_workers=1, out=classified
+            )),
+            asyncio.create_task(self._write_stage(classified))
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return {
+            "total_fetched": self.stats["fetch"].items,
+            "new_opportunities": self.inserted,
+            "updated_opportunities": self.updated,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "stages": {name: stage.to_dict() for name, stage in self.stats.items()}
+        }
+
+    async def _stage(self, workers: List, downstream_workers: int, out: asyncio.Queue):
+        """Run a stage's workers, then tell every downstream worker the stage is done"""
+        await asyncio.gather(*workers)
+        for _ in range(downstream_workers):
+            await out.put(_DONE)
+
+    async def _fetch_stage(self, pages: AsyncIterator, out: asyncio.Queue):
+        stats = self.stats["fetch"]
+        waited_at = time.perf_counter()
+        async for page_number, records in pages:
+            stats.busy_seconds += time.perf_counter() - waited_at
+            stats.pages += 1
+            stats.items += len(records)
+            if self._next_uncommitted_page is None:
+                self._next_uncommitted_page = page_number
+            await out.put((page_number, records))
+            waited_at = time.perf_counter()
+
+    async def _transform_worker(self, name: str, transform: Callable, inbox: asyncio.Queue, out: asyncio.Queue):
+        stats = self.stats[name]
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            page_number, records = item
+
+            started = time.perf_counter()
+            results = []
+            for record in records:
+                try:
+                    result = transform(record)
+                except Exception as e:
+                    stats.errors += 1
+                    logger.error(f"Ingest {name} stage failed on page {page_number}: {str(e)}")
+                    continue
+                if result is not None:
+                    results.append(result)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.pages += 1
+            stats.items += len(results)
+
+            await out.put((page_number, results))
+
+    async def _write_stage(self, inbox: asyncio.Queue):
+        batch: List[Dict[str, Any]] = []
+        batch_pages: List[int] = []
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            page_number, rows = item
+            batch.extend(rows)
+            batch_pages.append(page_number)
+
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, batch_pages)
+                batch, batch_pages = [], []
+
+        if batch_pages:
+            await self._flush(batch, batch_pages)
+
+    async def _flush(self, batch: List[Dict[str, Any]], batch_pages: List[int]):
+        stats = self.stats["write"]
+        started = time.perf_counter()
+
+        def commit() -> Tuple[int, int]:
+            counts = self.write_batch(batch) if batch else (0, 0)
+            self._committed_pages.update(batch_pages)
+            self._report_committed()
+            return counts
+
+        inserted, updated = await self.run_in_thread(commit)
+        self.inserted += inserted
+        self.updated += updated
+
+        stats.busy_seconds += time.perf_counter() - started
+        stats.pages += len(batch_pages)
+        stats.items += len(batch)
+
+    def _report_committed(self):
+        """Advance the contiguous committed-page mark and report it (called from the write thread)"""
+        if self._next_uncommitted_page is None:
+            return
+        advanced = False
+        while self._next_uncommitted_page in self._committed_pages:
+            self._committed_pages.discard(self._next_uncommitted_page)
+            self._next_uncommitted_page += 1
+            advanced = True
+        if advanced and self.on_pages_committed:
+            self.on_pages_committed(self._next_uncommitted_page - 1)
+
+def batch_size_for(load_mode: Optional[str]) -> Optional[int]:
+    """Pipeline batch size for a load mode; the bulk loader pays off on large batches"""
+    if (load_mode or settings.INGEST_LOAD_MODE) == "copy":
+        return settings.INGEST_COPY_BATCH_SIZE
+    return None
+
+async def ingest_daily_opportunities(
+    target_date: datetime,
+    start_page: int = 0,
+    on_pages_committed: Optional[Callable[[int], None]] = None,
+    load_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stream one day of SAM.gov opportunities into the opportunities table
+
+    Args:
+        target_date: Posting date to ingest
+        start_page: First upstream page (for resuming)
+        on_pages_committed: Checkpoint callback, see IngestPipeline
+        load_mode: "upsert" or "copy" (defaults to INGEST_LOAD_MODE)
+
+    Returns:
+        Pipeline results including per-stage stats
+    """
+    from app.services.data_collector import SAMGovCollector
+    from app.services.sam_service import sam_service
+
+    with SAMGovCollector() as collector:
+        collector.load_mode = load_mode
+        run = collector.create_collection_run("stream")
+        try:
+            pipeline = IngestPipeline(
+                map_record=collector.map_opportunity,
+                classify_record=collector.classify_opportunity,
+                write_batch=collector.save_batch,
+                on_pages_committed=on_pages_committed,
+                run_in_thread=collector.run_in_thread,
+                batch_size=batch_size_for(load_mode)
+            )
+            results = await pipeline.run(sam_service.iter_daily_pages(target_date, start_page=start_page))
+
+            collector.update_collection_run(
+                run, "completed",
+                total_fetched=results["total_fetched"],
+                new_opportunities=results["new_opportunities"],
+                updated_opportunities=results["updated_opportunities"],
+                processing_time_seconds=results["elapsed_seconds"]
+            )
+            logger.info(
+                f"Streamed {results['total_fetched']} opportunities for {target_date.strftime('%Y-%m-%d')}: "
+                f"{results['new_opportunities']} new, {results['updated_opportunities']} updated"
+            )
+            return results
+
+        except (Exception, asyncio.CancelledError) as e:
+            # A cancelled or failed run may leave a batch write running; the session
+            # is only safe to roll back once that thread has finished
+            await collector.cancel_and_wait()
+            collector.session.rollback()
+            collector.update_collection_run(
+                run, "failed", error_messages=[str(e) or type(e).__name__], errors_count=1
+            )
+            raise
@@ -0,0 +1,200 @@
+"""
+Monthly partitions of the opportunities table and partition-drop retention
+
+On Postgres ``opportunities`` is partitioned by RANGE (posted_date) into one
+``opportunities_YYYY_MM`` table per month, plus ``opportunities_default`` for rows
+without a posted date or outside every month partition (e.g. an old backfill).
+Maintenance keeps OPPORTUNITY_PARTITION_MONTHS_AHEAD future months ready, moves
+rows out of the default partition into their own months, and retires months older
+than OPPORTUNITY_RETENTION_MONTHS by detaching them, a metadata-only change
+that doesn't delete or lock rows one by one. Detached months are moved to
+OPPORTUNITY_ARCHIVE_SCHEMA or dropped.
+
+Other databases keep a plain table; retention there deletes expired rows in chunks.
+Retention is opt-in: OPPORTUNITY_RETENTION_MONTHS defaults to 0 (keep everything).
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.opportunity import Opportunity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "opportunities_default"
+PARTITION_NAME = re.compile(r"^opportunities_(\d{4})_(\d{2})$")
+
+def month_start(day: datetime) -> datetime:
+    return datetime(day.year, day.month, 1)
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"opportunities_{month.year:04d}_{month.month:02d}"
+
+class OpportunityPartitionService:
+    """Creates, fills and retires the month partitions of ``opportunities``"""
+
+    def is_partitioned(self, db: Session) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = 'opportunities' AND c.relnamespace = to_regnamespace(current_schema())"
+        )).scalar())
+
+    def list_partitions(self, db: Session) -> List[datetime]:
+        """Months that currently have an attached partition, oldest first"""
+        names = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'opportunities' AND p.relnamespace = to_regnamespace(current_schema())"
+        )).scalars()
+        months = []
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def _create_partition(self, db: Session, month: datetime):
+        """Create one month's partition, taking over its rows from the default partition"""
+        name = partition_name(month)
+        lower, upper = month.strftime("%Y-%m-%d"), add_months(month, 1).strftime("%Y-%m-%d")
+        # A default partition can't hold rows of a month that gets its own partition,
+        # so they are moved into the new table before it is attached
+        db.execute(text(f"CREATE TABLE {name} (LIKE opportunities INCLUDING DEFAULTS)"))
+        db.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE posted_date >= '{lower}' AND posted_date < '{upper}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        db.execute(text(f"ALTER TABLE opportunities ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+
+    def ensure_partitions(self, db: Session, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Create missing month partitions up to ``months_ahead`` months from now
+
+        Months that only have rows in the default partition (backfills beyond the
+        existing range) get their partition too.
+
+        Args:
+            db: Database session (committed on success)
+            months_ahead: Future months to keep ready (defaults to OPPORTUNITY_PARTITION_MONTHS_AHEAD)
+
+        Returns:
+            Names of the partitions created
+        """
+        if not self.is_partitioned(db):
+            return []
+        months_ahead = settings.OPPORTUNITY_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        current = month_start(datetime.utcnow())
+        first, last = current, add_months(current, months_ahead)
+        stray = db.execute(text(
+            f"SELECT min(posted_date), max(posted_date) FROM {DEFAULT_PARTITION} WHERE posted_date IS NOT NULL"
+        )).one()
+        if stray[0] is not None:
+            first = min(first, month_start(stray[0]))
+            last = max(last, month_start(stray[1]))
+
+        existing = set(self.list_partitions(db))
+        created = []
+        try:
+            month = first
+            while month <= last:
+                if month not in existing:
+                    self._create_partition(db, month)
+                    created.append(partition_name(month))
+                month = add_months(month, 1)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if created:
+            logger.info(f"Created opportunity partitions: {', '.join(created)}")
+        return created
+
+    def apply_retention(self, db: Session, retention_months: Optional[int] = None,
+                        archive: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Retire opportunities posted before the retention window
+
+        Args:
+            db: Database session (committed on success)
+            retention_months: Months of postings to keep (defaults to OPPORTUNITY_RETENTION_MONTHS; 0 keeps all)
+            archive: Move detached partitions to OPPORTUNITY_ARCHIVE_SCHEMA instead of
+                dropping them (defaults to OPPORTUNITY_RETENTION_ARCHIVE; Postgres only)
+
+        Returns:
+            Cutoff, and the partitions detached or rows deleted
+        """
+        retention_months = settings.OPPORTUNITY_RETENTION_MONTHS if retention_months is None else retention_months
+        archive = settings.OPPORTUNITY_RETENTION_ARCHIVE if archive is None else archive
+        if retention_months <= 0:
+            return {"cutoff": None, "partitions": [], "rows_deleted": 0}
+        cutoff = add_months(month_start(datetime.utcnow()), -retention_months)
+
+        if not self.is_partitioned(db):
+            return {"cutoff": cutoff.isoformat(), "partitions": [], "rows_deleted": self._delete_before(db, cutoff)}
+
+        expired = [month for month in self.list_partitions(db) if add_months(month, 1) <= cutoff]
+        retired = []
+        try:
+            if archive and expired:
+                db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {settings.OPPORTUNITY_ARCHIVE_SCHEMA}"))
+            for month in expired:
+                name = partition_name(month)
+                db.execute(text(f"ALTER TABLE opportunities DETACH PARTITION {name}"))
+                if archive:
+                    archived = f"{settings.OPPORTUNITY_ARCHIVE_SCHEMA}.{name}"
+                    if db.execute(text(f"SELECT to_regclass('{archived}')")).scalar():
+                        # Month archived before (late backfill rows): append to it
+                        db.execute(text(f"INSERT INTO {archived} SELECT * FROM {name}"))
+                        db.execute(text(f"DROP TABLE {name}"))
+                    else:
+                        db.execute(text(f"ALTER TABLE {name} SET SCHEMA {settings.OPPORTUNITY_ARCHIVE_SCHEMA}"))
+                else:
+                    db.execute(text(f"DROP TABLE {name}"))
+                retired.append(name)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if retired:
+            action = f"archived to {settings.OPPORTUNITY_ARCHIVE_SCHEMA}" if archive else "dropped"
+            logger.info(f"Retired opportunity partitions before {cutoff:%Y-%m} ({action}): {', '.join(retired)}")
+        return {"cutoff": cutoff.isoformat(), "partitions": retired, "archived": bool(archive), "rows_deleted": 0}
+
+    def _delete_before(self, db: Session, cutoff: datetime) -> int:
+        """Delete rows posted before ``cutoff`` in short chunked transactions"""
+        table = Opportunity.__table__
+        deleted = 0
+        while True:
+            ids = db.execute(
+                table.select().with_only_columns(table.c.id)
+                .where(table.c.posted_date < cutoff)
+                .limit(settings.OPPORTUNITY_RETENTION_DELETE_CHUNK)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            db.execute(table.delete().where(table.c.id.in_(ids)))
+            db.commit()
+            deleted += len(ids)
+
+    def run_maintenance(self, db: Session) -> Dict[str, Any]:
+        """Create upcoming partitions, then apply retention"""
+        created = self.ensure_partitions(db)
+        retention = self.apply_retention(db)
+        return {"created": created, **retention}
+
+# Global service instance
+partition_service = OpportunityPartitionService()
@@ -4,9 +4,11 @@ Opportunity service for managing RFQ/opportunity data and operations
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, select
+from sqlalchemy.sql import Select
 from uuid import uuid4
 
 from app.models.rfq import RFQ, RFQStatus, RFQSource
@@ -26,6 +28,20 @@ class OpportunityService:
         """
         Save multiple opportunities to database, avoiding duplicates
         
+        Args:
+            db: Database session
+            opportunities: List of opportunity dictionaries from SAM.gov
+            source: Source identifier for tracking
+            
+        Returns:
+            Number of opportunities actually saved (excluding duplicates)
+        """
+        return self.save_opportunities(db, opportunities, source)
+    
+    def save_opportunities(self, db: Session, opportunities: List[Dict], source: str = "sam_gov") -> int:
+        """
+        Blocking body of bulk_save_opportunities, for callers that run it in a worker thread
+        
         Args:
             db: Database session
             opportunities: List of opportunity dictionaries from SAM.gov
@@ -36,27 +52,21 @@ class OpportunityService:
         """
         saved_count = 0
         
-        for opp_data in opportunities:
+        # Last occurrence wins if a notice appears twice in the batch
+        by_notice_id = {opp_data['noticeId']: opp_data for opp_data in opportunities if opp_data.get('noticeId')}
+        existing = self.get_existing_notice_ids(db, list(by_notice_id))
+        
+        for notice_id, opp_data in by_notice_id.items():
+            if notice_id in existing:
+                continue  # Skip duplicates
+            
             try:
-                # Check if opportunity already exists
-                notice_id = opp_data.get('noticeId')
-                if not notice_id:
-                    continue
-                
-                existing = db.query(RFQ).filter(
-                    RFQ.source_url.contains(notice_id)
-                ).first()
-                
-                if existing:
-                    continue  # Skip duplicates
-                
-                # Create new RFQ record
                 rfq = self._create_rfq_from_opportunity(opp_data, source)
                 db.add(rfq)
                 saved_count += 1
                 
             except Exception as e:
-                logger.error(f"Error saving opportunity {opp_data.get('noticeId', 'unknown')}: {str(e)}")
+                logger.error(f"Error saving opportunity {notice_id}: {str(e)}")
                 continue
         
         try:
@@ -69,6 +79,26 @@ class OpportunityService:
         
         return saved_count
     
+    def get_existing_notice_ids(self, db: Session, notice_ids: List[str], chunk_size: int = 1000) -> Set[str]:
+        """
+        Find which notice IDs are already stored, using the notice_id index
+        
+        Args:
+            db: Database session
+            notice_ids: SAM.gov notice IDs to check
+            chunk_size: IDs per IN query
+            
+        Returns:
+            Set of notice IDs that already exist
+        """
+        existing = set()
+        for start in range(0, len(notice_ids), chunk_size):
+            chunk = notice_ids[start:start + chunk_size]
+            existing.update(
+                notice_id for (notice_id,) in db.query(RFQ.notice_id).filter(RFQ.notice_id.in_(chunk))
+            )
+        return existing
+    
     def _create_rfq_from_opportunity(self, opp_data: Dict, source: str) -> RFQ:
         """
         Create RFQ model instance from SAM.gov opportunity data
@@ -102,6 +132,7 @@ class OpportunityService:
             # Source Information
             source=RFQSource.SAM_GOV,
             source_url=sam_url,
+            notice_id=notice_id,
             
             # RFQ Details
             description=opp_data.get('description', ''),
@@ -168,9 +199,8 @@ class OpportunityService:
         
         return None
     
-    def search_opportunities(
+    def _search_statement(
         self,
-        db: Session,
         keyword: Optional[str] = None,
         agency: Optional[str] = None,
         status: Optional[RFQStatus] = None,
@@ -178,29 +208,14 @@ class OpportunityService:
         deadline_before: Optional[datetime] = None,
         limit: int = 20,
         offset: int = 0
-    ) -> List[RFQ]:
-        """
-        Search stored opportunities with filters
-        
-        Args:
-            db: Database session
-            keyword: Search in title and description
-            agency: Filter by agency name
-            status: Filter by RFQ status
-            deadline_after: Only opportunities with deadline after this date
-            deadline_before: Only opportunities with deadline before this date
-            limit: Maximum results
-            offset: Results offset for pagination
-            
-        Returns:
-            List of RFQ objects
-        """
-        query = db.query(RFQ)
+    ) -> Select:
+        """SELECT for search_opportunities, shared by the sync and async variants"""
+        stmt = select(RFQ)
         
         # Apply filters
         if keyword:
             search_term = f"%{keyword}%"
-            query = query.filter(
+            stmt = stmt.where(
                 or_(
                     RFQ.title.ilike(search_term),
                     RFQ.description.ilike(search_term),
@@ -210,24 +225,64 @@ class OpportunityService:
         
         if agency:
             agency_term = f"%{agency}%"
-            query = query.filter(RFQ.agency.ilike(agency_term))
+            stmt = stmt.where(RFQ.agency.ilike(agency_term))
         
         if status:
-            query = query.filter(RFQ.status == status)
+            stmt = stmt.where(RFQ.status == status)
         
         if deadline_after:
-            query = query.filter(RFQ.deadline >= deadline_after)
+            stmt = stmt.where(RFQ.deadline >= deadline_after)
         
         if deadline_before:
-            query = query.filter(RFQ.deadline <= deadline_before)
-        
-        # Order by creation date (newest first)
-        query = query.order_by(desc(RFQ.created_at))
+            stmt = stmt.where(RFQ.deadline <= deadline_before)
         
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
+        # Order by creation date (newest first), then paginate
+        return stmt.order_by(desc(RFQ.created_at)).offset(offset).limit(limit)
+    
+    def search_opportunities(
+        self,
+        db: Session,
+        keyword: Optional[str] = None,
+        agency: Optional[str] = None,
+        status: Optional[RFQStatus] = None,
+        deadline_after: Optional[datetime] = None,
+        deadline_before: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[RFQ]:
+        """
+        Search stored opportunities with filters
         
-        return query.all()
+        Args:
+            db: Database session
+            keyword: Search in title and description
+            agency: Filter by agency name
+            status: Filter by RFQ status
+            deadline_after: Only opportunities with deadline after this date
+            deadline_before: Only opportunities with deadline before this date
+            limit: Maximum results
+            offset: Results offset for pagination
+            
+        Returns:
+            List of RFQ objects
+        """
+        stmt = self._search_statement(keyword, agency, status, deadline_after, deadline_before, limit, offset)
+        return list(db.execute(stmt).scalars().all())
+    
+    async def search_opportunities_async(
+        self,
+        db: AsyncSession,
+        keyword: Optional[str] = None,
+        agency: Optional[str] = None,
+        status: Optional[RFQStatus] = None,
+        deadline_after: Optional[datetime] = None,
+        deadline_before: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[RFQ]:
+        """search_opportunities on an AsyncSession (API request path)"""
+        stmt = self._search_statement(keyword, agency, status, deadline_after, deadline_before, limit, offset)
+        return list((await db.execute(stmt)).scalars().all())
     
     def get_opportunity_by_notice_id(self, db: Session, notice_id: str) -> Optional[RFQ]:
         """
@@ -240,9 +295,11 @@ class OpportunityService:
         Returns:
             RFQ object or None
         """
-        return db.query(RFQ).filter(
-            RFQ.source_url.contains(notice_id)
-        ).first()
+        return db.query(RFQ).filter(RFQ.notice_id == notice_id).first()
+    
+    async def get_opportunity_by_notice_id_async(self, db: AsyncSession, notice_id: str) -> Optional[RFQ]:
+        """get_opportunity_by_notice_id on an AsyncSession (API request path)"""
+        return (await db.execute(select(RFQ).where(RFQ.notice_id == notice_id).limit(1))).scalars().first()
     
     async def import_opportunity_from_url(self, db: Session, url: str, user_id: int) -> Optional[RFQ]:
         """
@@ -0,0 +1,504 @@
+"""
+Set-based writes of mapped opportunity rows
+
+Collectors, the streaming pipeline, replay and backfill all hand batches of
+mapped rows to ``load_opportunities``. Two load modes are available
+(INGEST_LOAD_MODE):
+
+- ``upsert``: ``INSERT ... ON CONFLICT DO UPDATE`` as one executemany per
+  batch, in one transaction
+- ``copy``: for large historical loads; rows are streamed into a temporary
+  staging table with Postgres ``COPY FROM STDIN`` and merged with a single
+  upsert. On SQLite the rows go straight through DBAPI ``executemany`` inside one
+  transaction instead.
+
+Every row carries a ``content_hash`` of its mapped source fields. Re-synced
+solicitations whose hash is unchanged only have last_sync_at touched; amended
+ones are rewritten and the fields that changed recorded in ``last_changed_fields``.
+
+Once Postgres is migrated to the partitioned table, the conflict target is
+(solicitation_number, posted_date); a plain table (SQLite, create_all, or Postgres
+before the migration) keeps UNIQUE (solicitation_number). The target is read
+from the live schema. On the partitioned table the unique key alone can't stop a
+second row for a solicitation, so writers also take advisory locks on the
+solicitations they write, and amended rows are rewritten before the insert: a
+changed posted date moves the row to its new partition, and the insert then sees
+it as existing rather than adding a second copy.
+"""
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import JSON, DateTime, bindparam, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.opportunity import OPPORTUNITY_PARTITION_KEY, Opportunity
+from app.services.opportunity_partitions import partition_service
+
+logger = logging.getLogger(__name__)
+
+# Columns refreshed when a solicitation is seen again
+UPSERT_UPDATE_COLUMNS = ("last_sync_at",)
+
+# Bookkeeping columns that are never part of a row's content
+UNHASHED_COLUMNS = frozenset({
+    "id", "solicitation_number", "last_sync_at", "created_at", "updated_at", "content_hash", "last_changed_fields"
+})
+
+# Solicitation numbers per IN (...) lookup
+LOOKUP_CHUNK_SIZE = 1000
+
+# Advisory locks serializing writers of the same solicitation on the partitioned
+# table: (namespace, bucket of hashtext(solicitation_number)). Buckets bound the
+# locks one transaction holds however large the load.
+WRITE_LOCK_NAMESPACE = 7316
+WRITE_LOCK_BUCKETS = 256
+
+# Whether each engine's opportunities table is partitioned; the schema only
+# changes through migrations, which are followed by a restart
+_partitioned_engines: Dict[Any, bool] = {}
+
+@functools.lru_cache(maxsize=64)
+def _fields_for_keys(keys: frozenset) -> Tuple[Tuple[str, ...], bytes]:
+    fields = tuple(column.name for column in Opportunity.__table__.columns
+                   if column.name in keys and column.name not in UNHASHED_COLUMNS)
+    return fields, json.dumps(fields).encode("utf-8")
+
+def content_fields(row: Mapping[str, Any]) -> List[str]:
+    """Mapped fields of a row that make up its content, in table column order"""
+    return list(_fields_for_keys(frozenset(row))[0])
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def content_hash(row: Mapping[str, Any]) -> str:
+    """Stable SHA-256 over the content fields a row was mapped with (names and values)"""
+    fields, names = _fields_for_keys(frozenset(row))
+    values = json.dumps([row[field] for field in fields], separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(names + values.encode("utf-8")).hexdigest()
+
+def changed_fields(current: Mapping[str, Any], row: Mapping[str, Any], fields: Sequence[str]) -> List[str]:
+    """Fields whose new value differs from the stored one"""
+    return [field for field in fields if current[field] != row[field]]
+
+def is_partitioned(session: Session) -> bool:
+    """Whether the session's opportunities table is the partitioned one (checked once per engine)"""
+    engine = session.get_bind().engine
+    if engine not in _partitioned_engines:
+        _partitioned_engines[engine] = partition_service.is_partitioned(session)
+    return _partitioned_engines[engine]
+
+def conflict_columns(session: Session) -> List[str]:
+    """Unique key upserts conflict on; the partitioned Postgres table keys on posted_date too"""
+    if is_partitioned(session):
+        return ["solicitation_number", OPPORTUNITY_PARTITION_KEY]
+    return ["solicitation_number"]
+
+def _lock_solicitations(session: Session, keys: Sequence[str]):
+    """
+    Serialize concurrent writers of the same solicitations until commit
+
+    Only needed on the partitioned table, whose unique key includes posted_date:
+    without it, two writers could each insert a solicitation under a different
+    posted date. Buckets are locked in ascending order so writers can't deadlock.
+    """
+    session.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(:namespace, bucket) FROM ("
+            "SELECT DISTINCT abs(hashtext(key) % :buckets) AS bucket FROM unnest(CAST(:keys AS text[])) AS key "
+            "ORDER BY bucket) buckets"
+        ),
+        {"namespace": WRITE_LOCK_NAMESPACE, "buckets": WRITE_LOCK_BUCKETS, "keys": list(keys)}
+    )
+
+def _insert_for(session: Session):
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(Opportunity.__table__)
+    if dialect == "sqlite":
+        return sqlite.insert(Opportunity.__table__)
+    raise NotImplementedError(f"Upsert is not supported for the {dialect} dialect")
+
+def normalize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Deduplicate a batch by solicitation number, hash it and give every row the same keys
+
+    The last occurrence of a solicitation wins (an upsert can't touch the same row
+    twice in one statement). Each row's content_hash covers the fields it was
+    mapped with; columns missing from some rows are then filled with None so the
+    batch can be sent as one executemany.
+    """
+    rows_by_key = {
+        row["solicitation_number"]: {**row, "content_hash": content_hash(row)}
+        for row in rows if row.get("solicitation_number")
+    }
+    columns = sorted({column for row in rows_by_key.values() for column in row})
+    return [{column: row.get(column) for column in columns} for row in rows_by_key.values()]
+
+def _chunks(items: Sequence[Any], size: int = LOOKUP_CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _stored_hashes(session: Session, keys: Sequence[str]) -> Dict[str, Optional[str]]:
+    """Stored content_hash of every solicitation among ``keys`` that already exists"""
+    table = Opportunity.__table__
+    hashes = {}
+    for chunk in _chunks(keys):
+        hashes.update(session.execute(
+            select(table.c.solicitation_number, table.c.content_hash).where(table.c.solicitation_number.in_(chunk))
+        ).all())
+    return hashes
+
+def _rewrite_amended(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """Rewrite amended rows with their new content and the fields that changed"""
+    if not rows:
+        return 0
+    table = Opportunity.__table__
+    fields = [field for field in rows[0] if field not in UNHASHED_COLUMNS]
+    current = {}
+    for chunk in _chunks([row["solicitation_number"] for row in rows]):
+        for stored in session.execute(
+            select(table.c.solicitation_number, *(table.c[field] for field in fields))
+            .where(table.c.solicitation_number.in_(chunk))
+        ).mappings():
+            current[stored["solicitation_number"]] = stored
+
+    now = datetime.utcnow()
+    columns = fields + ["content_hash", "last_changed_fields", "updated_at"]
+    params = [
+        {
+            **{f"new_{field}": row[field] for field in fields},
+            "new_content_hash": row["content_hash"],
+            "new_last_changed_fields": changed_fields(current[row["solicitation_number"]], row, fields),
+            "new_updated_at": now,
+            "key": row["solicitation_number"]
+        }
+        for row in rows
+    ]
+    session.execute(
+        table.update()
+        .where(table.c.solicitation_number == bindparam("key"))
+        .values({column: bindparam(f"new_{column}") for column in columns}),
+        params
+    )
+    return len(params)
+
+def upsert_opportunities(session: Session, rows: List[Dict[str, Any]], commit: bool = True) -> Tuple[int, int]:
+    """
+    Insert new solicitations, rewrite amended ones and touch the rest in one transaction
+
+    Args:
+        session: Session to write with (rolled back on error)
+        rows: Mapped Opportunity column values
+        commit: Commit on success; False leaves the transaction to the caller
+            (e.g. a UnitOfWork)
+
+    Returns:
+        (inserted, updated) counts; updated counts rows whose content changed
+    """
+    rows = normalize_rows(rows)
+    if not rows:
+        return 0, 0
+
+    stmt = _insert_for(session)
+
+    try:
+        partitioned = is_partitioned(session)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Opportunity.__table__.c[column] for column in conflict_columns(session)],
+            set_={column: stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS}
+        )
+        if partitioned:
+            _lock_solicitations(session, [row["solicitation_number"] for row in rows])
+        stored = _stored_hashes(session, [row["solicitation_number"] for row in rows])
+        amended = [row for row in rows
+                   if row["solicitation_number"] in stored and stored[row["solicitation_number"]] != row["content_hash"]]
+        # Rewrite first so a changed posted_date already matches the conflict key
+        updated = _rewrite_amended(session, amended)
+        session.execute(stmt, rows)
+        if commit:
+            session.commit()
+        return len(rows) - len(stored), updated
+
+    except Exception:
+        session.rollback()
+        raise
+
+def load_opportunities(session: Session, rows: Iterable[Dict[str, Any]],
+                       mode: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Store mapped rows using the configured load mode
+
+    Args:
+        session: Session to write with (committed on success, rolled back on error)
+        rows: Mapped Opportunity column values; the copy mode consumes them as a stream
+        mode: "upsert" or "copy" (defaults to INGEST_LOAD_MODE)
+
+    Returns:
+        (inserted, updated) counts
+    """
+    mode = mode or settings.INGEST_LOAD_MODE
+    if mode == "copy":
+        return copy_load_opportunities(session, rows)
+    if mode == "upsert":
+        return upsert_opportunities(session, list(rows))
+    raise ValueError(f"Unknown load mode: {mode}")
+
+# Columns written by the copy loader: everything except the serial id
+COPY_COLUMNS = [column.name for column in Opportunity.__table__.columns if not column.primary_key]
+
+def _copy_defaults() -> Dict[str, Any]:
+    """Python-side column defaults, which COPY and raw executemany don't apply for us"""
+    defaults = {}
+    for column in Opportunity.__table__.columns:
+        if column.default is not None and not column.primary_key:
+            arg = column.default.arg
+            defaults[column.name] = arg(None) if callable(arg) else arg
+    return defaults
+
+def _complete_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    defaults = _copy_defaults()
+    for row in rows:
+        if row.get("solicitation_number"):
+            complete = {column: row[column] if column in row else defaults.get(column) for column in COPY_COLUMNS}
+            complete["content_hash"] = content_hash(row)
+            yield complete
+
+class _CSVStream(io.RawIOBase):
+    """
+    File-like CSV view over a row iterator, so COPY reads rows as they are produced
+
+    Each line ends with the row's position in the stream (the staging ``ordinal``),
+    so the merge can pick the last occurrence of a repeated solicitation.
+    """
+
+    NULL = "\\N"
+
+    def __init__(self, rows: Iterator[Dict[str, Any]]):
+        self._rows = rows
+        self._buffer = b""
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line)
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _encode(self, value: Any) -> Any:
+        if value is None:
+            return self.NULL
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow([self._encode(row[column]) for column in COPY_COLUMNS] + [self.count])
+            self._buffer += self._line.getvalue().encode("utf-8")
+            self._line.seek(0)
+            self._line.truncate()
+            self.count += 1
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+def _pg_comparable(alias: str, field: str) -> str:
+    # json has no equality operator; compare its text form
+    if isinstance(Opportunity.__table__.c[field].type, JSON):
+        return f"{alias}.{field}::text"
+    return f"{alias}.{field}"
+
+def copy_load_opportunities(session: Session, rows: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Bulk load rows in one transaction, bypassing per-row ORM and bind processing
+
+    On Postgres rows are streamed with COPY into a temporary staging table;
+    amended solicitations are rewritten with one UPDATE ... FROM and everything
+    else merged with one INSERT ... SELECT ... ON CONFLICT. On SQLite they are
+    written with DBAPI executemany in INGEST_COPY_CHUNK_SIZE chunks. Unchanged
+    solicitations only have last_sync_at touched, as with the upsert mode.
+
+    Returns:
+        (inserted, updated) counts; updated counts rows whose content changed
+    """
+    dialect = session.get_bind().dialect.name
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0, 0
+    # A load comes from one mapper, so the first row's content fields are every row's
+    fields = content_fields(first)
+    rows = _complete_rows(itertools.chain([first], rows))
+    columns = ", ".join(COPY_COLUMNS)
+    update_set = ", ".join(f"{column} = EXCLUDED.{column}" for column in UPSERT_UPDATE_COLUMNS)
+
+    try:
+        conflict = ", ".join(conflict_columns(session))
+        partitioned = is_partitioned(session)
+        dbapi_connection = session.connection().connection.dbapi_connection
+        cursor = dbapi_connection.cursor()
+
+        if dialect == "postgresql":
+            # Column types only: no id column (and so no sequence default to draw on)
+            # and no constraints; every value comes from the stream
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS opportunities_staging ON COMMIT DELETE ROWS AS "
+                f"SELECT {columns}, 0::bigint AS ordinal FROM opportunities WITH NO DATA"
+            )
+            cursor.copy_expert(
+                f"COPY opportunities_staging ({columns}, ordinal) FROM STDIN WITH (FORMAT csv, NULL '{_CSVStream.NULL}')",
+                _CSVStream(rows)
+            )
+            if partitioned:
+                # As _lock_solicitations, for every solicitation in the stream
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s, bucket) FROM ("
+                    "SELECT DISTINCT abs(hashtext(solicitation_number) %% %s) AS bucket "
+                    "FROM opportunities_staging ORDER BY bucket) buckets",
+                    (WRITE_LOCK_NAMESPACE, WRITE_LOCK_BUCKETS)
+                )
+            # DISTINCT ON: an upsert can't touch the same row twice in one statement;
+            # the last occurrence in the stream wins, as in the SQLite path
+            latest = (
+                f"SELECT DISTINCT ON (solicitation_number) {columns} FROM opportunities_staging "
+                "ORDER BY solicitation_number, ordinal DESC"
+            )
+            # SET expressions see the row as it was before the update
+            changed = ", ".join(
+                f"CASE WHEN {_pg_comparable('o', field)} IS DISTINCT FROM {_pg_comparable('s', field)} "
+                f"THEN '{field}' END"
+                for field in fields
+            )
+            cursor.execute(f"""
+                UPDATE opportunities o SET
+                    {", ".join(f"{field} = s.{field}" for field in fields)},
+                    content_hash = s.content_hash,
+                    last_changed_fields = to_json(array_remove(ARRAY[{changed}]::text[], NULL)),
+                    last_sync_at = s.last_sync_at,
+                    updated_at = s.updated_at
+                FROM ({latest}) s
+                WHERE o.solicitation_number = s.solicitation_number
+                  AND o.content_hash IS DISTINCT FROM s.content_hash
+            """)
+            updated = cursor.rowcount
+            cursor.execute(f"""
+                WITH merged AS (
+                    INSERT INTO opportunities ({columns})
+                    {latest}
+                    ON CONFLICT ({conflict}) DO UPDATE SET {update_set}
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted) FROM merged
+            """)
+            inserted = cursor.fetchone()[0]
+
+        elif dialect == "sqlite":
+            statement = (
+                f"INSERT INTO opportunities ({columns}) VALUES ({', '.join('?' for _ in COPY_COLUMNS)}) "
+                f"ON CONFLICT ({conflict}) DO UPDATE SET {update_set}"
+            )
+            to_params = _sqlite_params()
+            inserted = updated = 0
+            chunk: Dict[str, Dict[str, Any]] = {}
+            for row in rows:
+                chunk[row["solicitation_number"]] = row
+                if len(chunk) >= settings.INGEST_COPY_CHUNK_SIZE:
+                    chunk_inserted, chunk_updated = _sqlite_executemany(cursor, statement, chunk, fields, to_params)
+                    inserted += chunk_inserted
+                    updated += chunk_updated
+                    chunk = {}
+            if chunk:
+                chunk_inserted, chunk_updated = _sqlite_executemany(cursor, statement, chunk, fields, to_params)
+                inserted += chunk_inserted
+                updated += chunk_updated
+
+        else:
+            raise NotImplementedError(f"Copy load is not supported for the {dialect} dialect")
+
+        session.commit()
+        return inserted, updated
+
+    except Exception:
+        session.rollback()
+        raise
+
+def _sqlite_params() -> Callable[[Dict[str, Any]], List[Any]]:
+    """Row-to-parameters converter applying only the column types SQLite can't bind directly"""
+    # Same text format SQLAlchemy's SQLite DateTime type stores; a load repeats few distinct dates
+    format_datetime = functools.lru_cache(maxsize=4096)(lambda value: value.strftime("%Y-%m-%d %H:%M:%S.%f"))
+    converters = []
+    for index, name in enumerate(COPY_COLUMNS):
+        column_type = Opportunity.__table__.c[name].type
+        if isinstance(column_type, DateTime):
+            converters.append((index, format_datetime))
+        elif isinstance(column_type, JSON):
+            converters.append((index, json.dumps))
+
+    def to_params(row: Dict[str, Any]) -> List[Any]:
+        params = [row[column] for column in COPY_COLUMNS]
+        for index, convert in converters:
+            if params[index] is not None:
+                params[index] = convert(params[index])
+        return params
+
+    return to_params
+
+def _sqlite_executemany(cursor, statement: str, chunk: Dict[str, Dict[str, Any]], fields: List[str],
+                        to_params: Callable[[Dict[str, Any]], List[Any]]) -> Tuple[int, int]:
+    """Write one deduplicated chunk; returns (inserted, updated) counts"""
+    keys = list(chunk)
+    cursor.execute(
+        f"SELECT solicitation_number, content_hash FROM opportunities "
+        f"WHERE solicitation_number IN ({', '.join('?' for _ in keys)})",
+        keys
+    )
+    stored = dict(cursor.fetchall())
+    amended = [key for key, row in chunk.items() if key in stored and stored[key] != row["content_hash"]]
+    cursor.executemany(statement, map(to_params, chunk.values()))
+    if not amended:
+        return len(chunk) - len(stored), 0
+
+    # Stored and new values are compared in their SQLite storage form
+    cursor.execute(
+        f"SELECT solicitation_number, {', '.join(fields)} FROM opportunities "
+        f"WHERE solicitation_number IN ({', '.join('?' for _ in amended)})",
+        amended
+    )
+    current = {values[0]: dict(zip(fields, values[1:])) for values in cursor.fetchall()}
+    positions = [COPY_COLUMNS.index(field) for field in fields]
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    updates = []
+    for key in amended:
+        params = to_params(chunk[key])
+        new_values = {field: params[position] for field, position in zip(fields, positions)}
+        updates.append([
+            *new_values.values(),
+            chunk[key]["content_hash"],
+            json.dumps(changed_fields(current[key], new_values, fields)),
+            now,
+            key
+        ])
+    cursor.executemany(
+        f"UPDATE opportunities SET {', '.join(f'{field} = ?' for field in fields)}, "
+        f"content_hash = ?, last_changed_fields = ?, updated_at = ? WHERE solicitation_number = ?",
+        updates
+    )
+    return len(chunk) - len(stored), len(amended)
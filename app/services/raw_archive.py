@@ -0,0 +1,278 @@
+"""
+Compressed raw-payload archive for SAM.gov responses with offline replay ingestion
+
+Every fetched page is appended to a day-partitioned, gzip-compressed JSONL file:
+
+    {RAW_ARCHIVE_DIR}/{source}/{YYYY-MM-DD}.jsonl.gz
+
+so the database can be rebuilt or reclassified from disk without spending API quota.
+Only sync and collector fetches are archived (interactive searches and ID lookups
+are not), and partitions past RAW_ARCHIVE_RETENTION_DAYS or RAW_ARCHIVE_MAX_MB are
+pruned by the weekly cleanup job.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+class RawPayloadArchive:
+    """Append-only archive of raw upstream responses, partitioned by fetch date (UTC)"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = PROJECT_ROOT / (root or settings.RAW_ARCHIVE_DIR)
+        self._lock = threading.Lock()
+
+    def partition_path(self, source: str, day: datetime) -> Path:
+        return self.root / source / f"{day.strftime('%Y-%m-%d')}.jsonl.gz"
+
+    def append(self, source: str, url: str, params: Dict[str, Any], payload: Dict[str, Any],
+               fetched_at: Optional[datetime] = None):
+        """
+        Append one raw response to its day partition
+
+        Args:
+            source: Archive namespace (e.g. "sam")
+            url: Endpoint that was called
+            params: Query parameters sent (API keys are stripped)
+            payload: Decoded JSON response
+            fetched_at: Fetch time (defaults to now, UTC)
+        """
+        fetched_at = fetched_at or datetime.utcnow()
+        entry = {
+            "fetched_at": fetched_at.isoformat(),
+            "url": url,
+            "params": {key: value for key, value in params.items() if key != "api_key"},
+            "payload": payload
+        }
+        path = self.partition_path(source, fetched_at)
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Each append adds a gzip member; readers see one continuous stream
+            with gzip.open(path, "at", encoding="utf-8") as handle:
+                handle.write(line)
+
+    def iter_entries(self, source: str, start_date: datetime, end_date: datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Stream archived entries for an inclusive fetch-date range, oldest first
+
+        Truncated trailing members (e.g. from a crash mid-write) end that
+        partition's stream instead of failing the whole replay.
+        """
+        day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day <= end_date:
+            path = self.partition_path(source, day)
+            if path.exists():
+                try:
+                    with gzip.open(path, "rt", encoding="utf-8") as handle:
+                        for line in handle:
+                            if line.strip():
+                                yield json.loads(line)
+                except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+                    logger.warning(f"Stopped reading damaged archive partition {path}: {str(e)}")
+            day += timedelta(days=1)
+
+    def prune(self, retention_days: Optional[int] = None, max_mb: Optional[int] = None) -> List[Path]:
+        """
+        Delete day partitions older than the retention window, then the oldest ones
+        until the archive fits the size cap
+
+        Args:
+            retention_days: Days of partitions to keep (defaults to RAW_ARCHIVE_RETENTION_DAYS; 0 keeps all)
+            max_mb: Total size cap in MB (defaults to RAW_ARCHIVE_MAX_MB; 0 means no cap)
+
+        Returns:
+            Partition files deleted
+        """
+        retention_days = settings.RAW_ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+        max_mb = settings.RAW_ARCHIVE_MAX_MB if max_mb is None else max_mb
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+
+        # Partition names sort by date; oldest first across sources
+        partitions = sorted(self.root.glob("*/*.jsonl.gz"), key=lambda path: (path.name, path.parent.name))
+        total_bytes = sum(path.stat().st_size for path in partitions)
+        deleted = []
+        with self._lock:
+            for path in partitions:
+                expired = retention_days > 0 and path.name[:10] < cutoff
+                oversized = max_mb > 0 and total_bytes > max_mb * 1024 * 1024
+                if not (expired or oversized):
+                    continue
+                total_bytes -= path.stat().st_size
+                path.unlink()
+                deleted.append(path)
+
+        if deleted:
+            logger.info(f"Pruned {len(deleted)} raw archive partitions, {total_bytes / (1024 * 1024):.1f} MB kept")
+        return deleted
+
+# Global archive instance
+raw_archive = RawPayloadArchive()
+
+# Replay target for daily-sync pages, which the scheduled and manual syncs saved as RFQs
+DAILY_SYNC_TARGET = "RFQ"
+
+# Queue sentinel ending a platform's replayed page stream
+_END = object()
+
+def is_daily_sync_page(params: Dict[str, Any]) -> bool:
+    """Daily-sync pages are paged by page/size; collector search pages by limit/offset"""
+    return "page" in params and "offset" not in params
+
+def _save_daily_sync_records(records: List[Dict[str, Any]]) -> int:
+    """Save one daily-sync page through the RFQ path, in its own session (worker thread)"""
+    from app.core.database import SessionLocal
+    from app.services.opportunity_service import opportunity_service
+
+    with SessionLocal() as db:
+        return opportunity_service.save_opportunities(db, records, source="replay")
+
+async def _queued_pages(queue: asyncio.Queue) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    page_number = 0
+    while True:
+        records = await queue.get()
+        if records is _END:
+            return
+        yield page_number, records
+        page_number += 1
+
+async def replay_archive(start_date: datetime, end_date: datetime,
+                         platforms: Optional[List[str]] = None,
+                         load_mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-ingest archived SAM.gov pages the way they were first stored
+
+    The archive is read once. Collector search pages are routed by SharedSAMFetch
+    (a record goes to the first collector that accepts it, as in live collection)
+    and fed through one streaming ingest pipeline per platform, using that
+    collector's mapping, classification and batch writes. Daily-sync pages are
+    saved as RFQs through OpportunityService, as the daily sync saved them.
+    Backfill pages use the same request shape, so they replay as RFQs too;
+    rebuild ``opportunities`` for those days with the backfill command.
+
+    Args:
+        start_date: First fetch date to replay (inclusive)
+        end_date: Last fetch date to replay (inclusive)
+        platforms: Targets to replay (defaults to SAM, GSA_EBUY and RFQ)
+        load_mode: "upsert" or "copy" (defaults to INGEST_LOAD_MODE)
+
+    Returns:
+        Results per platform (and RFQ for daily-sync pages)
+    """
+    from app.services.data_collector import SAMSearchCollector, data_collector
+    from app.services.ingest_pipeline import IngestPipeline, batch_size_for
+    from app.services.shared_fetch import SharedSAMFetch
+
+    started = time.perf_counter()
+    # Same routing priority as live collection, so each record replays under one platform
+    collector_classes = [cls for cls in data_collector.collector_classes if issubclass(cls, SAMSearchCollector)]
+    router = SharedSAMFetch([collector_class() for collector_class in collector_classes])
+    selected = set(platforms or [collector.platform_name for collector in router.collectors] + [DAILY_SYNC_TARGET])
+    daily_sync = {"total_fetched": 0, "new_opportunities": 0, "updated_opportunities": 0}
+
+    with ExitStack() as stack:
+        collectors = {
+            collector.platform_name: stack.enter_context(collector)
+            for collector in router.collectors if collector.platform_name in selected
+        }
+        runs, queues, pipelines = {}, {}, {}
+        for platform, collector in collectors.items():
+            collector.load_mode = load_mode
+            runs[platform] = collector.create_collection_run("replay")
+            queues[platform] = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+            pipelines[platform] = IngestPipeline(
+                map_record=collector.map_opportunity,
+                classify_record=collector.classify_opportunity,
+                write_batch=collector.save_batch,
+                run_in_thread=collector.run_in_thread,
+                batch_size=batch_size_for(load_mode)
+            )
+
+        async def read_archive():
+            entries = raw_archive.iter_entries("sam", start_date, end_date)
+            while True:
+                # Decompression and JSON decoding stay off the event loop
+                entry = await asyncio.to_thread(next, entries, None)
+                if entry is None:
+                    break
+                params = entry.get("params", {})
+                records = entry.get("payload", {}).get("opportunitiesData") or []
+                if not records:
+                    continue
+
+                if is_daily_sync_page(params):
+                    if DAILY_SYNC_TARGET in selected:
+                        daily_sync["total_fetched"] += len(records)
+                        daily_sync["new_opportunities"] += await asyncio.to_thread(_save_daily_sync_records, records)
+                    continue
+
+                routed: Dict[str, List[Dict[str, Any]]] = {}
+                if params.get("orgType") == "GSA":
+                    # Pages from the former GSA-only query belong to GSA eBuy as a whole
+                    routed["GSA_EBUY"] = records
+                else:
+                    for record in records:
+                        interested = router.route(record)
+                        if interested:
+                            routed.setdefault(interested[0].platform_name, []).append(record)
+                for platform, platform_records in routed.items():
+                    if platform in queues:
+                        await queues[platform].put(platform_records)
+
+            for queue in queues.values():
+                await queue.put(_END)
+
+        tasks = {platform: asyncio.create_task(pipelines[platform].run(_queued_pages(queues[platform])))
+                 for platform in pipelines}
+        reader = asyncio.create_task(read_archive())
+        try:
+            await asyncio.gather(reader, *tasks.values())
+        except (Exception, asyncio.CancelledError) as e:
+            reader.cancel()
+            for task in tasks.values():
+                task.cancel()
+            for platform, collector in collectors.items():
+                # Let an in-flight batch write finish before the session is reused
+                await collector.cancel_and_wait()
+                collector.session.rollback()
+                collector.update_collection_run(
+                    runs[platform], "failed", error_messages=[str(e) or type(e).__name__], errors_count=1
+                )
+            raise
+
+        results = {}
+        for platform, task in tasks.items():
+            platform_results = task.result()
+            collectors[platform].update_collection_run(
+                runs[platform], "completed",
+                total_fetched=platform_results["total_fetched"],
+                new_opportunities=platform_results["new_opportunities"],
+                updated_opportunities=platform_results["updated_opportunities"],
+                processing_time_seconds=platform_results["elapsed_seconds"]
+            )
+            results[platform] = platform_results
+            logger.info(
+                f"Replayed {platform_results['total_fetched']} archived {platform} records "
+                f"in {platform_results['elapsed_seconds']:.1f}s"
+            )
+
+    if DAILY_SYNC_TARGET in selected:
+        results[DAILY_SYNC_TARGET] = {**daily_sync, "elapsed_seconds": round(time.perf_counter() - started, 3)}
+        logger.info(
+            f"Replayed {daily_sync['total_fetched']} archived daily-sync records as RFQs: "
+            f"{daily_sync['new_opportunities']} new"
+        )
+    return results
@@ -3,22 +3,174 @@ SAM.gov API service for fetching opportunities and managing data sync
 """
 import httpx
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Tuple
 from app.core.config import settings
+from app.core.http_client import http_client
+from app.utils.rate_limiter import TokenBucket
+from app.utils.adaptive_concurrency import AIMDController
+from app.utils.cache import TTLCache
+from app.services.raw_archive import raw_archive
 import logging
 
 logger = logging.getLogger(__name__)
 
+class IncompleteFetchError(Exception):
+    """Some pages of a multi-page fetch still failed after retries"""
+    
+    def __init__(self, opportunities: List[Dict], failed_pages: List[int]):
+        """
+        Args:
+            opportunities: Records from the pages that were fetched
+            failed_pages: Page numbers that are missing from ``opportunities``
+        """
+        super().__init__(f"Missing pages {failed_pages} ({len(opportunities)} records fetched)")
+        self.opportunities = opportunities
+        self.failed_pages = failed_pages
+
 class SAMService:
     """Service for interacting with SAM.gov API"""
     
     def __init__(self):
-        self.base_url = "https://api.sam.gov/opportunities/v2/search"
+        self.base_url = f"{settings.SAM_API_BASE_URL}/opportunities/v2/search"
         self.headers = {
             'X-Api-Key': settings.SAM_GOV_API_KEY,
             'Content-Type': 'application/json'
         }
+        # Shared across every SAM.gov call so bulk syncs and live searches stay under quota
+        self.rate_limiter = TokenBucket(
+            rate=settings.SAM_REQUESTS_PER_SECOND,
+            capacity=settings.SAM_RATE_LIMIT_BURST
+        )
+        # Concurrency adapts to upstream health; SAM_MAX_CONCURRENT_REQUESTS is the ceiling
+        self.concurrency = AIMDController(
+            initial_limit=settings.SAM_INITIAL_CONCURRENT_REQUESTS,
+            min_limit=settings.SAM_MIN_CONCURRENT_REQUESTS,
+            max_limit=settings.SAM_MAX_CONCURRENT_REQUESTS,
+            decrease_factor=settings.SAM_CONCURRENCY_DECREASE_FACTOR,
+            latency_target=settings.SAM_LATENCY_TARGET_SECONDS
+        )
+        self.search_cache = TTLCache(
+            max_entries=settings.SAM_SEARCH_CACHE_MAX_ENTRIES,
+            ttl=settings.SAM_SEARCH_CACHE_TTL_SECONDS,
+            stale_ttl=settings.SAM_SEARCH_CACHE_STALE_SECONDS
+        )
+        self.opportunity_cache = TTLCache(
+            max_entries=settings.SAM_OPPORTUNITY_CACHE_MAX_ENTRIES,
+            ttl=settings.SAM_OPPORTUNITY_CACHE_TTL_SECONDS
+        )
+    
+    async def _get(self, params: Dict, timeout: float = 30.0, url: Optional[str] = None,
+                   archive: bool = False) -> Dict:
+        """
+        Issue a GET against the SAM.gov search endpoint on the shared pooled client
+        
+        Calls run under the adaptive concurrency limit. 429s, 5xx responses and
+        transport errors shrink that limit and are retried up to SAM_MAX_RETRIES
+        times, waiting for Retry-After when the upstream sends one.
+        
+        Args:
+            params: Query parameters
+            timeout: Per-request timeout in seconds
+            url: Endpoint override (defaults to the search endpoint)
+            archive: Keep the raw response in the replayable archive; only sync and
+                collector fetches do, never interactive searches or lookups
+            
+        Returns:
+            Decoded JSON response
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self.concurrency.slot():
+                await self.rate_limiter.acquire()
+                client = http_client.get_client()
+                started = time.monotonic()
+                try:
+                    response = await client.get(
+                        url or self.base_url,
+                        headers=self.headers,
+                        params=params,
+                        timeout=timeout
+                    )
+                except httpx.TransportError as e:
+                    self.concurrency.on_overload(started=started)
+                    if attempt >= settings.SAM_MAX_RETRIES:
+                        raise
+                    failure = f"{type(e).__name__}: {str(e)}"
+                else:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                        self.concurrency.on_overload(
+                            retry_after, throttled=response.status_code == 429, started=started
+                        )
+                        if attempt >= settings.SAM_MAX_RETRIES:
+                            response.raise_for_status()
+                        failure = f"HTTP {response.status_code}"
+                    else:
+                        self.concurrency.on_success(time.monotonic() - started)
+                        response.raise_for_status()
+                        data = response.json()
+                        break
+            
+            # Back off outside the slot so other callers keep their share
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            attempt += 1
+            logger.warning(
+                f"SAM.gov request failed ({failure}); retry {attempt}/{settings.SAM_MAX_RETRIES} "
+                f"in {delay:.1f}s, concurrency limit now {self.concurrency.limit}"
+            )
+            await asyncio.sleep(delay)
+        
+        if archive and settings.RAW_ARCHIVE_ENABLED:
+            # Keep raw pages so mapping/classifier changes can be replayed without quota
+            try:
+                await asyncio.to_thread(raw_archive.append, "sam", url or self.base_url, params, data)
+            except Exception as e:
+                logger.warning(f"Failed to archive SAM.gov response: {str(e)}")
+        
+        return data
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        ceiling = min(settings.SAM_RETRY_BACKOFF_MAX_SECONDS, settings.SAM_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    async def fetch_search_page(self, params: Dict, url: Optional[str] = None, timeout: float = 30.0) -> Dict:
+        """
+        Fetch a raw search page under the shared SAM.gov rate limit (used by collectors)
+        
+        Args:
+            params: Query parameters
+            url: Endpoint override
+            timeout: Per-request timeout in seconds
+            
+        Returns:
+            Decoded JSON response
+        """
+        return await self._get(params, timeout=timeout, url=url, archive=True)
     
     async def search_opportunities(
         self,
@@ -55,10 +207,10 @@ class SAMService:
         
         # Add search filters
         if keyword:
-            params['keyword'] = keyword
+            params['keyword'] = keyword.strip().lower()
         
         if notice_types:
-            params['noticeType'] = ','.join(notice_types)
+            params['noticeType'] = ','.join(sorted(notice_types))
         
         if posted_from:
             params['postedFrom'] = posted_from.strftime('%m/%d/%Y')
@@ -66,45 +218,55 @@ class SAMService:
         if posted_to:
             params['postedTo'] = posted_to.strftime('%m/%d/%Y')
         
-        # Note: Department and PSC filtering might need to be done post-query
-        # as the API parameters may be different than expected
+        # Department keeps its case-insensitive substring match on the organization
+        # or department name, which the upstream deptname parameter doesn't offer,
+        # so it is applied locally
+        department_filter = department.strip().lower() if department else None
+        
+        # A single PSC code is pushed down so upstream pages and totals reflect it
+        psc_filter = None
+        if psc_codes:
+            if len(psc_codes) == 1:
+                params['ccode'] = psc_codes[0]
+            else:
+                # The API takes one classification code per query
+                psc_filter = frozenset(psc_codes)
         
+        # Identical searches from many users share one cached upstream response
+        cache_key = (
+            tuple(sorted(params.items())),
+            department_filter,
+            tuple(sorted(psc_filter)) if psc_filter else None
+        )
+        
+        return await self.search_cache.get_or_fetch(
+            cache_key,
+            lambda: self._search(params, department_filter, psc_filter, size, page)
+        )
+    
+    async def _search(
+        self,
+        params: Dict,
+        department_filter: Optional[str],
+        psc_filter: Optional[frozenset],
+        size: int,
+        page: int
+    ) -> Dict:
+        """Run an uncached search against SAM.gov"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    headers=self.headers,
-                    params=params
+            if department_filter or psc_filter:
+                return await self._search_filtered(
+                    params, self._record_filter(department_filter, psc_filter), size, page
                 )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Post-process filtering if needed
-                opportunities = data.get('opportunitiesData', [])
-                
-                if department:
-                    opportunities = [
-                        opp for opp in opportunities 
-                        if department.lower() in opp.get('organizationFullName', '').lower()
-                        or department.lower() in opp.get('departmentFullName', '').lower()
-                    ]
-                
-                if psc_codes:
-                    opportunities = [
-                        opp for opp in opportunities 
-                        if opp.get('classificationCode') in psc_codes
-                    ]
-                
-                # Return filtered results
-                return {
-                    'opportunities': opportunities,
-                    'totalRecords': len(opportunities) if (department or psc_codes) else data.get('totalRecords', 0),
-                    'page': page,
-                    'size': size,
-                    'totalPages': (len(opportunities) + size - 1) // size if (department or psc_codes) else (data.get('totalRecords', 0) + size - 1) // size
-                }
-                
+            
+            data = await self._get(params)
+            return self._search_result(
+                data.get('opportunitiesData', []),
+                data.get('totalRecords', 0),
+                size,
+                page
+            )
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"SAM.gov API HTTP error: {e.response.status_code} - {e.response.text}")
             raise
@@ -112,38 +274,181 @@ class SAMService:
             logger.error(f"SAM.gov API error: {str(e)}")
             raise
     
+    @staticmethod
+    def _record_filter(department_filter: Optional[str], psc_filter: Optional[frozenset]) -> Callable[[Dict], bool]:
+        """Local match for a department substring and/or a set of PSC codes"""
+        def matches(opp: Dict) -> bool:
+            if psc_filter and opp.get('classificationCode') not in psc_filter:
+                return False
+            if department_filter:
+                names = ((opp.get('organizationFullName') or '').lower(), (opp.get('departmentFullName') or '').lower())
+                return any(department_filter in name for name in names)
+            return True
+        
+        return matches
+    
+    async def _search_filtered(
+        self,
+        params: Dict,
+        record_filter: Callable[[Dict], bool],
+        size: int,
+        page: int
+    ) -> Dict:
+        """
+        Fill a result page for filters the API can't express
+        
+        Pulls large upstream pages and filters them locally until the requested
+        page is filled, upstream runs out, or SAM_SEARCH_MAX_UPSTREAM_PAGES is
+        spent. When upstream wasn't fully scanned, totalRecords is extrapolated
+        from the match rate so far and flagged with totalIsEstimate.
+        """
+        upstream_size = settings.SAM_SEARCH_UPSTREAM_PAGE_SIZE
+        wanted = (page + 1) * size
+        matches = []
+        scanned = 0
+        upstream_total = 0
+        exhausted = False
+        
+        for upstream_page in range(settings.SAM_SEARCH_MAX_UPSTREAM_PAGES):
+            data = await self._get({**params, 'size': upstream_size, 'page': upstream_page})
+            batch = data.get('opportunitiesData', [])
+            upstream_total = data.get('totalRecords', 0)
+            scanned += len(batch)
+            matches.extend(opp for opp in batch if record_filter(opp))
+            
+            if not batch or scanned >= upstream_total:
+                exhausted = True
+                break
+            if len(matches) >= wanted:
+                break
+        
+        if exhausted:
+            total_records = len(matches)
+        else:
+            total_records = max(len(matches), round(len(matches) * upstream_total / scanned))
+        
+        return self._search_result(
+            matches[page * size:wanted],
+            total_records,
+            size,
+            page,
+            estimated=not exhausted
+        )
+    
+    def _search_result(
+        self,
+        opportunities: List[Dict],
+        total_records: int,
+        size: int,
+        page: int,
+        estimated: bool = False
+    ) -> Dict:
+        return {
+            'opportunities': opportunities,
+            'totalRecords': total_records,
+            'page': page,
+            'size': size,
+            'totalPages': (total_records + size - 1) // size,
+            'totalIsEstimate': estimated
+        }
+    
     async def get_opportunity_by_id(self, notice_id: str) -> Optional[Dict]:
         """
         Get specific opportunity by notice ID
         
+        Concurrent lookups for the same notice share one upstream request, and
+        results (including not-found) are cached briefly to absorb bursts on hot notices.
+        
         Args:
             notice_id: The opportunity notice ID
             
         Returns:
             Opportunity data or None if not found
         """
+        try:
+            return await self.opportunity_cache.get_or_fetch(
+                notice_id,
+                lambda: self._fetch_opportunity_by_id(notice_id)
+            )
+            
+        except Exception as e:
+            logger.error(f"Error fetching opportunity {notice_id}: {str(e)}")
+            return None
+    
+    async def _fetch_opportunity_by_id(self, notice_id: str) -> Optional[Dict]:
+        """Fetch one opportunity from SAM.gov (errors propagate so they are not cached)"""
         params = {
             'opportunityIds': notice_id,
             'size': 1
         }
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    headers=self.headers,
-                    params=params
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                opportunities = data.get('opportunitiesData', [])
-                
-                return opportunities[0] if opportunities else None
-                
-        except Exception as e:
-            logger.error(f"Error fetching opportunity {notice_id}: {str(e)}")
-            return None
+        data = await self._get(params)
+        opportunities = data.get('opportunitiesData', [])
+        
+        return opportunities[0] if opportunities else None
+    
+    async def get_opportunities_by_ids(self, notice_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Resolve many notice IDs with as few upstream requests as possible
+        
+        IDs already in the short-lived opportunity cache are served from it; the
+        rest are packed into chunks of SAM_BATCH_LOOKUP_SIZE IDs per request and
+        the chunks are fetched concurrently under the shared rate limit.
+        
+        Args:
+            notice_ids: Opportunity notice IDs (duplicates are ignored)
+            
+        Returns:
+            Dictionary keyed by every requested notice ID; notices SAM.gov doesn't
+            have map to None
+            
+        Raises:
+            Exception: An upstream request still failed after retries. An outage is
+                never reported as not-found; chunks that did resolve are cached, so
+                a retry only re-requests the rest.
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        pending = []
+        
+        for notice_id in dict.fromkeys(notice_ids):
+            found, opportunity = self.opportunity_cache.lookup(notice_id)
+            if found:
+                results[notice_id] = opportunity
+            else:
+                pending.append(notice_id)
+        
+        chunk_size = settings.SAM_BATCH_LOOKUP_SIZE
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, Optional[Dict]]:
+            params = {
+                'opportunityIds': ','.join(chunk),
+                'size': len(chunk)
+            }
+            try:
+                data = await self._get(params)
+            except Exception as e:
+                logger.error(f"Error fetching batch of {len(chunk)} opportunities: {str(e)}")
+                raise
+            
+            found = {
+                opp.get('noticeId'): opp
+                for opp in data.get('opportunitiesData', [])
+                if opp.get('noticeId') in chunk
+            }
+            chunk_results = {notice_id: found.get(notice_id) for notice_id in chunk}
+            for notice_id, opportunity in chunk_results.items():
+                self.opportunity_cache.put(notice_id, opportunity)
+            return chunk_results
+        
+        for chunk_results in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        
+        logger.info(
+            f"Resolved {sum(1 for opp in results.values() if opp)}/{len(results)} opportunities "
+            f"in {len(chunks)} upstream requests"
+        )
+        return results
     
     async def get_opportunity_by_solicitation_number(self, sol_number: str) -> Optional[Dict]:
         """
@@ -161,86 +466,249 @@ class SAMService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    headers=self.headers,
-                    params=params
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                opportunities = data.get('opportunitiesData', [])
-                
-                return opportunities[0] if opportunities else None
-                
+            data = await self._get(params)
+            opportunities = data.get('opportunitiesData', [])
+            
+            return opportunities[0] if opportunities else None
+            
         except Exception as e:
             logger.error(f"Error fetching solicitation {sol_number}: {str(e)}")
             return None
     
-    async def get_daily_opportunities(self, target_date: Optional[datetime] = None) -> List[Dict]:
+    async def get_daily_opportunities(
+        self,
+        target_date: Optional[datetime] = None,
+        concurrent: Optional[bool] = None
+    ) -> List[Dict]:
         """
         Get all opportunities posted on a specific date (for daily sync)
         
         Args:
             target_date: Date to fetch opportunities for (defaults to yesterday)
+            concurrent: Fetch remaining pages concurrently after reading totalRecords
+                from the first page (defaults to SAM_CONCURRENT_PAGE_FETCH)
             
         Returns:
             List of opportunity dictionaries
+            
+        Raises:
+            IncompleteFetchError: Some pages failed after retries; carries the records
+                that were fetched and the missing page numbers
         """
         if not target_date:
             target_date = datetime.now() - timedelta(days=1)
         
+        if concurrent is None:
+            concurrent = settings.SAM_CONCURRENT_PAGE_FETCH
+        
         # SAM.gov typically posts opportunities in the morning
         start_date = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_date = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        size = 100  # Larger size for bulk sync
+        
+        if concurrent:
+            all_opportunities, failed_pages = await self._fetch_daily_pages_concurrently(start_date, end_date, size)
+        else:
+            all_opportunities, failed_pages = await self._fetch_daily_pages_sequentially(start_date, end_date, size)
+        
+        if failed_pages:
+            logger.error(f"Daily sync for {target_date.strftime('%Y-%m-%d')} is missing pages {failed_pages}")
+            raise IncompleteFetchError(all_opportunities, failed_pages)
+        logger.info(f"Fetched {len(all_opportunities)} opportunities for {target_date.strftime('%Y-%m-%d')}")
+        return all_opportunities
+    
+    async def _fetch_daily_pages_sequentially(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        size: int
+    ) -> Tuple[List[Dict], List[int]]:
+        """
+        Fetch a daily window one page at a time
+        
+        _get already retries throttled/failed pages; a page that still fails is
+        recorded and skipped so one bad page doesn't end the whole day. Without the
+        first page the page count is unknown, so its failure propagates.
         
-        all_opportunities = []
+        Returns:
+            (opportunities in page order deduplicated by noticeId, page numbers that failed)
+        """
+        pages = []
+        failed_pages = []
         page = 0
-        size = 100  # Larger size for bulk sync
+        total_pages = None
         
-        while True:
+        while total_pages is None or page < total_pages:
             try:
-                params = {
-                    'postedFrom': start_date.strftime('%m/%d/%Y'),
-                    'postedTo': end_date.strftime('%m/%d/%Y'),
-                    'size': size,
-                    'page': page,
-                    'includeCount': 'true'
-                }
-                
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.get(
-                        self.base_url,
-                        headers=self.headers,
-                        params=params
-                    )
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    opportunities = data.get('opportunitiesData', [])
-                    
-                    if not opportunities:
-                        break
-                    
-                    all_opportunities.extend(opportunities)
-                    
-                    # Check if we have more pages
-                    total_records = data.get('totalRecords', 0)
-                    if len(all_opportunities) >= total_records:
-                        break
-                    
-                    page += 1
-                    
-                    # Add small delay to be respectful to API
-                    await asyncio.sleep(0.1)
-                    
+                data = await self._get_daily_page(start_date, end_date, size, page)
             except Exception as e:
-                logger.error(f"Error fetching daily opportunities page {page}: {str(e)}")
+                logger.error(f"Error fetching daily opportunities page {page} after retries: {str(e)}")
+                if total_pages is None:
+                    raise
+                failed_pages.append(page)
+                page += 1
+                continue
+            
+            opportunities = data.get('opportunitiesData', [])
+            if total_pages is None:
+                total_pages = (data.get('totalRecords', 0) + size - 1) // size
+            if not opportunities:
                 break
+            pages.append(opportunities)
+            page += 1
         
-        logger.info(f"Fetched {len(all_opportunities)} opportunities for {target_date.strftime('%Y-%m-%d')}")
-        return all_opportunities
+        # Upstream ordering can shift between page reads and repeat a notice, as in concurrent mode
+        return self._dedupe_by_notice_id(pages), failed_pages
+    
+    async def iter_daily_pages(
+        self,
+        target_date: datetime,
+        start_page: int = 0,
+        size: int = 100
+    ) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        Stream the pages of a daily sync window in page order
+        
+        Args:
+            target_date: Date to fetch opportunities for
+            start_page: First page to fetch (for resuming)
+            size: Records per page
+            
+        Yields:
+            (page number, opportunities on that page)
+        """
+        start_date = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        async def fetch_page(page: int) -> Dict:
+            return await self._get_daily_page(start_date, end_date, size, page)
+        
+        async for page in self._iter_pages(fetch_page, start_page, size):
+            yield page
+    
+    async def iter_search_pages(
+        self,
+        params: Dict,
+        url: Optional[str] = None,
+        limit: int = 1000
+    ) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        Stream every page of a search query using limit/offset paging
+        
+        Args:
+            params: Query parameters without limit/offset
+            url: Endpoint override (defaults to the search endpoint)
+            limit: Records per page
+            
+        Yields:
+            (page number, opportunities on that page)
+        """
+        async def fetch_page(page: int) -> Dict:
+            return await self._get(
+                {**params, 'limit': limit, 'offset': page * limit}, timeout=60.0, url=url, archive=True
+            )
+        
+        async for page in self._iter_pages(fetch_page, 0, limit):
+            yield page
+    
+    async def _iter_pages(
+        self,
+        fetch_page: Callable[[int], Awaitable[Dict]],
+        start_page: int,
+        size: int
+    ) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        Yield pages in order with a bounded fetch-ahead window
+        
+        After the first page reveals totalRecords, up to SAM_MAX_CONCURRENT_REQUESTS
+        pages are kept in flight ahead of the consumer, so memory is bounded by that
+        window rather than the size of the result. Fetch errors propagate so callers
+        never mistake a failed page for an empty one.
+        """
+        first_page = await fetch_page(start_page)
+        total_pages = (first_page.get('totalRecords', 0) + size - 1) // size
+        yield start_page, first_page.get('opportunitiesData', [])
+        
+        async def fetch_records(page: int) -> List[Dict]:
+            return (await fetch_page(page)).get('opportunitiesData', [])
+        
+        window = deque()
+        next_page = start_page + 1
+        try:
+            while next_page < total_pages or window:
+                while next_page < total_pages and len(window) < settings.SAM_MAX_CONCURRENT_REQUESTS:
+                    window.append((next_page, asyncio.create_task(fetch_records(next_page))))
+                    next_page += 1
+                page, task = window.popleft()
+                yield page, await task
+        finally:
+            for _, task in window:
+                task.cancel()
+    
+    async def _get_daily_page(self, start_date: datetime, end_date: datetime, size: int, page: int) -> Dict:
+        """Fetch one page of a daily sync window (archived for replay)"""
+        return await self._get(self._daily_page_params(start_date, end_date, size, page), timeout=60.0, archive=True)
+    
+    def _daily_page_params(self, start_date: datetime, end_date: datetime, size: int, page: int) -> Dict:
+        """Build query parameters for one page of a daily sync window"""
+        return {
+            'postedFrom': start_date.strftime('%m/%d/%Y'),
+            'postedTo': end_date.strftime('%m/%d/%Y'),
+            'size': size,
+            'page': page,
+            'includeCount': 'true'
+        }
+    
+    async def _fetch_daily_pages_concurrently(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        size: int
+    ) -> Tuple[List[Dict], List[int]]:
+        """
+        Fetch the first page to learn totalRecords, then the remaining pages concurrently
+        
+        Concurrency and request rate are bounded by the shared limiter in _get, so
+        this only beats the sequential walk when upstream latency is longer than the
+        interval between requests the rate limit allows (1 / SAM_REQUESTS_PER_SECOND).
+        A failure of the first page propagates, as the page count is unknown without it.
+        
+        Returns:
+            (opportunities in page order deduplicated by noticeId, page numbers that failed)
+        """
+        first_page = await self._get_daily_page(start_date, end_date, size, 0)
+        
+        total_records = first_page.get('totalRecords', 0)
+        total_pages = (total_records + size - 1) // size
+        failed_pages = []
+        
+        async def fetch_page(page: int) -> List[Dict]:
+            try:
+                data = await self._get_daily_page(start_date, end_date, size, page)
+                return data.get('opportunitiesData', [])
+            except Exception as e:
+                logger.error(f"Error fetching daily opportunities page {page} after retries: {str(e)}")
+                failed_pages.append(page)
+                return []
+        
+        pages = [first_page.get('opportunitiesData', [])]
+        pages.extend(await asyncio.gather(*(fetch_page(page) for page in range(1, total_pages))))
+        
+        return self._dedupe_by_notice_id(pages), sorted(failed_pages)
+    
+    def _dedupe_by_notice_id(self, pages: List[List[Dict]]) -> List[Dict]:
+        """Flatten pages in order, keeping the first occurrence of each noticeId"""
+        seen = set()
+        opportunities = []
+        for page in pages:
+            for opp in page:
+                notice_id = opp.get('noticeId')
+                if notice_id:
+                    if notice_id in seen:
+                        continue
+                    seen.add(notice_id)
+                opportunities.append(opp)
+        return opportunities
     
     def extract_notice_id_from_url(self, url: str) -> Optional[str]:
         """
@@ -12,6 +12,8 @@ from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
 from app.services.data_collector import data_collector
+from app.services.sam_service import IncompleteFetchError, sam_service
+from app.services.opportunity_service import opportunity_service
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +55,25 @@ class SchedulerService:
             replace_existing=True
         )
         
+        # Weekly full reconcile on Sunday at 3:00 AM EST - re-walks the whole window
+        # so anything the incremental watermarks missed is picked up
+        self.scheduler.add_job(
+            func=self.weekly_full_reconcile,
+            trigger=CronTrigger(day_of_week='sun', hour=3, minute=0, timezone='America/New_York'),
+            id='weekly_full_reconcile',
+            name='Weekly Full Reconcile Collection',
+            replace_existing=True
+        )
+        
+        # Weekly partition maintenance and retention on Sunday at 5:00 AM EST, after the reconcile
+        self.scheduler.add_job(
+            func=self.cleanup_old_opportunities,
+            trigger=CronTrigger(day_of_week='sun', hour=5, minute=0, timezone='America/New_York'),
+            id='weekly_opportunity_cleanup',
+            name='Weekly Partition Maintenance & Retention',
+            replace_existing=True
+        )
+        
         # Evening data processing and deduplication at 6:00 PM EST
         self.scheduler.add_job(
             func=self.evening_data_processing,
@@ -84,7 +105,7 @@ class SchedulerService:
             
             # Log platform-specific results
             for platform, platform_results in results['platform_results'].items():
-                logger.info(f"  {platform}: {platform_results['new_opportunities']} new from {platform_results['total_fetched']} fetched")
+                logger.info(f"  {platform}: {platform_results['new_opportunities']} new from {platform_results['total_fetched']} fetched in {platform_results['seconds']:.1f}s")
             
             if results['errors']:
                 logger.warning(f"Collection had {len(results['errors'])} errors")
@@ -98,6 +119,22 @@ class SchedulerService:
             logger.error(f"Morning data collection failed: {str(e)}")
             await self._notify_sync_error(f"Morning collection: {str(e)}")
     
+    async def weekly_full_reconcile(self):
+        """
+        Full reconcile collection ignoring incremental watermarks
+        Re-fetches the whole trailing window from every platform and resets watermarks
+        """
+        logger.info("Starting weekly full reconcile collection...")
+        
+        try:
+            results = await data_collector.run_daily_collection(mode="full")
+            logger.info(f"Full reconcile completed: {results['new_opportunities']} new from {results['total_fetched']} fetched")
+            await self._notify_collection_results(results, "full reconcile")
+            
+        except Exception as e:
+            logger.error(f"Weekly full reconcile failed: {str(e)}")
+            await self._notify_sync_error(f"Full reconcile: {str(e)}")
+    
     async def evening_data_processing(self):
         """
         Evening data processing and deduplication
@@ -113,9 +150,9 @@ class SchedulerService:
                 dedup_results = deduplicator.deduplicate_opportunities(db, limit=200)
                 logger.info(f"Deduplication completed: {dedup_results}")
                 
-                # Run data standardization
-                # This would standardize agency names, clean titles, etc.
-                logger.info("Data standardization completed")
+                # Run data standardization (agency names, titles, PSC formats)
+                standardization_results = standardizer.standardize_opportunities(db)
+                logger.info(f"Data standardization completed: {standardization_results}")
                 
             await self._notify_processing_results("evening", dedup_results)
                 
@@ -134,7 +171,11 @@ class SchedulerService:
             today = datetime.now()
             
             # Check for opportunities posted today
-            opportunities = await sam_service.get_daily_opportunities(today)
+            try:
+                opportunities = await sam_service.get_daily_opportunities(today)
+            except IncompleteFetchError as e:
+                logger.error(f"Midday check is missing SAM.gov pages {e.failed_pages}; saving the fetched records")
+                opportunities = e.opportunities
             
             if opportunities:
                 db: Session = SessionLocal()
@@ -159,11 +200,25 @@ class SchedulerService:
     async def cleanup_old_opportunities(self):
         """
         Weekly cleanup of old opportunities to manage database size
-        Removes opportunities older than 90 days that are no longer active
+        Prepares upcoming opportunity partitions and retires those past
+        OPPORTUNITY_RETENTION_MONTHS (detach + archive/drop, no row deletes on Postgres),
+        prunes the raw SAM.gov archive, then removes legacy RFQs older than 90 days
+        that are no longer active
         """
         logger.info("Starting weekly opportunity cleanup...")
         
         try:
+            from app.services.opportunity_partitions import partition_service
+            
+            from app.services.raw_archive import raw_archive
+            
+            with SessionLocal() as db:
+                partition_results = await asyncio.to_thread(partition_service.run_maintenance, db)
+                logger.info(f"Partition maintenance completed: {partition_results}")
+            
+            pruned = await asyncio.to_thread(raw_archive.prune)
+            logger.info(f"Raw archive retention completed: {len(pruned)} partitions removed")
+            
             cutoff_date = datetime.now() - timedelta(days=90)
             
             db: Session = SessionLocal()
@@ -172,7 +227,7 @@ class SchedulerService:
                     db, cutoff_date
                 )
                 
-                logger.info(f"Weekly cleanup completed: {deleted_count} old opportunities removed")
+                logger.info(f"Weekly cleanup completed: {deleted_count} old RFQs removed")
                 
             finally:
                 db.close()
@@ -196,7 +251,14 @@ class SchedulerService:
         logger.info(f"Starting manual sync for {target_date.strftime('%Y-%m-%d')}...")
         
         try:
-            opportunities = await sam_service.get_daily_opportunities(target_date)
+            try:
+                opportunities = await sam_service.get_daily_opportunities(target_date)
+            except IncompleteFetchError as e:
+                logger.error(
+                    f"Manual sync for {target_date.strftime('%Y-%m-%d')} is missing SAM.gov pages "
+                    f"{e.failed_pages}; saving the fetched records"
+                )
+                opportunities = e.opportunities
             
             if not opportunities:
                 logger.info(f"No opportunities found for {target_date.strftime('%Y-%m-%d')}")
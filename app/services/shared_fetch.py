@@ -0,0 +1,190 @@
+"""
+Fetch-once, route-many ingestion for collectors backed by the SAM.gov search API
+
+Several platforms (SAM.gov product notices, GSA eBuy) are views over the same
+search endpoint. Each platform declares the filter sets it keeps watermarks for
+(one per product PSC prefix); a filter set declared by several platforms is
+queried once, from the oldest of their watermarks, as a bounded concurrent
+fan-out. Each record counts for every collector whose predicate accepts it and
+is written once, under the first of them.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.services.sam_service import sam_service
+
+logger = logging.getLogger(__name__)
+
+class SharedSAMFetch:
+    """Query the SAM.gov search filter sets of several collectors and route records to them"""
+
+    def __init__(self, collectors: List[Any]):
+        """
+        Args:
+            collectors: Open SAM-backed collectors in routing priority order; a record
+                counts for each one whose ``accepts`` returns True and is stored by the first
+        """
+        self.collectors = collectors
+
+    def route(self, record: Dict[str, Any]) -> List[Any]:
+        """Every collector that wants a record, in priority order (the first one stores it)"""
+        return [collector for collector in self.collectors if collector.accepts(record)]
+
+    async def run(self, mode: str = "incremental") -> Dict[str, Dict[str, Any]]:
+        """
+        Query every participating filter set once and route its records to the collectors
+
+        Requests share SAMService's rate limit and adaptive concurrency, which
+        retries throttled or failed calls. A filter set that still fails reports
+        its error to every collector declaring it and keeps their old watermarks,
+        so the next run re-covers its window; otherwise each declaring collector's
+        watermark advances to the newest posted date the query saw. Per filter set
+        stats land in each declaring platform's ``psc_timings``, with fetched, new
+        and updated counted for that platform.
+
+        Args:
+            mode: "incremental" (each filter set from its watermark) or "full" reconcile
+
+        Returns:
+            Results per platform
+        """
+        started = time.perf_counter()
+        runs = {collector: collector.create_collection_run(mode) for collector in self.collectors}
+        results = {
+            collector: {"total_fetched": 0, "new_opportunities": 0, "updated_opportunities": 0, "errors": []}
+            for collector in self.collectors
+        }
+        # Writes share each collector's session, so they are serialized per collector
+        write_locks = {collector: asyncio.Lock() for collector in self.collectors}
+        slots = asyncio.Semaphore(settings.SAM_PSC_FANOUT_CONCURRENCY)
+        posted_to = datetime.now().strftime("%m/%d/%Y")
+        url = f"{settings.SAM_API_BASE_URL}/prod/opportunities/v2/search"
+        seen = set()
+        unrouted = 0
+
+        async def write(collector: Any, rows: List[Dict[str, Any]], counts: Dict[str, int]):
+            async with write_locks[collector]:
+                inserted, updated = await collector.run_in_thread(collector.save_batch, rows)
+            counts["new"] += inserted
+            counts["updated"] += updated
+            results[collector]["new_opportunities"] += inserted
+            results[collector]["updated_opportunities"] += updated
+
+        async def fetch_filter_set(filter_key: str, filter_params: Dict[str, str],
+                                   window_start: datetime) -> Dict[str, Any]:
+            nonlocal unrouted
+            async with slots:
+                query_started = time.perf_counter()
+                timing = {
+                    "error": None,
+                    "posted_from": window_start.strftime("%m/%d/%Y"),
+                    "high_water_mark": None,
+                    "counts": {collector: {"fetched": 0, "new": 0, "updated": 0} for collector in self.collectors}
+                }
+                counts = timing["counts"]
+                high_water_mark = None
+                try:
+                    params = {
+                        "api_key": settings.SAM_GOV_API_KEY,
+                        **filter_params,
+                        "postedFrom": timing["posted_from"],
+                        "postedTo": posted_to,
+                        "noticeType": "o,k"  # Solicitation types
+                    }
+
+                    async for _, records in sam_service.iter_search_pages(params, url=url):
+                        batches = {collector: [] for collector in self.collectors}
+                        for record in records:
+                            posted_date = self.collectors[0].parse_date(record.get("postedDate"))
+                            if posted_date and (high_water_mark is None or posted_date > high_water_mark):
+                                high_water_mark = posted_date
+
+                            notice_id = record.get("noticeId")
+                            if notice_id in seen:
+                                continue  # Already routed from another filter set this run
+                            if notice_id:
+                                seen.add(notice_id)
+
+                            interested = self.route(record)
+                            if not interested:
+                                unrouted += 1
+                                continue
+                            for collector in interested:
+                                counts[collector]["fetched"] += 1
+                                results[collector]["total_fetched"] += 1
+                            # One row per solicitation: the highest-priority collector stores it
+                            owner = interested[0]
+                            row = owner.map_opportunity(record)
+                            if row:
+                                batches[owner].append(owner.classify_opportunity(row))
+
+                        for collector, rows in batches.items():
+                            if rows:
+                                await write(collector, rows, counts[collector])
+
+                    if high_water_mark:
+                        timing["high_water_mark"] = high_water_mark.strftime("%Y-%m-%d")
+
+                except Exception as e:
+                    timing["error"] = f"Error fetching {filter_key}: {str(e)}"
+                    logger.error(timing["error"])
+
+                timing["seconds"] = round(time.perf_counter() - query_started, 3)
+                return timing
+
+        # Each filter set is queried once for every collector declaring it, from the
+        # oldest of their windows. Window starts are read before any batch commits
+        # expire the watermark rows.
+        filter_sets: Dict[str, Dict[str, Any]] = {}
+        for collector in self.collectors:
+            watermarks = collector.load_watermarks()
+            for filter_key, filter_params in collector.filter_sets().items():
+                window_start = collector.get_window_start(watermarks.get(filter_key), mode)
+                query = filter_sets.setdefault(
+                    filter_key, {"params": filter_params, "collectors": [], "window_start": window_start}
+                )
+                query["collectors"].append(collector)
+                query["window_start"] = min(query["window_start"], window_start)
+        timings = await asyncio.gather(*(
+            fetch_filter_set(filter_key, query["params"], query["window_start"])
+            for filter_key, query in filter_sets.items()
+        ))
+
+        elapsed = time.perf_counter() - started
+        psc_timings = {collector: {} for collector in self.collectors}
+        for (filter_key, query), timing in zip(filter_sets.items(), timings):
+            counts = timing.pop("counts")
+            for collector in query["collectors"]:
+                # PSC queries are keyed by prefix, as before the fetch was shared
+                psc_timings[collector][query["params"].get("psc", filter_key)] = {**timing, **counts[collector]}
+                if timing["error"]:
+                    results[collector]["errors"].append(timing["error"])
+                else:
+                    # Only advance watermarks for filter sets that were fetched completely
+                    collector.advance_watermark(
+                        filter_key, collector.parse_date(timing["high_water_mark"]), runs[collector], mode
+                    )
+
+        for collector in self.collectors:
+            errors = results[collector]["errors"]
+            collector.update_collection_run(
+                runs[collector], "completed",
+                total_fetched=results[collector]["total_fetched"],
+                new_opportunities=results[collector]["new_opportunities"],
+                updated_opportunities=results[collector]["updated_opportunities"],
+                errors_count=len(errors),
+                error_messages=errors,
+                psc_timings=psc_timings[collector],
+                processing_time_seconds=elapsed
+            )
+
+        logger.info(
+            f"Shared SAM.gov fetch: {len(filter_sets)} filter sets, "
+            + ", ".join(f"{collector.platform_name}={results[collector]['total_fetched']}" for collector in self.collectors)
+            + f", {unrouted} unrouted in {elapsed:.1f}s"
+        )
+        return {collector.platform_name: results[collector] for collector in self.collectors}
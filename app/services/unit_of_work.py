@@ -0,0 +1,158 @@
+"""
+Unit of work for batch jobs
+
+Batch jobs (deduplication, standardization, one-off ingest) used to commit once
+per row. A UnitOfWork collects their per-row mutations instead and writes them
+set-based inside one transaction:
+
+- rows getting identical values share one ``UPDATE ... WHERE id IN (...)``
+- rows getting individual values go out as one executemany ``UPDATE ... WHERE id = ?``
+- mapped opportunity rows are upserted with the opportunity writer
+
+Pending work is flushed every UNIT_OF_WORK_BATCH_SIZE mutations and committed
+once when the unit of work ends.
+"""
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.services.opportunity_writer import upsert_opportunities
+
+logger = logging.getLogger(__name__)
+
+class UnitOfWork:
+    """
+    Collects per-row mutations and writes them set-based in one transaction
+
+        with UnitOfWork(session) as uow:
+            for opportunity in opportunities:
+                uow.update(opportunity, title=clean(opportunity.title))
+    """
+
+    def __init__(self, session: Session, batch_size: Optional[int] = None):
+        self.session = session
+        self.batch_size = batch_size or settings.UNIT_OF_WORK_BATCH_SIZE
+        # (table, primary key column) -> {id: {column: value}}
+        self._updates: Dict[Tuple[Any, Any], Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+        self._pending_updates = 0
+        self._opportunity_rows: List[Dict[str, Any]] = []
+        self.stats = {"rows_updated": 0, "update_statements": 0, "rows_saved": 0, "flushes": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def update(self, instance: Any, **values):
+        """
+        Queue column updates for a loaded ORM instance
+
+        The instance shows the new values right away but is not marked dirty, so
+        the ORM never writes it row by row; the values are written on flush.
+        """
+        state = inspect(instance)
+        table = state.mapper.local_table
+        primary_key = state.mapper.primary_key[0]
+        identity = state.identity[0]
+        for key, value in values.items():
+            set_committed_value(instance, key, value)
+
+        pending = self._updates[(table, primary_key)]
+        if identity not in pending:
+            pending[identity] = {}
+            self._pending_updates += 1
+        pending[identity].update(values)
+        self._flush_if_full()
+
+    def save_opportunity(self, row: Dict[str, Any]):
+        """Queue a mapped opportunity row for upsert (see opportunity_writer)"""
+        self._opportunity_rows.append(row)
+        self._flush_if_full()
+
+    def _flush_if_full(self):
+        if self._pending_updates + len(self._opportunity_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> Tuple[int, int]:
+        """
+        Write pending work without committing
+
+        Returns:
+            (inserted, updated) counts for queued opportunity rows
+        """
+        counts = (0, 0)
+        if not self._pending_updates and not self._opportunity_rows:
+            return counts
+        self.stats["flushes"] += 1
+
+        if self._opportunity_rows:
+            counts = upsert_opportunities(self.session, self._opportunity_rows, commit=False)
+            self.stats["rows_saved"] += len(self._opportunity_rows)
+            self._opportunity_rows = []
+
+        for (table, primary_key), pending in self._updates.items():
+            self._flush_updates(table, primary_key, pending)
+        self._updates.clear()
+        self._pending_updates = 0
+        return counts
+
+    def _flush_updates(self, table, primary_key, pending: Dict[Any, Dict[str, Any]]):
+        # Group rows by the exact values they receive
+        groups: Dict[str, List[Any]] = defaultdict(list)
+        values_by_group: Dict[str, Dict[str, Any]] = {}
+        for identity, values in pending.items():
+            group = json.dumps(values, sort_keys=True, default=str)
+            groups[group].append(identity)
+            values_by_group[group] = values
+
+        individual: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        for group, identities in groups.items():
+            values = values_by_group[group]
+            if len(identities) == 1:
+                columns = tuple(sorted(values))
+                individual[columns].append({**{f"new_{column}": values[column] for column in columns},
+                                            "row_id": identities[0]})
+                continue
+            for start in range(0, len(identities), self.batch_size):
+                self.session.execute(
+                    table.update().where(primary_key.in_(identities[start:start + self.batch_size])).values(values)
+                )
+                self.stats["update_statements"] += 1
+
+        for columns, params in individual.items():
+            self.session.execute(
+                table.update()
+                .where(primary_key == bindparam("row_id"))
+                .values({column: bindparam(f"new_{column}") for column in columns}),
+                params
+            )
+            self.stats["update_statements"] += 1
+
+        self.stats["rows_updated"] += len(pending)
+
+    def commit(self):
+        """Flush pending work and commit the transaction"""
+        try:
+            self.flush()
+            self.session.commit()
+        except Exception:
+            self.rollback()
+            raise
+        logger.debug(f"Unit of work committed: {self.stats}")
+
+    def rollback(self):
+        """Drop pending work and roll back the transaction"""
+        self._updates.clear()
+        self._pending_updates = 0
+        self._opportunity_rows = []
+        self.session.rollback()
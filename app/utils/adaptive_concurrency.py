@@ -0,0 +1,127 @@
+"""
+AIMD (additive-increase / multiplicative-decrease) adaptive concurrency limiter
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+class AIMDController:
+    """
+    Concurrency limit that probes upward while the upstream is healthy and backs off on overload
+
+    Each successful call under ``latency_target`` grows the limit by roughly
+    ``increase_step`` per full window of calls; throttles (429), server errors and
+    timeouts multiply it by ``decrease_factor``, at most once per congestion window:
+    failures of calls that started before the last decrease were sent at the old
+    limit and don't cut it again. A ``Retry-After`` hint pauses all new calls until
+    it expires.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_target: float = 2.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._decreased_at = float("-inf")
+        # Created on first use in the running loop, like TokenBucket's lock
+        self._condition = None
+        self._condition_loop = None
+        self.stats = {
+            "successes": 0,
+            "slow_successes": 0,
+            "throttles": 0,
+            "failures": 0,
+            "decreases": 0,
+            "same_window_overloads": 0
+        }
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _get_condition(self) -> asyncio.Condition:
+        """The slot condition for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def acquire(self):
+        """Wait for a free slot (and for any Retry-After pause to end)"""
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            condition = self._get_condition()
+            async with condition:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                await condition.wait()
+
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot for the duration of a call"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def on_success(self, latency: float):
+        """Record a healthy response; grow the limit additively if it was fast enough"""
+        if latency > self.latency_target:
+            self.stats["slow_successes"] += 1
+            return
+        self.stats["successes"] += 1
+        self._limit = min(self.max_limit, self._limit + self.increase_step / max(self._limit, 1.0))
+
+    def on_overload(self, retry_after: Optional[float] = None, throttled: bool = False,
+                    started: Optional[float] = None):
+        """
+        Record a 429, 5xx or timeout; cut the limit multiplicatively
+
+        Args:
+            retry_after: Seconds the upstream asked us to wait before retrying
+            throttled: True for explicit rate limiting (429)
+            started: ``time.monotonic()`` when the failed call was sent; calls sent
+                before the last decrease belong to the same congestion event
+        """
+        self.stats["throttles" if throttled else "failures"] += 1
+        if started is not None and started < self._decreased_at:
+            self.stats["same_window_overloads"] += 1
+        else:
+            self.stats["decreases"] += 1
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+            self._decreased_at = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3)
+        }
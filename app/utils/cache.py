@@ -0,0 +1,161 @@
+"""
+In-process async caching helpers for upstream API responses
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Share one in-flight call per key among all concurrent awaiters"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await the in-flight call for ``key``, starting one if none is running
+
+        The call runs as its own task, so a cancelled awaiter does not cancel it
+        for everyone else.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.stats["calls"] += 1
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every awaiter went away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight)}
+
+class TTLCache:
+    """
+    Bounded LRU cache with a freshness TTL and a stale-while-revalidate window.
+
+    Entries younger than ``ttl`` are served directly. Entries older than ``ttl``
+    but within ``ttl + stale_ttl`` are served immediately while one background
+    task refreshes them. Anything older is treated as a miss; concurrent misses
+    for the same key share a single fetch.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._single_flight = SingleFlight()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0
+        }
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            self._store(key, await fetch())
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the stale entry until it ages out
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Background cache refresh failed for {key}: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached value, fetching (or refreshing in the background) as needed
+
+        Args:
+            key: Normalized, hashable cache key
+            fetch: Zero-argument coroutine factory producing a fresh value
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    task = asyncio.create_task(self._refresh(key, fetch))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return value
+
+            del self._entries[key]
+
+        self.stats["misses"] += 1
+        return await self._single_flight.do(key, lambda: self._fetch_and_store(key, fetch))
+
+    async def _fetch_and_store(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        self._store(key, value)
+        return value
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Get a fresh cached value without fetching
+
+        Returns:
+            (found, value) - found is False for missing or expired entries
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, entry[0]
+        return False, None
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value fetched elsewhere (e.g. by a batched request)"""
+        self._store(key, value)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/stale counters and current size"""
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "coalesced": self._single_flight.stats["shared"]
+        }
@@ -0,0 +1,63 @@
+"""
+Shared pytest setup: a throwaway SQLite database and the in-process SAM.gov stand-in
+
+Settings are read when app modules are first imported, so the environment is
+set here before any test module imports them.
+"""
+import asyncio
+import os
+import tempfile
+
+_test_dir = tempfile.mkdtemp(prefix="rfq-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_test_dir}/test.sqlite",
+    SAM_API_BASE_URL="http://sam.test",
+    SAM_GOV_API_KEY="test-key",
+    SAM_REQUESTS_PER_SECOND="1000",
+    SAM_RATE_LIMIT_BURST="1000",
+    RAW_ARCHIVE_ENABLED="false",
+    DEBUG="false"
+)
+
+import httpx
+import pytest
+
+from app.core.database import engine
+from app.core.http_client import http_client
+from app.models.opportunity import Base as OpportunityBase
+from tests.sam_fake import FakeSAMConfig, create_app
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    OpportunityBase.metadata.create_all(engine)
+    yield
+    OpportunityBase.metadata.drop_all(engine)
+
+@pytest.fixture
+def db():
+    """Session on the test database; opportunity tables are emptied afterwards"""
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for table in reversed(OpportunityBase.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    session.close()
+
+@pytest.fixture
+def fake_sam(db):
+    """
+    Serve records from the SAM.gov stand-in through the shared HTTP client
+
+    Returns a function taking (records, config) that returns the fake app; its
+    ``state.sam.stats`` counts requests, throttles and errors.
+    """
+    def serve(records, config=None):
+        app = create_app(records, config or FakeSAMConfig())
+        asyncio.run(http_client.start(transport=httpx.ASGITransport(app=app)))
+        return app
+
+    yield serve
+    asyncio.run(http_client.close())
@@ -0,0 +1,14 @@
+"""
+Local SAM.gov stand-in server and recorded-fixture library
+"""
+from tests.sam_fake.fixtures import generate_opportunities, load_recorded_fixtures, default_fixture_path
+from tests.sam_fake.server import FakeSAMConfig, create_app, filter_records
+
+__all__ = [
+    "FakeSAMConfig",
+    "create_app",
+    "filter_records",
+    "generate_opportunities",
+    "load_recorded_fixtures",
+    "default_fixture_path"
+]
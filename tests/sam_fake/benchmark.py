@@ -0,0 +1,93 @@
+"""
+Offline ingest benchmark against the SAM.gov stand-in
+
+    python -m tests.sam_fake.benchmark --records 5000 --latency 0.2
+    python -m tests.sam_fake.benchmark --fixtures tests/fixtures/sam
+
+Measures daily page fetching (sequential vs concurrent) and streaming pipeline
+throughput without network or database access. Request rate and concurrency
+follow the usual settings, e.g. SAM_REQUESTS_PER_SECOND=50.
+
+Each mode starts with fresh rate-limit and concurrency state. Concurrent page
+fetching only wins when --latency is longer than 1 / SAM_REQUESTS_PER_SECOND;
+below that both modes run at the rate limit.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+# Point SAMService at the stand-in before app settings are loaded
+os.environ.setdefault("SAM_API_BASE_URL", "http://sam.test")
+
+import httpx
+
+from app.core.http_client import http_client
+from app.services.data_collector import SAMGovCollector
+from app.services.ingest_pipeline import IngestPipeline
+from app.services.sam_service import SAMService, sam_service
+from tests.sam_fake.fixtures import generate_opportunities, load_recorded_fixtures
+from tests.sam_fake.server import FakeSAMConfig, create_app
+
+async def run_benchmark(args: argparse.Namespace):
+    target_date = datetime.strptime(args.date, "%Y-%m-%d")
+
+    if args.fixtures:
+        records = load_recorded_fixtures(args.fixtures)
+    else:
+        records = generate_opportunities(args.records, target_date, seed=args.seed)
+
+    config = FakeSAMConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    fake = create_app(records, config)
+    await http_client.start(transport=httpx.ASGITransport(app=fake))
+
+    try:
+        for concurrent in (False, True):
+            fake.state.sam.stats["max_in_flight"] = 0
+            # A full token bucket and the initial concurrency limit for each mode
+            service = SAMService()
+            started = time.perf_counter()
+            opportunities = await service.get_daily_opportunities(target_date, concurrent=concurrent)
+            elapsed = time.perf_counter() - started
+            print(
+                f"get_daily_opportunities(concurrent={concurrent}): {len(opportunities)} records "
+                f"in {elapsed:.2f}s, max upstream concurrency {fake.state.sam.stats['max_in_flight']}"
+            )
+
+        # Pipeline throughput with an in-memory writer
+        collector = SAMGovCollector()
+        pipeline = IngestPipeline(
+            map_record=collector.map_opportunity,
+            classify_record=collector.classify_opportunity,
+            write_batch=lambda rows: (len(rows), 0)
+        )
+        results = await pipeline.run(sam_service.iter_daily_pages(target_date))
+        print(f"pipeline: {results['total_fetched']} records in {results['elapsed_seconds']:.2f}s")
+        for name, stage in results["stages"].items():
+            print(f"  {name}: {stage}")
+        print(f"upstream: {fake.state.sam.stats}")
+
+    finally:
+        await http_client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SAM ingest against the local stand-in")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--date", default=datetime.now().strftime("%Y-%m-%d"))
+    parser.add_argument("--fixtures", help="Recorded fixture file or directory instead of synthetic data")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run_benchmark(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
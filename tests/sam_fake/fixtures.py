@@ -0,0 +1,130 @@
+"""
+Synthetic and recorded SAM.gov opportunity fixtures for the local stand-in server
+"""
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Notice type codes accepted by the search API's noticeType filter
+NOTICE_TYPES = {
+    "o": "Solicitation",
+    "k": "Combined Synopsis/Solicitation",
+    "p": "Presolicitation",
+    "r": "Sources Sought",
+    "s": "Special Notice"
+}
+
+DEPARTMENTS = [
+    ("DEPT OF DEFENSE", "DEPT OF THE ARMY"),
+    ("DEPT OF DEFENSE", "DEFENSE LOGISTICS AGENCY"),
+    ("DEPT OF DEFENSE", "DEPT OF THE NAVY"),
+    ("GENERAL SERVICES ADMINISTRATION", "FEDERAL ACQUISITION SERVICE"),
+    ("VETERANS AFFAIRS, DEPARTMENT OF", "VETERANS AFFAIRS, DEPARTMENT OF"),
+    ("HOMELAND SECURITY, DEPARTMENT OF", "U.S. COAST GUARD")
+]
+
+ITEMS = [
+    "Laboratory Equipment", "Office Furniture", "Vehicle Parts", "Computer Hardware",
+    "Medical Supplies", "Safety Equipment", "Hand Tools", "Electrical Components",
+    "Uniforms", "Janitorial Services", "IT Support Services", "Facility Maintenance"
+]
+
+def generate_opportunities(
+    count: int,
+    start_date: datetime,
+    days: int = 1,
+    seed: int = 0
+) -> List[Dict]:
+    """
+    Generate SAM.gov-shaped opportunity records spread over a date range
+
+    Args:
+        count: Number of records
+        start_date: First posting date
+        days: Number of posting days to spread records across
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        List of records shaped like search API ``opportunitiesData`` entries
+    """
+    rng = random.Random(seed)
+    records = []
+
+    for index in range(count):
+        posted = start_date + timedelta(days=index % max(days, 1))
+        department, office = rng.choice(DEPARTMENTS)
+        item = rng.choice(ITEMS)
+        notice_code = rng.choice(["o", "o", "k", "k", "p", "s"])
+        psc = f"{rng.randint(10, 99)}{rng.choice('0123456789')}{rng.choice('0123456789')}"
+
+        records.append({
+            "noticeId": f"{rng.getrandbits(128):032x}",
+            "title": f"{item} - Lot {index}",
+            "solicitationNumber": f"SYN{seed:02d}-{posted:%y%m%d}-{index:07d}",
+            "fullParentPathName": f"{department}.{office}",
+            "organizationFullName": office,
+            "departmentFullName": department,
+            "departmentName": department,
+            "postedDate": posted.strftime("%Y-%m-%d"),
+            "type": NOTICE_TYPES[notice_code],
+            "baseType": NOTICE_TYPES[notice_code],
+            "responseDeadLine": (posted + timedelta(days=rng.randint(7, 45))).strftime("%Y-%m-%dT17:00:00-05:00"),
+            "naicsCode": str(rng.randint(311111, 561990)),
+            "classificationCode": psc,
+            "typeOfSetAside": rng.choice(["", "SBA", "8A", "WOSB", "SDVOSBC"]),
+            "description": f"The Government intends to procure {item.lower()} for {office.title()}.",
+            "officeAddress": {"city": rng.choice(["Arlington", "Fort Belvoir", "Columbus", "Norfolk"]), "state": "VA"},
+            "pointOfContact": [{"email": f"buyer{index % 50}@example.gov", "phone": "555-0100"}],
+            "active": "Yes"
+        })
+
+    return records
+
+def load_recorded_fixtures(path: str) -> List[Dict]:
+    """
+    Load recorded SAM.gov records from a file or directory
+
+    Accepts search API responses (``{"opportunitiesData": [...]}``), plain JSON
+    lists of records, and JSONL files (optionally gzip-compressed) where each
+    line is a record or a response.
+
+    Args:
+        path: File or directory of fixture files
+
+    Returns:
+        List of opportunity records
+    """
+    root = Path(path)
+    files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+    records: List[Dict] = []
+
+    for file_path in files:
+        opener = gzip.open if file_path.suffix == ".gz" else open
+        name = file_path.name[:-3] if file_path.suffix == ".gz" else file_path.name
+
+        with opener(file_path, "rt", encoding="utf-8") as handle:
+            if name.endswith(".jsonl"):
+                for line in handle:
+                    if line.strip():
+                        records.extend(_records_from(json.loads(line)))
+            elif name.endswith(".json"):
+                records.extend(_records_from(json.load(handle)))
+
+    return records
+
+def _records_from(document) -> List[Dict]:
+    if isinstance(document, list):
+        return document
+    if "opportunitiesData" in document:
+        return document["opportunitiesData"]
+    if "payload" in document:
+        return _records_from(document["payload"])
+    return [document]
+
+def default_fixture_path() -> Optional[str]:
+    """Path of the recorded fixtures bundled with the tests"""
+    path = Path(__file__).resolve().parent.parent / "fixtures" / "sam"
+    return str(path) if path.exists() else None
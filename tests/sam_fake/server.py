@@ -0,0 +1,214 @@
+"""
+In-process ASGI stand-in for the SAM.gov opportunities/v2/search endpoint
+
+Serves paginated, filterable data with configurable latency, 429s and errors so
+SAMService and the collectors can be exercised and benchmarked offline, either
+in-process through ``httpx.ASGITransport`` or over TCP with uvicorn:
+
+    uvicorn tests.sam_fake.server:create_app --factory --port 8099
+    SAM_API_BASE_URL=http://localhost:8099 ...
+"""
+import asyncio
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from tests.sam_fake.fixtures import NOTICE_TYPES, generate_opportunities
+
+class FakeSAMConfig:
+    """Behaviour knobs for the stand-in server"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        rate_limit_per_second: Optional[float] = None,
+        retry_after: int = 1,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_page_size: int = 1000,
+        seed: int = 0
+    ):
+        """
+        Args:
+            latency: Base response delay in seconds
+            latency_jitter: Extra uniformly random delay in seconds
+            rate_limit_per_second: Respond 429 when requests exceed this rate
+            retry_after: Retry-After seconds sent with 429s
+            error_rate: Fraction of requests answered with a 503
+            throttle_rate: Fraction of requests answered with a 429
+            max_page_size: Largest accepted size/limit
+            seed: Random seed for jitter and injected failures
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit_per_second = rate_limit_per_second
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_page_size = max_page_size
+        self.seed = seed
+
+class FakeSAMState:
+    """Records held by the server plus request/concurrency counters"""
+
+    def __init__(self, records: List[Dict], config: FakeSAMConfig):
+        self.records = records
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.window_started = 0.0
+        self.window_requests = 0
+        self.stats = {
+            "requests": 0,
+            "served": 0,
+            "throttled": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "max_in_flight": 0
+        }
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value[:10], fmt)
+        except ValueError:
+            continue
+    return None
+
+def filter_records(records: List[Dict], params: Dict[str, str]) -> List[Dict]:
+    """Apply the search API's query filters to a record list"""
+    posted_from = _parse_date(params.get("postedFrom"))
+    posted_to = _parse_date(params.get("postedTo"))
+    notice_types = {
+        NOTICE_TYPES.get(code.strip(), code.strip())
+        for code in (params.get("noticeType") or params.get("ptype") or "").split(",") if code.strip()
+    }
+    notice_ids = {value for value in (params.get("opportunityIds") or params.get("noticeid") or "").split(",") if value}
+    sol_number = params.get("solNumber") or params.get("solnum")
+    psc = params.get("psc")
+    ccode = params.get("ccode")
+    keyword = (params.get("keyword") or params.get("title") or "").lower()
+    department = (params.get("deptname") or "").lower()
+    org_type = params.get("orgType")
+
+    matched = []
+    for record in records:
+        posted = _parse_date(record.get("postedDate"))
+        if posted_from and (posted is None or posted < posted_from):
+            continue
+        if posted_to and (posted is None or posted > posted_to):
+            continue
+        if notice_types and record.get("type") not in notice_types:
+            continue
+        if notice_ids and record.get("noticeId") not in notice_ids:
+            continue
+        if sol_number and record.get("solicitationNumber") != sol_number:
+            continue
+        if psc and not (record.get("classificationCode") or "").startswith(psc):
+            continue
+        if ccode and record.get("classificationCode") != ccode:
+            continue
+        if keyword and keyword not in f"{record.get('title', '')} {record.get('description', '')}".lower():
+            continue
+        if department and department not in (record.get("departmentFullName") or "").lower():
+            continue
+        if org_type == "GSA" and "GENERAL SERVICES" not in (record.get("fullParentPathName") or ""):
+            continue
+        matched.append(record)
+
+    return matched
+
+def create_app(
+    records: Optional[List[Dict]] = None,
+    config: Optional[FakeSAMConfig] = None
+) -> FastAPI:
+    """
+    Build the stand-in app
+
+    Args:
+        records: Records to serve (defaults to 1,000 synthetic records for today)
+        config: Latency/failure behaviour
+
+    Returns:
+        ASGI app; its ``state.sam`` exposes the records and counters
+    """
+    config = config or FakeSAMConfig()
+    if records is None:
+        records = generate_opportunities(1000, datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+
+    app = FastAPI(title="SAM.gov stand-in")
+    state = FakeSAMState(records, config)
+    app.state.sam = state
+
+    async def search(request: Request):
+        loop = asyncio.get_running_loop()
+        stats = state.stats
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+        try:
+            delay = config.latency + state.rng.uniform(0, config.latency_jitter)
+            if delay:
+                await asyncio.sleep(delay)
+
+            if config.rate_limit_per_second:
+                now = loop.time()
+                if now - state.window_started >= 1.0:
+                    state.window_started = now
+                    state.window_requests = 0
+                state.window_requests += 1
+                if state.window_requests > config.rate_limit_per_second:
+                    stats["throttled"] += 1
+                    return JSONResponse(
+                        {"error": {"code": "OVER_RATE_LIMIT"}},
+                        status_code=429,
+                        headers={"Retry-After": str(config.retry_after)}
+                    )
+
+            roll = state.rng.random()
+            if roll < config.throttle_rate:
+                stats["throttled"] += 1
+                return JSONResponse(
+                    {"error": {"code": "OVER_RATE_LIMIT"}},
+                    status_code=429,
+                    headers={"Retry-After": str(config.retry_after)}
+                )
+            if roll < config.throttle_rate + config.error_rate:
+                stats["errors"] += 1
+                return JSONResponse({"error": "Service Unavailable"}, status_code=503)
+
+            params = dict(request.query_params)
+            matched = filter_records(state.records, params)
+
+            # Accept both size/page and limit/offset pagination styles
+            size = min(int(params.get("size") or params.get("limit") or 10), config.max_page_size)
+            if "offset" in params:
+                offset = int(params["offset"])
+            else:
+                offset = int(params.get("page") or 0) * size
+
+            stats["served"] += 1
+            return JSONResponse({
+                "totalRecords": len(matched),
+                "limit": size,
+                "offset": offset,
+                "opportunitiesData": matched[offset:offset + size]
+            })
+
+        finally:
+            stats["in_flight"] -= 1
+
+    app.add_api_route("/opportunities/v2/search", search, methods=["GET"])
+    app.add_api_route("/prod/opportunities/v2/search", search, methods=["GET"])
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {**state.stats, "records": len(state.records)}
+
+    return app
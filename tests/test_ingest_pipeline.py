@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.models.opportunity import CollectionRun, Opportunity
+from app.services import ingest_pipeline
+from app.services.data_collector import SAMGovCollector
+from app.services.ingest_pipeline import ingest_daily_opportunities
+from app.services.sam_service import sam_service
+from tests.sam_fake import generate_opportunities
+
+DAY = datetime(2025, 9, 2)
+
+def serve_pages(monkeypatch, pages, fail_after=None):
+    """Stand in for the daily page stream; optionally fail once fail_after is set"""
+    async def iter_daily_pages(target_date, start_page=0):
+        for page_number, records in enumerate(pages):
+            yield page_number, records
+        if fail_after is not None:
+            while not fail_after.is_set():
+                await asyncio.sleep(0.01)
+            raise httpx.HTTPError("upstream failure")
+
+    monkeypatch.setattr(sam_service, "iter_daily_pages", iter_daily_pages)
+
+def test_checkpoints_are_reported_from_the_write_thread(db, monkeypatch):
+    monkeypatch.setattr(ingest_pipeline.settings, "INGEST_BATCH_SIZE", 50)
+    records = generate_opportunities(250, DAY, seed=11)
+    serve_pages(monkeypatch, [records[start:start + 100] for start in range(0, 250, 100)])
+    reports = []
+
+    def on_pages_committed(page):
+        reports.append((page, threading.current_thread() is threading.main_thread()))
+
+    results = asyncio.run(ingest_daily_opportunities(DAY, on_pages_committed=on_pages_committed))
+
+    assert results["total_fetched"] == 250
+    assert [page for page, _ in reports] == [0, 1, 2]
+    assert not any(on_main_thread for _, on_main_thread in reports)
+
+def test_failed_fetch_waits_for_the_running_write(db, monkeypatch):
+    monkeypatch.setattr(ingest_pipeline.settings, "INGEST_BATCH_SIZE", 1)
+    write_started = threading.Event()
+    serve_pages(monkeypatch, [generate_opportunities(5, DAY, seed=12)], fail_after=write_started)
+    events = []
+    save_batch = SAMGovCollector.save_batch
+    update_collection_run = SAMGovCollector.update_collection_run
+
+    def slow_save_batch(self, rows):
+        write_started.set()
+        try:
+            time.sleep(0.2)
+            return save_batch(self, rows)
+        finally:
+            events.append("write finished")
+
+    def record_run(self, run, status, **kwargs):
+        events.append(f"run {status}")
+        return update_collection_run(self, run, status, **kwargs)
+
+    monkeypatch.setattr(SAMGovCollector, "save_batch", slow_save_batch)
+    monkeypatch.setattr(SAMGovCollector, "update_collection_run", record_run)
+
+    with pytest.raises(httpx.HTTPError):
+        asyncio.run(ingest_daily_opportunities(DAY))
+
+    assert events == ["write finished", "run failed"]
+    db.expire_all()
+    assert db.query(CollectionRun).one().status == "failed"
+    assert db.query(Opportunity).count() == 0
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from app.models.opportunity import Opportunity
+from app.services.opportunity_partitions import partition_service
+from app.services.opportunity_writer import load_opportunities
+
+def load_postings(db, *posted_dates):
+    rows = [
+        {"title": f"Lot {number}", "solicitation_number": f"SOL-{number:04d}", "posted_date": posted}
+        for number, posted in enumerate(posted_dates)
+    ]
+    load_opportunities(db, rows, "upsert")
+
+def test_retention_is_opt_in(db):
+    load_postings(db, datetime(2015, 1, 5), datetime.utcnow())
+
+    results = partition_service.apply_retention(db)
+
+    assert results == {"cutoff": None, "partitions": [], "rows_deleted": 0}
+    assert db.query(Opportunity).count() == 2
+
+def test_retention_deletes_expired_rows_on_a_plain_table(db):
+    load_postings(db, datetime(2015, 1, 5), datetime.utcnow())
+
+    results = partition_service.apply_retention(db, retention_months=12)
+
+    assert results["rows_deleted"] == 1
+    assert [row.solicitation_number for row in db.query(Opportunity)] == ["SOL-0001"]
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.opportunity import Opportunity
+from app.services import opportunity_writer
+from app.services.opportunity_writer import (
+    content_hash,
+    conflict_columns,
+    copy_load_opportunities,
+    load_opportunities,
+    upsert_opportunities
+)
+
+def make_row(number: int, **changes):
+    row = {
+        "title": f"Hand Tools - Lot {number}",
+        "solicitation_number": f"SOL-{number:04d}",
+        "description": "Wrenches and sockets",
+        "posted_date": datetime(2025, 9, 1),
+        "response_deadline": datetime(2025, 9, 30),
+        "agency": "DEPT OF DEFENSE",
+        "psc_code": "5120",
+        "opportunity_type": "Solicitation",
+        "source_platform": "SAM",
+        "source_id": f"notice-{number}",
+        "last_sync_at": datetime(2025, 9, 2)
+    }
+    row.update(changes)
+    return row
+
+def stored(db, number: int) -> Opportunity:
+    db.expire_all()
+    return db.query(Opportunity).filter(Opportunity.solicitation_number == f"SOL-{number:04d}").one()
+
+def test_content_hash_covers_content_not_bookkeeping():
+    row = make_row(1)
+
+    assert content_hash(row) == content_hash(make_row(1, last_sync_at=datetime(2026, 1, 1)))
+    assert content_hash(row) != content_hash(make_row(1, title="Power Tools - Lot 1"))
+    # Mapping a field differently (even to None) is a content change
+    assert content_hash(row) != content_hash({**row, "naics_code": None})
+
+def test_conflict_key_on_plain_table(db):
+    assert conflict_columns(db) == ["solicitation_number"]
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_new_rows_are_inserted_once(db, mode):
+    assert load_opportunities(db, [make_row(number) for number in range(5)], mode) == (5, 0)
+    assert load_opportunities(db, [make_row(number) for number in range(5)], mode) == (0, 0)
+    assert db.query(Opportunity).count() == 5
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_unchanged_rows_only_touch_last_sync(db, mode):
+    load_opportunities(db, [make_row(1)], mode)
+    first = stored(db, 1)
+    first_hash, first_updated = first.content_hash, first.updated_at
+
+    assert load_opportunities(db, [make_row(1, last_sync_at=datetime(2025, 9, 3))], mode) == (0, 0)
+
+    row = stored(db, 1)
+    assert row.last_sync_at == datetime(2025, 9, 3)
+    assert row.content_hash == first_hash
+    assert row.updated_at == first_updated
+    assert row.last_changed_fields is None
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_amended_rows_are_rewritten_with_changed_fields(db, mode):
+    load_opportunities(db, [make_row(1), make_row(2)], mode)
+
+    amended = make_row(1, response_deadline=datetime(2025, 10, 15), description="Wrenches, sockets and ratchets")
+    assert load_opportunities(db, [amended, make_row(2)], mode) == (0, 1)
+
+    row = stored(db, 1)
+    assert row.response_deadline == datetime(2025, 10, 15)
+    assert row.content_hash == content_hash(amended)
+    assert sorted(row.last_changed_fields) == ["description", "response_deadline"]
+    assert stored(db, 2).last_changed_fields is None
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_amended_posted_date_keeps_one_row(db, mode):
+    load_opportunities(db, [make_row(1)], mode)
+
+    assert load_opportunities(db, [make_row(1, posted_date=datetime(2025, 11, 3))], mode) == (0, 1)
+
+    assert db.query(Opportunity).count() == 1
+    assert stored(db, 1).posted_date == datetime(2025, 11, 3)
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_last_occurrence_in_a_batch_wins(db, mode):
+    rows = [make_row(1, title="First"), make_row(2), make_row(1, title="Second")]
+
+    assert load_opportunities(db, rows, mode) == (2, 0)
+    assert stored(db, 1).title == "Second"
+
+def test_rows_without_solicitation_number_are_skipped(db):
+    rows = [make_row(1), make_row(2, solicitation_number="")]
+
+    assert upsert_opportunities(db, rows) == (1, 0)
+    assert copy_load_opportunities(db, iter([make_row(3, solicitation_number=None)])) == (0, 0)
+    assert db.query(Opportunity).count() == 1
+
+def test_copy_load_streams_in_chunks(db, monkeypatch):
+    monkeypatch.setattr(opportunity_writer.settings, "INGEST_COPY_CHUNK_SIZE", 3)
+    rows = (make_row(number) for number in range(10))
+
+    assert copy_load_opportunities(db, rows) == (10, 0)
+
+    amended = (make_row(number, title="Retitled") if number % 2 else make_row(number) for number in range(10))
+    assert copy_load_opportunities(db, amended) == (0, 5)
+
+def test_copy_load_fills_column_defaults(db):
+    copy_load_opportunities(db, [make_row(1)])
+
+    row = stored(db, 1)
+    assert row.status == "active"
+    assert row.is_duplicate is False
+    assert row.created_at is not None
+
+def test_failed_write_rolls_back(db, monkeypatch):
+    load_opportunities(db, [make_row(1)], "upsert")
+
+    def fail(session, rows):
+        raise RuntimeError("rewrite failed")
+
+    monkeypatch.setattr(opportunity_writer, "_rewrite_amended", fail)
+    with pytest.raises(RuntimeError):
+        upsert_opportunities(db, [make_row(1, title="Changed"), make_row(2)])
+
+    assert db.query(Opportunity).count() == 1
+    assert stored(db, 1).title == "Hand Tools - Lot 1"
+
+def test_unknown_load_mode(db):
+    with pytest.raises(ValueError):
+        load_opportunities(db, [make_row(1)], "merge")
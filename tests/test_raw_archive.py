@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.models.opportunity import Opportunity
+from app.services import raw_archive as raw_archive_module
+from app.services.raw_archive import RawPayloadArchive, replay_archive
+from tests.sam_fake import generate_opportunities
+
+FETCHED_AT = datetime(2025, 9, 2, 12, 0)
+PRODUCT_PREFIXES = {str(prefix) for prefix in range(10, 70)}
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    archive = RawPayloadArchive(str(tmp_path))
+    monkeypatch.setattr(raw_archive_module, "raw_archive", archive)
+    return archive
+
+@pytest.fixture
+def saved_rfqs(monkeypatch):
+    saved = []
+
+    def save(records):
+        saved.extend(records)
+        return len(records)
+
+    monkeypatch.setattr(raw_archive_module, "_save_daily_sync_records", save)
+    return saved
+
+def archive_page(archive, params, records):
+    archive.append("sam", "http://sam.test/search", params, {"opportunitiesData": records}, fetched_at=FETCHED_AT)
+
+def test_replay_reads_the_archive_once_and_routes_each_record(db, archive, saved_rfqs, monkeypatch):
+    search_records = generate_opportunities(300, datetime(2025, 9, 1), seed=21)
+    daily_records = generate_opportunities(40, datetime(2025, 9, 1), seed=22)
+    archive_page(archive, {"limit": 1000, "offset": 0, "noticeType": "o,k", "psc": "10"}, search_records)
+    archive_page(archive, {"postedFrom": "09/01/2025", "postedTo": "09/01/2025", "size": 100, "page": 0}, daily_records)
+
+    scans = []
+    iter_entries = archive.iter_entries
+
+    def counting_iter_entries(*args):
+        scans.append(args)
+        return iter_entries(*args)
+
+    monkeypatch.setattr(archive, "iter_entries", counting_iter_entries)
+
+    results = asyncio.run(replay_archive(FETCHED_AT, FETCHED_AT))
+
+    assert len(scans) == 1
+    gsa = [record for record in search_records if "GENERAL SERVICES" in record["fullParentPathName"]]
+    sam = [
+        record for record in search_records
+        if record not in gsa and record["classificationCode"][:2] in PRODUCT_PREFIXES
+    ]
+    assert results["GSA_EBUY"]["total_fetched"] == len(gsa)
+    assert results["SAM"]["total_fetched"] == len(sam)
+    stored = dict(db.query(Opportunity.solicitation_number, Opportunity.source_platform).all())
+    assert {number for number, platform in stored.items() if platform == "GSA_EBUY"} == {
+        record["solicitationNumber"] for record in gsa
+    }
+
+    # Daily-sync pages go to the RFQ path whole, not through collector routing
+    assert saved_rfqs == daily_records
+    assert results["RFQ"]["total_fetched"] == len(daily_records)
+
+def test_replay_limited_to_rfqs_skips_collector_pages(db, archive, saved_rfqs):
+    archive_page(archive, {"limit": 1000, "offset": 0, "noticeType": "o,k", "psc": "10"},
+                 generate_opportunities(50, datetime(2025, 9, 1), seed=23))
+    archive_page(archive, {"postedFrom": "09/01/2025", "postedTo": "09/01/2025", "size": 100, "page": 0},
+                 generate_opportunities(10, datetime(2025, 9, 1), seed=24))
+
+    results = asyncio.run(replay_archive(FETCHED_AT, FETCHED_AT, platforms=["RFQ"]))
+
+    assert set(results) == {"RFQ"}
+    assert len(saved_rfqs) == 10
+    assert db.query(Opportunity).count() == 0
@@ -0,0 +1,196 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.core.http_client import http_client
+from app.services import sam_service as sam_service_module
+from app.services.sam_service import IncompleteFetchError, SAMService
+from app.utils import adaptive_concurrency, rate_limiter
+from tests.sam_fake import FakeSAMConfig, generate_opportunities
+
+TODAY = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+def test_daily_fetch_walks_every_page(fake_sam):
+    records = generate_opportunities(250, TODAY, seed=1)
+    app = fake_sam(records)
+
+    for concurrent in (False, True):
+        opportunities = asyncio.run(SAMService().get_daily_opportunities(TODAY, concurrent=concurrent))
+        assert [opp["noticeId"] for opp in opportunities] == [record["noticeId"] for record in records]
+
+    # 3 pages of 100 per mode
+    assert app.state.sam.stats["served"] == 6
+
+def test_daily_fetch_dedupes_by_notice_id(fake_sam):
+    records = generate_opportunities(150, TODAY, seed=2)
+    # A notice listed again on a later page (upstream reordering between page reads)
+    records.append(dict(records[0]))
+    fake_sam(records)
+
+    for concurrent in (False, True):
+        opportunities = asyncio.run(SAMService().get_daily_opportunities(TODAY, concurrent=concurrent))
+        assert len(opportunities) == 150
+        assert len({opp["noticeId"] for opp in opportunities}) == 150
+
+def test_search_pages_stream_in_order(fake_sam):
+    records = generate_opportunities(2500, TODAY - timedelta(days=2), days=3, seed=3)
+    fake_sam(records)
+
+    async def collect():
+        pages = []
+        params = {"postedFrom": (TODAY - timedelta(days=2)).strftime("%m/%d/%Y"), "postedTo": TODAY.strftime("%m/%d/%Y")}
+        async for page, page_records in SAMService().iter_search_pages(params):
+            pages.append((page, len(page_records)))
+        return pages
+
+    assert asyncio.run(collect()) == [(0, 1000), (1, 1000), (2, 500)]
+
+def test_failed_page_raises_incomplete_fetch(fake_sam, monkeypatch):
+    monkeypatch.setattr(sam_service_module.settings, "SAM_MAX_RETRIES", 0)
+    fake_sam(generate_opportunities(300, TODAY, seed=4))
+    service = SAMService()
+    real_get_page = service._get_daily_page
+
+    async def get_page(start_date, end_date, size, page):
+        if page == 1:
+            raise httpx.HTTPError("upstream failure")
+        return await real_get_page(start_date, end_date, size, page)
+
+    monkeypatch.setattr(service, "_get_daily_page", get_page)
+
+    for concurrent in (False, True):
+        with pytest.raises(IncompleteFetchError) as error:
+            asyncio.run(service.get_daily_opportunities(TODAY, concurrent=concurrent))
+        assert error.value.failed_pages == [1]
+        assert len(error.value.opportunities) == 200
+
+class _VirtualClock:
+    """time module stand-in whose monotonic clock jumps ahead by every recorded sleep"""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.offset
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+def _recording_sleep(monkeypatch):
+    """
+    Record the delays the client waits for, without waiting for them
+
+    Retry-After also pauses the adaptive concurrency limiter until a monotonic
+    deadline, so the limiter and rate limiter read a clock that each sleep advances.
+    """
+    delays = []
+    clock = _VirtualClock()
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        clock.offset += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    for module in (sam_service_module, adaptive_concurrency, rate_limiter):
+        monkeypatch.setattr(module, "time", clock)
+    return delays
+
+def test_429_retry_honours_retry_after(monkeypatch):
+    delays = _recording_sleep(monkeypatch)
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "7"}, json={"error": {"code": "OVER_RATE_LIMIT"}})
+        return httpx.Response(200, json={"totalRecords": 1, "opportunitiesData": [{"noticeId": "n1"}]})
+
+    async def fetch():
+        await http_client.start(transport=httpx.MockTransport(respond))
+        try:
+            return await SAMService().fetch_search_page({"postedFrom": "01/01/2025"})
+        finally:
+            await http_client.close()
+
+    data = asyncio.run(fetch())
+
+    assert data["opportunitiesData"] == [{"noticeId": "n1"}]
+    assert len(calls) == 2
+    assert 7.0 in delays
+
+def test_retry_without_retry_after_uses_backoff(monkeypatch):
+    delays = _recording_sleep(monkeypatch)
+    monkeypatch.setattr(SAMService, "_backoff_delay", staticmethod(lambda attempt: 0.25 * (attempt + 1)))
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        if len(calls) <= 2:
+            return httpx.Response(503, json={"error": "Service Unavailable"})
+        return httpx.Response(200, json={"totalRecords": 0, "opportunitiesData": []})
+
+    async def fetch():
+        await http_client.start(transport=httpx.MockTransport(respond))
+        try:
+            return await SAMService().fetch_search_page({})
+        finally:
+            await http_client.close()
+
+    asyncio.run(fetch())
+
+    assert len(calls) == 3
+    assert [delay for delay in delays if delay] == [0.25, 0.5]
+
+def test_retries_give_up_after_max_retries(monkeypatch):
+    _recording_sleep(monkeypatch)
+    monkeypatch.setattr(sam_service_module.settings, "SAM_MAX_RETRIES", 2)
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "1"}, json={})
+
+    async def fetch():
+        await http_client.start(transport=httpx.MockTransport(respond))
+        try:
+            return await SAMService().fetch_search_page({})
+        finally:
+            await http_client.close()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(fetch())
+    assert len(calls) == 3
+
+def test_throttled_fake_still_returns_everything(fake_sam, monkeypatch):
+    delays = _recording_sleep(monkeypatch)
+    records = generate_opportunities(500, TODAY, seed=5)
+    # Seed 4 throttles the first two requests and some later ones
+    app = fake_sam(records, FakeSAMConfig(throttle_rate=0.3, retry_after=3, seed=4))
+
+    opportunities = asyncio.run(SAMService().get_daily_opportunities(TODAY, concurrent=False))
+
+    assert len(opportunities) == 500
+    assert app.state.sam.stats["throttled"] >= 2
+    assert delays.count(3.0) == app.state.sam.stats["throttled"]
+
+def test_limiters_survive_a_new_event_loop():
+    # Global limiters outlive asyncio.run; their locks must not stay bound to the first loop
+    bucket = rate_limiter.TokenBucket(rate=1000, capacity=1)
+    controller = adaptive_concurrency.AIMDController(initial_limit=1)
+
+    async def contend():
+        async def call():
+            await bucket.acquire()
+            async with controller.slot():
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(call() for _ in range(5)))
+
+    for _ in range(2):
+        asyncio.run(contend())
+    assert controller.get_stats()["in_flight"] == 0
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.opportunity import CollectionRun, CollectionWatermark, Opportunity
+from app.services import shared_fetch
+from app.services.data_collector import GSAeBuyCollector, SAMGovCollector
+from app.services.shared_fetch import SharedSAMFetch
+from tests.sam_fake import generate_opportunities
+
+TODAY = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+SOLICITATION_TYPES = {"Solicitation", "Combined Synopsis/Solicitation"}
+PRODUCT_PREFIXES = {str(prefix) for prefix in range(10, 70)}
+
+@pytest.fixture
+def records(fake_sam):
+    records = generate_opportunities(600, TODAY - timedelta(days=2), days=3, seed=7)
+    fake_sam(records)
+    return records
+
+def is_gsa(record) -> bool:
+    return "GENERAL SERVICES" in record["fullParentPathName"]
+
+def run_shared_fetch(mode: str = "incremental"):
+    async def run():
+        with GSAeBuyCollector() as gsa, SAMGovCollector() as sam:
+            return await SharedSAMFetch([gsa, sam]).run(mode)
+    return asyncio.run(run())
+
+def watermarks(db, platform: str):
+    db.expire_all()
+    return {
+        watermark.filter_key: watermark.high_water_mark
+        for watermark in db.query(CollectionWatermark).filter(CollectionWatermark.platform == platform)
+    }
+
+def latest_run(db, platform: str) -> CollectionRun:
+    db.expire_all()
+    return db.query(CollectionRun).filter(CollectionRun.platform == platform).order_by(CollectionRun.id.desc()).first()
+
+def product_solicitations(records):
+    return [
+        record for record in records
+        if record["type"] in SOLICITATION_TYPES and record["classificationCode"][:2] in PRODUCT_PREFIXES
+    ]
+
+def test_records_are_routed_and_stored_once(db, records):
+    solicitations = product_solicitations(records)
+    expected_gsa = {record["solicitationNumber"] for record in solicitations if is_gsa(record)}
+    expected_sam = {record["solicitationNumber"] for record in solicitations if not is_gsa(record)}
+
+    results = run_shared_fetch()
+
+    stored = dict(db.query(Opportunity.solicitation_number, Opportunity.source_platform).all())
+    assert {number for number, platform in stored.items() if platform == "GSA_EBUY"} == expected_gsa
+    assert {number for number, platform in stored.items() if platform == "SAM"} == expected_sam
+    assert results["GSA_EBUY"]["new_opportunities"] == len(expected_gsa)
+    assert results["SAM"]["new_opportunities"] == len(expected_sam)
+    # GSA product notices are also SAM product notices; they count for both, stored once
+    assert results["GSA_EBUY"]["total_fetched"] == len(expected_gsa)
+    assert results["SAM"]["total_fetched"] == len(solicitations)
+    assert results["SAM"]["errors"] == results["GSA_EBUY"]["errors"] == []
+
+def test_platforms_share_one_query_per_filter_set(db, fake_sam):
+    app = fake_sam(generate_opportunities(600, TODAY - timedelta(days=2), days=3, seed=7))
+
+    run_shared_fetch()
+
+    # One page per PSC prefix for both platforms, no separate GSA query
+    assert app.state.sam.stats["served"] == len(PRODUCT_PREFIXES)
+
+def test_each_filter_set_advances_its_own_watermark(db, records):
+    run_shared_fetch()
+
+    newest = {}
+    for record in records:
+        if record["type"] in SOLICITATION_TYPES:
+            prefix = record["classificationCode"][:2]
+            posted = datetime.strptime(record["postedDate"], "%Y-%m-%d")
+            newest[prefix] = max(newest.get(prefix, posted), posted)
+
+    sam_watermarks = watermarks(db, "SAM")
+    assert len(sam_watermarks) == len(PRODUCT_PREFIXES)
+    for prefix in PRODUCT_PREFIXES:
+        assert sam_watermarks[f"psc={prefix};noticeType=o,k"] == newest.get(prefix)
+    assert watermarks(db, "GSA_EBUY") == sam_watermarks
+
+    timings = latest_run(db, "SAM").psc_timings
+    assert set(timings) == PRODUCT_PREFIXES
+    assert all(timing["error"] is None and timing["seconds"] >= 0 for timing in timings.values())
+    assert sum(timing["fetched"] for timing in timings.values()) == len(product_solicitations(records))
+    gsa_timings = latest_run(db, "GSA_EBUY").psc_timings
+    assert sum(timing["fetched"] for timing in gsa_timings.values()) == sum(
+        1 for record in product_solicitations(records) if is_gsa(record)
+    )
+
+def test_failed_filter_set_keeps_its_watermark(db, records, monkeypatch):
+    service = shared_fetch.sam_service
+    iter_search_pages = service.iter_search_pages
+
+    def failing_iter_search_pages(params, **kwargs):
+        if params.get("psc") == "58":
+            raise RuntimeError("upstream failure")
+        return iter_search_pages(params, **kwargs)
+
+    monkeypatch.setattr(service, "iter_search_pages", failing_iter_search_pages)
+
+    results = run_shared_fetch()
+
+    # The failed query is shared, so both platforms report it and keep its old watermark
+    error = "Error fetching psc=58;noticeType=o,k: upstream failure"
+    assert results["SAM"]["errors"] == results["GSA_EBUY"]["errors"] == [error]
+    for platform in ("SAM", "GSA_EBUY"):
+        platform_watermarks = watermarks(db, platform)
+        assert "psc=58;noticeType=o,k" not in platform_watermarks
+        assert len(platform_watermarks) == len(PRODUCT_PREFIXES) - 1
+
+    run = latest_run(db, "SAM")
+    assert run.status == "completed"
+    assert run.errors_count == 1
+    assert run.psc_timings["58"]["error"] is not None
+
+def test_incremental_run_starts_from_each_watermark(db, records):
+    run_shared_fetch()
+    run_shared_fetch()
+
+    for platform in ("SAM", "GSA_EBUY"):
+        platform_watermarks = watermarks(db, platform)
+        for prefix, timing in latest_run(db, platform).psc_timings.items():
+            high_water_mark = platform_watermarks[f"psc={prefix};noticeType=o,k"]
+            if high_water_mark is not None:
+                assert timing["posted_from"] == (high_water_mark - timedelta(days=1)).strftime("%m/%d/%Y")
+    assert db.query(Opportunity).count() == len({
+        record["solicitationNumber"] for record in product_solicitations(records)
+    })